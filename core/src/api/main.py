@@ -1,6 +1,23 @@
 from fastapi import FastAPI
-from src.api.routes import router
+from src.api.routes import router, config
+from core.generation_pool import generation_pool
+from core.generators.configurable_generator import shutdown_process_pool
 
 app = FastAPI(title="Scafoldr API")
 
 app.include_router(router)
+
+@app.on_event("startup")
+async def startup():
+    await config.code_storage.open()
+    # Storage operations reconnect on their own, an unreachable Redis is reported but not fatal
+    if not await config.code_storage.ping():
+        print("Warning: Code storage is not reachable at startup")
+    await config.code_storage.start_invalidation_listener()
+
+@app.on_event("shutdown")
+async def shutdown():
+    if generation_pool is not None:
+        generation_pool.shutdown()
+    shutdown_process_pool()
+    await config.code_storage.close()
@@ -1,18 +1,20 @@
 from fastapi import APIRouter, HTTPException, status, Request
 from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from sse_starlette.sse import EventSourceResponse
 import pyparsing
 import traceback
 import warnings
 import asyncio
 import json
-import hashlib
 from datetime import datetime
 
 from config.config import Config
-from core.orchestrator import generate_backend
+from core.orchestrator import generate_backend_job, stream_backend, generation_cache_stats
+from core.generation_pool import generation_pool, merge_stats, GenerationPoolFull, GenerationPoolUnavailable
+from core.timings import stage_histograms
 from core.company.scafoldr_inc import ScafoldrInc
-from core.storage.code_storage import CodeChange
+from core.storage.code_storage import CodeChange, FileMetadata
 from models.generate import GenerateRequest, GenerateResponse
 from models.chat import ChatRequest
 
@@ -24,55 +26,143 @@ config = Config()
     "/generate",
     response_model=GenerateResponse,
     status_code=status.HTTP_200_OK,
+    response_model_exclude_none=True,
     deprecated=True
 )
-def generate_backend_route(request: GenerateRequest):
+async def generate_backend_route(request: GenerateRequest, include_timings: bool = False):
+    """
+    Generate a backend. With ?include_timings=true the response carries per-stage
+    timings and counts in metadata.timings.
+
+    Generation runs in the generation process pool, so it does not hold the GIL of the
+    API worker. When the pool is saturated the request is rejected with 429 and a
+    Retry-After header.
+    """
     try:
-        project_files = generate_backend(request)
+        if generation_pool is not None:
+            project_files, timings = await generation_pool.run(generate_backend_job, request)
+        else:
+            project_files, timings = await run_in_threadpool(generate_backend_job, request)
+        timings.report("generate")
+        if include_timings:
+            project_files.metadata = {"timings": timings.to_dict()}
         return project_files
+    except GenerationPoolFull as e:
+        raise _generation_unavailable(status.HTTP_429_TOO_MANY_REQUESTS, "generation_queue_full", e)
+    except GenerationPoolUnavailable as e:
+        raise _generation_unavailable(status.HTTP_503_SERVICE_UNAVAILABLE, "generation_unavailable", e)
     except pyparsing.exceptions.ParseException as e:
-        # Extract helpful information from the DBML parsing error
-        error_msg = str(e)
-        line_info = ""
-        
-        # Try to extract line and column information
-        if hasattr(e, 'line') and hasattr(e, 'col'):
-            line_info = f" at line {e.line}, column {e.col}"
-        elif "line:" in error_msg and "col:" in error_msg:
-            # Extract from error message like "(at char 96), (line:4, col:3)"
-            import re
-            match = re.search(r'line:(\d+), col:(\d+)', error_msg)
-            if match:
-                line_info = f" at line {match.group(1)}, column {match.group(2)}"
-        
-        # Create a user-friendly error message
-        friendly_msg = f"DBML syntax error{line_info}: {error_msg}"
-        
-        raise HTTPException(
-            status_code=400,
-            detail={
-                "error": "Invalid DBML syntax",
-                "message": friendly_msg,
-                "type": "dbml_parse_error"
-            }
-        )
+        raise _dbml_parse_error(e)
     except Exception as e:
-        # Handle other unexpected errors
-        error_details = traceback.format_exc()
-        print(f"DETAILED ERROR in /generate endpoint:")
-        print(f"Exception type: {type(e).__name__}")
-        print(f"Exception message: {str(e)}")
-        print(f"Full traceback:\n{error_details}")
-        
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Code generation failed",
-                "message": str(e),
-                "type": "generation_error",
-                "traceback": error_details
-            }
-        )
+        raise _generation_error("/generate", e)
+
+@router.post("/generate/stream")
+def generate_backend_stream_route(request: GenerateRequest):
+    """
+    Streaming variant of /generate.
+
+    Files are rendered in the API process while the response is written, not in the
+    generation pool: passing them from a worker would mean buffering the whole result,
+    which is what streaming avoids. Its load is therefore not bounded by the pool.
+
+    Responds with newline-delimited JSON: one {"type": "file", "path", "content"} object per
+    generated file as soon as it is rendered, followed by a final {"type": "commands", "commands"}
+    object. Errors during rendering are reported as a {"type": "error", "message"} object.
+    """
+    try:
+        files, commands = stream_backend(request)
+    except pyparsing.exceptions.ParseException as e:
+        raise _dbml_parse_error(e)
+    except Exception as e:
+        raise _generation_error("/generate/stream", e)
+
+    def ndjson_stream():
+        try:
+            for file_path, content in files:
+                yield json.dumps({"type": "file", "path": file_path, "content": content}) + "\n"
+            yield json.dumps({"type": "commands", "commands": commands}) + "\n"
+        except Exception as e:
+            print(f"DETAILED ERROR in /generate/stream endpoint:\n{traceback.format_exc()}")
+            yield json.dumps({"type": "error", "message": str(e)}) + "\n"
+
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+def _dbml_parse_error(e: pyparsing.exceptions.ParseException) -> HTTPException:
+    """Build the 400 response for a DBML syntax error"""
+    # Extract helpful information from the DBML parsing error
+    error_msg = str(e)
+    line_info = ""
+    
+    # Try to extract line and column information
+    if hasattr(e, 'line') and hasattr(e, 'col'):
+        line_info = f" at line {e.line}, column {e.col}"
+    elif "line:" in error_msg and "col:" in error_msg:
+        # Extract from error message like "(at char 96), (line:4, col:3)"
+        import re
+        match = re.search(r'line:(\d+), col:(\d+)', error_msg)
+        if match:
+            line_info = f" at line {match.group(1)}, column {match.group(2)}"
+    
+    # Create a user-friendly error message
+    friendly_msg = f"DBML syntax error{line_info}: {error_msg}"
+    
+    return HTTPException(
+        status_code=400,
+        detail={
+            "error": "Invalid DBML syntax",
+            "message": friendly_msg,
+            "type": "dbml_parse_error"
+        }
+    )
+
+def _generation_unavailable(status_code: int, error_type: str, e: Exception) -> HTTPException:
+    """Build the response for a generation rejected by the generation pool"""
+    return HTTPException(
+        status_code=status_code,
+        detail={
+            "error": "Code generation unavailable",
+            "message": str(e),
+            "type": error_type
+        },
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+def _generation_error(endpoint: str, e: Exception) -> HTTPException:
+    """Log an unexpected generation error and build the 500 response"""
+    # Handle other unexpected errors
+    error_details = traceback.format_exc()
+    print(f"DETAILED ERROR in {endpoint} endpoint:")
+    print(f"Exception type: {type(e).__name__}")
+    print(f"Exception message: {str(e)}")
+    print(f"Full traceback:\n{error_details}")
+    
+    return HTTPException(
+        status_code=500,
+        detail={
+            "error": "Code generation failed",
+            "message": str(e),
+            "type": "generation_error",
+            "traceback": error_details
+        }
+    )
+
+@router.get("/metrics")
+def metrics_route():
+    """
+    Expose internal cache counters so they can be scraped by monitoring.
+
+    Generation cache counters are summed over the API process (/generate/stream, or
+    /generate without a pool) and the generation pool workers, as of their last job.
+    """
+    caches = generation_cache_stats()
+    if generation_pool is not None:
+        caches = merge_stats([caches] + generation_pool.worker_stats())
+    return {
+        **caches,
+        "generation_stages": stage_histograms.snapshot(),
+        "generation_pool": generation_pool.stats() if generation_pool else None,
+        "storage": config.code_storage.stats()
+    }
 
 @router.post("/scafoldr-inc/consult")
 async def scafoldr_inc_consult_route(request: ChatRequest):
@@ -190,15 +280,18 @@ async def sse_code_updates(project_id: str, request: Request):
         async def on_file_change(change: CodeChange):
             # Only forward events for the requested project
             if change.project_id == project_id:
-                # Don't include full content in SSE events, just metadata
+                # Don't include full content in SSE events, just the stored metadata
+                metadata = change.metadata
+                if metadata is None and change.content:
+                    metadata = FileMetadata.from_content(change.content)
                 event_data = {
                     "project_id": change.project_id,
                     "file_path": change.file_path,
                     "action": change.action,
                     "timestamp": change.timestamp,
                     # Include a hash of the content for change detection
-                    "content_hash": hashlib.md5(change.content.encode()).hexdigest() if change.content else None,
-                    "size": len(change.content) if change.content else 0
+                    "content_hash": metadata.hash if metadata else None,
+                    "size": metadata.size if metadata else 0
                 }
                 await queue.put(event_data)
         
@@ -244,6 +337,145 @@ async def sse_code_updates(project_id: str, request: Request):
     
     return EventSourceResponse(event_generator())
 
+@router.get("/api/code-stats/{project_id}")
+async def get_project_storage_stats(project_id: str):
+    """
+    Raw and stored (e.g. compressed) bytes of the files of a project.
+    """
+    try:
+        stats = await config.code_storage.get_project_storage_stats(project_id)
+        return {
+            "project_id": project_id,
+            **stats
+        }
+    except Exception as e:
+        error_details = traceback.format_exc()
+        print(f"ERROR in get_project_storage_stats: {str(e)}\n{error_details}")
+        
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Failed to retrieve project storage stats",
+                "message": str(e),
+                "type": "project_stats_error"
+            }
+        )
+
+# Bulk endpoints, registered before the {file_path:path} routes that would otherwise match "bulk"
+@router.post("/api/code/{project_id}/bulk")
+async def bulk_save_files(project_id: str, request: Request):
+    """
+    Bulk save multiple files at once.
+    
+    Accepts a JSON body with a dictionary of file_path -> content mappings.
+    """
+    try:
+        # Parse request body
+        body = await request.json()
+        
+        if not isinstance(body, dict):
+            raise HTTPException(
+                status_code=400,
+                detail="Request body must be a dictionary of file_path -> content mappings"
+            )
+        
+        # Prepare files dictionary
+        files = {}
+        for file_path, content in body.items():
+            if not isinstance(content, str):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Content for file '{file_path}' must be a string"
+                )
+            files[file_path] = content
+        
+        # Save files in bulk
+        saved = await config.code_storage.save_files_bulk(project_id, files)
+        
+        # Prepare response with the stored metadata
+        result = {}
+        for file_path, metadata in saved.items():
+            result[file_path] = {
+                "hash": metadata.hash,
+                "size": metadata.size,
+                "timestamp": metadata.timestamp
+            }
+        
+        return {
+            "success": True,
+            "project_id": project_id,
+            "file_count": len(result),
+            "files": result
+        }
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        
+        error_details = traceback.format_exc()
+        print(f"ERROR in bulk_save_files: {str(e)}\n{error_details}")
+        
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Failed to save files in bulk",
+                "message": str(e),
+                "type": "bulk_save_error"
+            }
+        )
+
+@router.get("/api/code/{project_id}/bulk")
+async def bulk_get_files(project_id: str, batch_size: int = 100):
+    """
+    Get all files for a project, including their full content.
+
+    The JSON response is streamed while files are read from storage in batches of
+    batch_size, so memory use does not grow with the size of the project.
+
+    Args:
+        project_id: The ID of the project.
+        batch_size: Number of files read from storage at a time (default: 100).
+    """
+    try:
+        files = config.code_storage.iter_project_files(project_id, max(1, batch_size))
+        # Read the first file before responding, so missing projects still get a 404
+        first = await anext(files, None)
+        if first is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No files found for project: {project_id}"
+            )
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+
+        error_details = traceback.format_exc()
+        print(f"ERROR in get_all_project_files: {str(e)}\n{error_details}")
+
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "error": "Failed to retrieve all project files",
+                "message": str(e),
+                "type": "project_all_files_error"
+            }
+        )
+
+    async def json_stream():
+        # Same document as {"project_id": ..., "files": {path: content}}, written file by file
+        yield '{"project_id": ' + json.dumps(project_id) + ', "files": {'
+        file_path, content = first
+        yield json.dumps(file_path) + ': ' + json.dumps(content)
+        try:
+            async for file_path, content in files:
+                yield ', ' + json.dumps(file_path) + ': ' + json.dumps(content)
+        except Exception as e:
+            # The status line is already sent, end with a truncated document the client cannot mistake for success
+            print(f"ERROR in get_all_project_files while streaming: {str(e)}\n{traceback.format_exc()}")
+            return
+        yield '}}'
+
+    return StreamingResponse(json_stream(), media_type="application/json")
+
 # File management endpoints
 @router.get("/api/code/{project_id}/{file_path:path}")
 async def get_file(project_id: str, file_path: str):
@@ -251,25 +483,21 @@ async def get_file(project_id: str, file_path: str):
     Get specific file content with metadata.
     """
     try:
-        content = await config.code_storage.get_file(project_id, file_path)
+        content, metadata = await config.code_storage.get_file_with_metadata(project_id, file_path)
         if content is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"File not found: {file_path}"
             )
         
-        # Calculate metadata
-        content_hash = hashlib.md5(content.encode()).hexdigest()
-        size = len(content)
-        
         return {
             "project_id": project_id,
             "file_path": file_path,
             "content": content,
             "metadata": {
-                "hash": content_hash,
-                "size": size,
-                "timestamp": datetime.now().isoformat()
+                "hash": metadata.hash,
+                "size": metadata.size,
+                "timestamp": metadata.timestamp
             }
         }
     except Exception as e:
@@ -294,23 +522,16 @@ async def get_project_files(project_id: str):
     Get all files for a project (metadata only, not full content).
     """
     try:
-        files = await config.code_storage.get_project_files(project_id)
+        files = await config.code_storage.get_project_metadata(project_id)
 
-        # Return metadata for each file, not full content
+        # Return the stored metadata for each file, content is not read
         result = {}
-        for file_path, content in files.items():
-            # Calculate metadata
-            content_hash = hashlib.md5(content.encode()).hexdigest()
-            size = len(content)
-            
-            # Get a preview (first 100 chars)
-            preview = content[:100] + "..." if len(content) > 100 else content
-            
+        for file_path, metadata in files.items():
             result[file_path] = {
-                "hash": content_hash,
-                "size": size,
-                "preview": preview,
-                "timestamp": datetime.now().isoformat()
+                "hash": metadata.hash,
+                "size": metadata.size,
+                "preview": metadata.preview,
+                "timestamp": metadata.timestamp
             }
         
         return {
@@ -348,20 +569,16 @@ async def save_file(project_id: str, file_path: str, request: Request):
         content = body["content"]
         
         # Save file
-        await config.code_storage.save_file(project_id, file_path, content)
-
-        # Calculate metadata
-        content_hash = hashlib.md5(content.encode()).hexdigest()
-        size = len(content)
+        metadata = await config.code_storage.save_file(project_id, file_path, content)
         
         return {
             "success": True,
             "project_id": project_id,
             "file_path": file_path,
             "metadata": {
-                "hash": content_hash,
-                "size": size,
-                "timestamp": datetime.now().isoformat()
+                "hash": metadata.hash,
+                "size": metadata.size,
+                "timestamp": metadata.timestamp
             }
         }
     except Exception as e:
@@ -477,112 +694,3 @@ async def stream_file(project_id: str, file_path: str):
                 "type": "file_stream_error"
             }
         )
-
-@router.post("/api/code/{project_id}/bulk")
-async def bulk_save_files(project_id: str, request: Request):
-    """
-    Bulk save multiple files at once.
-    
-    Accepts a JSON body with a dictionary of file_path -> content mappings.
-    """
-    try:
-        # Parse request body
-        body = await request.json()
-        
-        if not isinstance(body, dict):
-            raise HTTPException(
-                status_code=400,
-                detail="Request body must be a dictionary of file_path -> content mappings"
-            )
-        
-        # Prepare files dictionary
-        files = {}
-        for file_path, content in body.items():
-            if not isinstance(content, str):
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Content for file '{file_path}' must be a string"
-                )
-            files[file_path] = content
-        
-        # Save files in bulk
-        await config.code_storage.save_files_bulk(project_id, files)
-        
-        # Prepare response with metadata
-        result = {}
-        for file_path, content in files.items():
-            # Calculate metadata
-            content_hash = hashlib.md5(content.encode()).hexdigest()
-            size = len(content)
-            
-            result[file_path] = {
-                "hash": content_hash,
-                "size": size,
-                "timestamp": datetime.now().isoformat()
-            }
-        
-        return {
-            "success": True,
-            "project_id": project_id,
-            "file_count": len(result),
-            "files": result
-        }
-    except Exception as e:
-        if isinstance(e, HTTPException):
-            raise e
-        
-        error_details = traceback.format_exc()
-        print(f"ERROR in bulk_save_files: {str(e)}\n{error_details}")
-        
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Failed to save files in bulk",
-                "message": str(e),
-                "type": "bulk_save_error"
-            }
-        )
-
-@router.get("/api/code/{project_id}/bulk")
-async def bulk_get_files(project_id: str):
-    """
-    Get all files for a project, including their full content.
-
-    Args:
-        project_id: The ID of the project.
-        include_metadata: Whether to include hash, size, and timestamp metadata for each file (default: True).
-    """
-    try:
-        # Retrieve all files from storage
-        files = await config.code_storage.get_project_files(project_id)
-        if not files:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No files found for project: {project_id}"
-            )
-
-        # Prepare response
-        result = {}
-        for file_path, content in files.items():
-            result[file_path] = content
-
-        return {
-            "project_id": project_id,
-            "files": result
-        }
-
-    except Exception as e:
-        if isinstance(e, HTTPException):
-            raise e
-
-        error_details = traceback.format_exc()
-        print(f"ERROR in get_all_project_files: {str(e)}\n{error_details}")
-
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Failed to retrieve all project files",
-                "message": str(e),
-                "type": "project_all_files_error"
-            }
-        )
@@ -1,6 +1,6 @@
 import typer
 from InquirerPy import prompt
-from core.orchestrator import generate_backend
+from core.orchestrator import stream_backend
 from models.generate import GenerateRequest
 import os
 import subprocess
@@ -93,10 +93,10 @@ def generate(
     )
     
     try:
-        project_files = generate_backend(request)
+        files, commands = stream_backend(request)
 
-        # Save files
-        for path, content in project_files.files.items():
+        # Save files as they are rendered
+        for path, content in files:
             full_path = os.path.join(project_path, path)
 
             print(f"Creating file: {full_path}")
@@ -106,7 +106,7 @@ def generate(
                 f.write(content)
 
         # Run commands
-        for command in project_files.commands:
+        for command in commands:
             print(f"Running command: {command} path: {project_path}")
             subprocess.run(command.split(' '), cwd=os.path.abspath(project_path))
 
@@ -4,8 +4,9 @@ from typing import Optional
 
 from strands.models import Model
 
-from core.storage.storage_provider import RedisStorage
+from core.storage.storage_provider import RedisStorage, DedupRedisStorage
 from core.storage.code_storage import CodeStorage
+from core.storage.file_cache import create_file_cache_from_env
 
 
 class SingletonMeta(type):
@@ -91,13 +92,22 @@ class Config(metaclass=SingletonMeta):
             'socket_connect_timeout': 5,
             'socket_timeout': 5,
             'retry_on_timeout': True,
-            'health_check_interval': 30
+            'health_check_interval': int(self._get_env("REDIS_HEALTH_CHECK_INTERVAL", "30"))
         }
         
-        # Pass connection parameters instead of client
-        storage_provider = RedisStorage(redis_params)
+        # Connections are pooled per event loop by the provider. With REDIS_DEDUP=1 identical
+        # file contents are stored once and shared between projects.
+        storage_class = DedupRedisStorage if self._get_env("REDIS_DEDUP", "0") == "1" else RedisStorage
+        storage_provider = storage_class(
+            redis_params,
+            max_connections=int(self._get_env("REDIS_MAX_CONNECTIONS", "50")),
+            pool_timeout=float(self._get_env("REDIS_POOL_TIMEOUT", "20")),
+            compression_threshold=int(self._get_env("REDIS_COMPRESSION_THRESHOLD", "4096"))
+        )
         
-        return CodeStorage(storage_provider)
+        # In-process read cache sized by CODE_STORAGE_CACHE_MAX_BYTES (0 disables it), kept coherent
+        # across workers through Redis pub/sub
+        return CodeStorage(storage_provider, cache=create_file_cache_from_env())
     
     def _create_ai_provider(self) -> Model:
         """Create AI provider instance using configuration.
@@ -1,7 +1,25 @@
+import asyncio
+import threading
 from strands import Agent
 from core.storage.code_storage import CodeStorage
 from strands import tool
-from typing import Dict, List, Any, Optional, TypedDict, Union
+from typing import Any, Awaitable, Dict, List, Optional, TypedDict, TypeVar, Union
+
+T = TypeVar("T")
+
+# Tools are called synchronously, from threads of the agent's own event loop. Storage
+# calls share one long-lived loop instead of creating and closing a loop per call.
+_storage_loop: Optional[asyncio.AbstractEventLoop] = None
+_storage_loop_lock = threading.Lock()
+
+def _run_storage(coroutine: Awaitable[T]) -> T:
+    """Run a code storage coroutine on the shared tools event loop and wait for its result"""
+    global _storage_loop
+    with _storage_loop_lock:
+        if _storage_loop is None:
+            _storage_loop = asyncio.new_event_loop()
+            threading.Thread(target=_storage_loop.run_forever, name="code-tools-storage", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coroutine, _storage_loop).result()
 
 # Base response model
 class BaseResponse(TypedDict):
@@ -52,12 +70,9 @@ def read_file(file_path: str, agent: Agent) -> ReadFileResponse:
             "message": "Agent has no access to code base."
         }
     
-    # Use asyncio to run the async method in a synchronous context
-    import asyncio
-    
     # Check if file exists and get its content
     try:
-        file_content = asyncio.run(code_storage.get_file(project_id, file_path))
+        file_content = _run_storage(code_storage.get_file(project_id, file_path))
         if file_content is None:
             return {
                 "status": "error",
@@ -98,11 +113,9 @@ def write_file(file_path: str, file_content: str, agent: Agent) -> BaseResponse:
             "message": "Agent has no access to code base."
         }
     
-    import asyncio
-    
     # Check if file exists before updating
     try:
-        existing_content = asyncio.run(code_storage.get_file(project_id, file_path))
+        existing_content = _run_storage(code_storage.get_file(project_id, file_path))
         if existing_content is None:
             return {
                 "status": "error",
@@ -110,7 +123,7 @@ def write_file(file_path: str, file_content: str, agent: Agent) -> BaseResponse:
             }
         
         # Update the file
-        asyncio.run(code_storage.save_file(project_id, file_path, file_content))
+        _run_storage(code_storage.save_file(project_id, file_path, file_content))
         return {
             "status": "success",
             "message": f"File updated successfully: {file_path}"
@@ -145,11 +158,9 @@ def create_file(file_path: str, file_content: str, agent: Agent) -> BaseResponse
             "message": "Agent has no access to code base."
         }
     
-    import asyncio
-    
     # Check if file already exists
     try:
-        existing_content = asyncio.run(code_storage.get_file(project_id, file_path))
+        existing_content = _run_storage(code_storage.get_file(project_id, file_path))
         if existing_content is not None:
             return {
                 "status": "error",
@@ -157,7 +168,7 @@ def create_file(file_path: str, file_content: str, agent: Agent) -> BaseResponse
             }
         
         # Create the file
-        asyncio.run(code_storage.save_file(project_id, file_path, file_content))
+        _run_storage(code_storage.save_file(project_id, file_path, file_content))
         return {
             "status": "success",
             "message": f"File created successfully: {file_path}"
@@ -190,11 +201,9 @@ def delete_file(file_path: str, agent: Agent) -> BaseResponse:
             "message": "Agent has no access to code base."
         }
     
-    import asyncio
-    
     # Check if file exists before deleting
     try:
-        existing_content = asyncio.run(code_storage.get_file(project_id, file_path))
+        existing_content = _run_storage(code_storage.get_file(project_id, file_path))
         if existing_content is None:
             return {
                 "status": "error",
@@ -202,7 +211,7 @@ def delete_file(file_path: str, agent: Agent) -> BaseResponse:
             }
         
         # Delete the file
-        asyncio.run(code_storage.delete_file(project_id, file_path))
+        _run_storage(code_storage.delete_file(project_id, file_path))
         return {
             "status": "success",
             "message": f"File deleted successfully: {file_path}"
@@ -236,12 +245,11 @@ def search_files_by_name(file_name: str, agent: Agent) -> SearchFilesByNameRespo
             "message": "Agent has no access to code base."
         }
     
-    import asyncio
     import fnmatch
     
     try:
         # Get all project files
-        project_files = asyncio.run(code_storage.get_project_files(project_id))
+        project_files = _run_storage(code_storage.get_project_files(project_id))
         
         # Filter files by name pattern
         matching_files = []
@@ -291,11 +299,9 @@ def search_file_by_content(partial_content: str, agent: Agent) -> SearchFileByCo
             "message": "Agent has no access to code base."
         }
     
-    import asyncio
-    
     try:
         # Get all project files
-        project_files = asyncio.run(code_storage.get_project_files(project_id))
+        project_files = _run_storage(code_storage.get_project_files(project_id))
         
         # Search for content in files
         matches = []
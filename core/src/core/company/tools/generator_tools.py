@@ -1,14 +1,18 @@
+import json
+from typing import Optional
 from strands import Agent, tool
-from pydbml import PyDBML
 
 from core.generators.generator_factory import get_generator
 from core.scafoldr_schema.dbml_scafoldr_schema_maker import DbmlScafoldrSchemaMaker
-from core.orchestrator import generate_backend
+from core.orchestrator import generate_backend, generate_backend_incremental
 from models.generate import GenerateRequest, GenerateResponse
 from config.config import Config
 
 config = Config()
 
+# Project state holding the request of the last scaffold, to regenerate incrementally
+SCAFFOLD_SNAPSHOT_STATE = "scaffold"
+
 @tool
 async def validate_dbml(agent: Agent, dbml_schema: str) -> str:
     """Validates the provided DBML schema string.
@@ -23,8 +27,7 @@ async def validate_dbml(agent: Agent, dbml_schema: str) -> str:
         A string indicating whether the DBML is valid or an error message if invalid
     """
     try:
-        PyDBML(dbml_schema)
-        # Simple validation could be checking for required keywords
+        # Parsing raises on invalid DBML, the parsed schema is cached for scaffold_project
         schema_maker = DbmlScafoldrSchemaMaker()
         scafoldr_schema = schema_maker.from_dbml(dbml=dbml_schema, project_name="validation_temp")
 
@@ -73,11 +76,28 @@ async def scaffold_project(agent: Agent, project_name: str, dbml_schema: str) ->
     )
 
     try:
+        project_id = agent.state.get('project_id')
+        previous_request = await _load_scaffold_snapshot(project_id)
+
+        if previous_request and previous_request.backend_option == request.backend_option:
+            # Only re-render and store the files affected by the schema edit
+            change_set = generate_backend_incremental(previous_request, request)
+            if change_set.files:
+                await config.code_storage.save_files_bulk(project_id=project_id, files=change_set.files)
+            for file_path in change_set.deleted:
+                await config.code_storage.delete_file(project_id, file_path)
+            await _save_scaffold_snapshot(project_id, request)
+
+            summary = (f"{len(change_set.added)} added, {len(change_set.modified)} modified, "
+                       f"{len(change_set.deleted)} deleted")
+            print(f"Incrementally updated project '{project_name}': {summary}.")
+            return f"Project '{project_name}' updated successfully: {summary} files."
+
         project_files = generate_backend(request)
         print(f"Scaffolded project '{project_name}' with {len(project_files.files)} files.")
 
-        project_id = agent.state.get('project_id')
         await config.code_storage.save_files_bulk(project_id=project_id, files=project_files.files)
+        await _save_scaffold_snapshot(project_id, request)
         print(f"Saved scaffolded project '{project_name}' files to code storage.")
 
         return f"Project '{project_name}' scaffolded successfully with {len(project_files.files)} files."
@@ -85,4 +105,15 @@ async def scaffold_project(agent: Agent, project_name: str, dbml_schema: str) ->
         print(f"Error during project scaffolding: {str(e)}")
         return f"Error during project scaffolding: {str(e)}"
 
-    
\ No newline at end of file
+async def _load_scaffold_snapshot(project_id: str) -> Optional[GenerateRequest]:
+    """Load the request of the last scaffold of a project, if there is one"""
+    try:
+        snapshot = await config.code_storage.get_project_state(project_id, SCAFFOLD_SNAPSHOT_STATE)
+        return GenerateRequest(**json.loads(snapshot)) if snapshot else None
+    except Exception as e:
+        print(f"Ignoring unreadable scaffold snapshot: {str(e)}")
+        return None
+
+async def _save_scaffold_snapshot(project_id: str, request: GenerateRequest):
+    """Store the request of a scaffold so the next one can be incremental"""
+    await config.code_storage.set_project_state(project_id, SCAFFOLD_SNAPSHOT_STATE, request.model_dump_json())
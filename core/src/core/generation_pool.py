@@ -0,0 +1,235 @@
+import asyncio
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Worker processes running /generate per API process, 0 (the default) runs generations on
+# the API threadpool instead. Every uvicorn worker starts its own pool.
+GENERATION_POOL_WORKERS = int(os.getenv("GENERATION_POOL_WORKERS", "0"))
+
+# Generations allowed to wait for a free worker before requests are rejected
+GENERATION_POOL_QUEUE = int(os.getenv("GENERATION_POOL_QUEUE", str(2 * max(GENERATION_POOL_WORKERS, 1))))
+
+class GenerationPoolFull(Exception):
+    """Raised when every worker is busy and the queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Generation queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class GenerationPoolUnavailable(Exception):
+    """Raised when the pool is shut down or a worker process died"""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _run_job(submitted_at: float, func: Callable, args: tuple,
+             worker_stats: Optional[Callable[[], Dict[str, Any]]]) -> Tuple[float, Any, int, Optional[Dict[str, Any]]]:
+    """Worker entry point, returns the time the job started, its result and the worker's stats"""
+    started_at = time.time()
+    result = func(*args)
+    return started_at, result, os.getpid(), worker_stats() if worker_stats else None
+
+
+def merge_stats(snapshots: List[Any]) -> Any:
+    """Combine stats() snapshots of several processes.
+
+    Counters are summed (limits such as max_bytes too, giving the total capacity), lists
+    are joined without duplicates, other values are taken from the first snapshot and
+    hit ratios are recomputed from the summed hits and misses.
+    """
+    snapshots = [snapshot for snapshot in snapshots if snapshot is not None]
+    if not snapshots:
+        return None
+    first = snapshots[0]
+    if isinstance(first, dict):
+        keys = list(dict.fromkeys(key for snapshot in snapshots for key in snapshot))
+        merged = {key: merge_stats([snapshot.get(key) for snapshot in snapshots]) for key in keys}
+        if "hit_ratio" in merged and "hits" in merged and "misses" in merged:
+            hits = merged["hits"] + merged.get("shared_hits", 0)
+            lookups = hits + merged["misses"]
+            merged["hit_ratio"] = hits / lookups if lookups else 0.0
+        return merged
+    if isinstance(first, list):
+        return list(dict.fromkeys(item for snapshot in snapshots for item in snapshot))
+    if isinstance(first, (int, float)) and not isinstance(first, bool):
+        return sum(snapshots)
+    return first
+
+
+class GenerationPool:
+    """Bounded process pool for CPU-bound generations.
+
+    At most `max_workers + max_queue` jobs are accepted at a time, further submissions
+    fail fast with GenerationPoolFull so callers can answer with a Retry-After instead
+    of piling up work. A job holds its slot until the worker is done with it, even when
+    the awaiting caller was cancelled. The executor is created on first use, with spawned
+    workers since the API process runs threads, and replaced when a worker process dies.
+
+    With `worker_stats`, each job also returns that function's result in the worker, and
+    the latest snapshot of every worker is kept for worker_stats().
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, initializer: Optional[Callable[[], None]] = None,
+                 worker_stats: Optional[Callable[[], Dict[str, Any]]] = None):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.initializer = initializer
+        self.worker_stats_func = worker_stats
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Latest worker_stats() snapshot per worker pid of the current executor
+        self._worker_stats: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    @property
+    def queued(self) -> int:
+        """Jobs accepted but not yet picked up by a worker"""
+        return max(0, self.in_flight - self.max_workers)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer
+            )
+            self._worker_stats.clear()
+        return self._executor
+
+    def _retry_after(self) -> int:
+        """Seconds until a slot is likely free, from the average run time"""
+        average = self.run_seconds / self.completed if self.completed else 1.0
+        return max(1, math.ceil(average * (self.queued + 1) / self.max_workers))
+
+    async def run(self, func: Callable, *args) -> Any:
+        """Run a picklable function in the pool and return its result"""
+        with self._lock:
+            if self._closed:
+                raise GenerationPoolUnavailable("Generation pool is shut down")
+            if self.in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise GenerationPoolFull(self._retry_after())
+            self.in_flight += 1
+            self.submitted += 1
+            executor = self._get_executor()
+
+        submitted_at = time.time()
+        try:
+            future = executor.submit(_run_job, submitted_at, func, args, self.worker_stats_func)
+        except BaseException as e:
+            self._job_failed(executor, e)
+            if isinstance(e, BrokenProcessPool):
+                raise GenerationPoolUnavailable(f"Generation worker died: {e}") from e
+            raise
+        # Accounting happens when the worker is done, not when the caller stops waiting
+        future.add_done_callback(lambda done: self._job_done(executor, submitted_at, done))
+
+        try:
+            _, result, _, _ = await asyncio.wrap_future(future)
+        except BrokenProcessPool as e:
+            raise GenerationPoolUnavailable(f"Generation worker died: {e}") from e
+        return result
+
+    def _job_done(self, executor: ProcessPoolExecutor, submitted_at: float, future: Future):
+        """Release the slot of a finished or cancelled job and record its outcome"""
+        if future.cancelled():
+            self._job_failed(executor, None)
+            return
+        error = future.exception()
+        if error is not None:
+            self._job_failed(executor, error)
+            return
+        started_at, _, pid, worker_stats = future.result()
+        finished_at = time.time()
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+            wait = max(0.0, started_at - submitted_at)
+            self.wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            self.run_seconds += finished_at - max(started_at, submitted_at)
+            if worker_stats is not None and executor is self._executor:
+                self._worker_stats[pid] = worker_stats
+
+    def _job_failed(self, executor: ProcessPoolExecutor, error: Optional[BaseException]):
+        with self._lock:
+            self.in_flight -= 1
+            self.failed += 1
+            broken = isinstance(error, BrokenProcessPool)
+            # Replace the broken executor on the next submission
+            if broken and self._executor is executor:
+                self._executor = None
+        if broken:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def worker_stats(self) -> List[Dict[str, Any]]:
+        """Latest worker_stats() snapshot of every live worker that ran a job"""
+        with self._lock:
+            return list(self._worker_stats.values())
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes, jobs still queued are cancelled"""
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+            self._worker_stats.clear()
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, wait time and outcome counters of the pool"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_seconds": self.wait_seconds / self.completed if self.completed else 0.0,
+                "max_wait_seconds": self.max_wait_seconds,
+                "avg_run_seconds": self.run_seconds / self.completed if self.completed else 0.0,
+            }
+
+
+def _init_worker():
+    """Render entities in-process, the pool already spreads generations over the cores.
+
+    A nested entity pool in every worker would only oversubscribe them.
+    """
+    from core.generators.generator_factory import generator_registry
+    generator_registry.parallel_workers = 0
+    generator_registry.clear()
+
+
+def _worker_cache_stats() -> Dict[str, Any]:
+    """Cache counters of a worker, merged into /metrics by the API process"""
+    from core.orchestrator import generation_cache_stats
+    return generation_cache_stats()
+
+
+# Shared by all /generate requests of the API process, None when disabled
+generation_pool = (
+    GenerationPool(GENERATION_POOL_WORKERS, GENERATION_POOL_QUEUE, initializer=_init_worker,
+                   worker_stats=_worker_cache_stats)
+    if GENERATION_POOL_WORKERS > 0 else None
+)
@@ -1,9 +1,27 @@
 from abc import ABC, abstractmethod
+from typing import Iterator, List, Optional, Tuple
 from models.generate import GenerateResponse
+from core.generators.incremental import ChangeSet
 from models.scafoldr_schema import ScafoldrSchema
+from core.timings import GenerationTimings
 
 class BaseGenerator(ABC):
     @abstractmethod
-    def generate(self, schema: ScafoldrSchema) -> GenerateResponse:
-        """Generate files from ScafoldrSchema and return a dict of {path: content}"""
+    def generate(self, schema: ScafoldrSchema, timings: Optional[GenerationTimings] = None) -> GenerateResponse:
+        """Generate files from ScafoldrSchema and return a dict of {path: content}.
+
+        When timings is given, per-stage durations and counts are recorded in it.
+        """
         pass
+
+    def iter_generate(self, schema: ScafoldrSchema, timings: Optional[GenerationTimings] = None) -> Iterator[Tuple[str, str]]:
+        """Generate files from ScafoldrSchema, yielding (path, content) pairs as they are rendered"""
+        yield from self.generate(schema, timings).files.items()
+
+    def generate_incremental(self, previous: ScafoldrSchema, schema: ScafoldrSchema) -> ChangeSet:
+        """Generate only the files that differ between two versions of a schema"""
+        return ChangeSet.compare(self.generate(previous).files, self.generate(schema).files)
+
+    def get_commands(self) -> List[str]:
+        """Commands to run after the generated files are written"""
+        return []
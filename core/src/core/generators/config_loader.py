@@ -1,3 +1,4 @@
+import hashlib
 import json
 import os
 from pathlib import Path
@@ -45,4 +46,20 @@ class ConfigurationLoader:
             if rule.enabled:
                 template_path = template_dir / rule.template
                 if not template_path.exists():
-                    raise FileNotFoundError(f"Template not found for rule '{rule.name}': {template_path}")
\ No newline at end of file
+                    raise FileNotFoundError(f"Template not found for rule '{rule.name}': {template_path}")
+
+    @staticmethod
+    def fingerprint(template_dir: Path) -> str:
+        """Compute a cheap fingerprint of a template directory from file paths, sizes and mtimes"""
+        digest = hashlib.sha1()
+        for root, dirs, filenames in os.walk(template_dir):
+            dirs.sort()
+            for filename in sorted(filenames):
+                file_path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                relative_path = os.path.relpath(file_path, template_dir)
+                digest.update(f"{relative_path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+        return digest.hexdigest()
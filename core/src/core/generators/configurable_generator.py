@@ -1,8 +1,16 @@
+import atexit
 import os
+import re
+import hashlib
 import fnmatch
+import multiprocessing
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List
-from jinja2 import Environment, FileSystemLoader
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from jinja2 import Environment, FileSystemLoader, meta
 from models.generate import GenerateResponse
 from models.scafoldr_schema import ScafoldrSchema, Entity
 from core.generators.base_generator import BaseGenerator
@@ -10,13 +18,106 @@ from core.generators.config_loader import ConfigurationLoader
 from core.generators.type_mapper import TypeMapper
 from core.generators.variable_resolver import VariableResolver
 from core.generators.relationship_handler import RelationshipHandler
+from core.generators.render_context import RenderContext
+from core.generators.incremental import SchemaDiff, ChangeSet, entities_by_table
+from core.generators.render_cache import RenderCache, RENDER_CACHE_VERSION
+from core.timings import GenerationTimings, optional_stage, timed_files
+from core.generators.template_cache import expression_cache, create_bytecode_cache
+
+# Static files at least this large are only read when they are first generated
+STATIC_FILE_LAZY_THRESHOLD = 256 * 1024
+
+# Below this many entities the process pool overhead outweighs parallel rendering
+PARALLEL_MIN_ENTITIES = 32
+
+# Template variables that expose more than the rendered entity and the global variables
+SCHEMA_WIDE_VARIABLES = {"schema", "entities", "database_schema", "relationships", "associations"}
+
+# Shared process pools, one per worker count so generators get the size they ask for
+_process_pools: Dict[int, ProcessPoolExecutor] = {}
+_process_pool_lock = threading.Lock()
+
+def _get_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Get the process pool with max_workers workers shared by generators, creating it on first use"""
+    with _process_pool_lock:
+        pool = _process_pools.get(max_workers)
+        if pool is None:
+            # Spawned, forking a process that runs threads (e.g. the API server) can deadlock
+            pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+            _process_pools[max_workers] = pool
+        return pool
+
+def shutdown_process_pool(wait: bool = True):
+    """Stop the worker processes of the shared pools, they are created again on next use"""
+    with _process_pool_lock:
+        pools = list(_process_pools.values())
+        _process_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+atexit.register(shutdown_process_pool)
+
+def _render_entity_chunk(config_path: str, schema: ScafoldrSchema, rule_indexes: List[int], start: int, stop: int):
+    """Process pool entry point, renders a slice of entities with a warm generator of the worker"""
+    from core.generators.generator_factory import generator_registry
+    generator = generator_registry.get(config_path)
+    return generator._render_entity_chunk(schema, rule_indexes, start, stop)
+
+@dataclass
+class StaticFileEntry:
+    """A static file from the template directory, resolved to its output path.
+
+    Large files are read on first use rather than when the manifest is built, so
+    generators that never emit static files (e.g. in entity rendering workers) do not
+    load them. Once read, the content is kept like that of small files. Changes on disk
+    are picked up when the registry rebuilds the generator on a new fingerprint.
+    """
+    source_path: Path
+    output_path: str
+    # None until a large file was read
+    is_text: Optional[bool]
+    content: Union[str, bytes, None] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def read(self) -> Union[str, bytes]:
+        """Return the file content, decoded when it is text"""
+        if self.content is None:
+            with self._lock:
+                if self.content is None:
+                    with open(self.source_path, 'rb') as f:
+                        data = f.read()
+                    try:
+                        self.content = _decode_text(data)
+                        self.is_text = True
+                    except UnicodeDecodeError:
+                        # Handle binary files
+                        self.content = data
+                        self.is_text = False
+        return self.content
+
+def _decode_text(data: bytes) -> str:
+    """Decode UTF-8 with universal newlines, the same as reading in text mode"""
+    return data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
 
 class ConfigurableGenerator(BaseGenerator):
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, parallel_workers: int = 0, render_cache: Optional[RenderCache] = None):
         self.config_path = config_path
+        # Opt-in: render entity files in a process pool when more than one worker is set
+        self.parallel_workers = parallel_workers
         self.config = ConfigurationLoader.load(config_path)
         self.template_dir = Path(config_path).parent
         
+        # Rendered files are cached by a hash of everything that goes into rendering them
+        self.render_cache = render_cache
+        self._generator_digest = self._compute_generator_digest() if render_cache is not None else None
+        
+        # (rule name, template) -> whether the rule reads the whole schema, see _depends_on_schema
+        self._schema_dependencies: Dict[Tuple[str, str], bool] = {}
+        
+        # Static files are scanned and read once, see _get_static_manifest
+        self._static_manifest: Optional[List[StaticFileEntry]] = None
+        self._static_manifest_lock = threading.Lock()
+        
         # Initialize components
         self.type_mapper = TypeMapper(self.config.type_mappings)
         self.variable_resolver = VariableResolver(self.config.variables, self.type_mapper)
@@ -27,41 +128,175 @@ class ConfigurableGenerator(BaseGenerator):
             loader=FileSystemLoader(str(self.template_dir)),
             trim_blocks=True,
             lstrip_blocks=True,
+            bytecode_cache=create_bytecode_cache("templates"),
         )
         
         # Register custom filters and functions
         self._register_plugins()
     
-    def generate(self, schema: ScafoldrSchema) -> GenerateResponse:
+    def generate(self, schema: ScafoldrSchema, timings: Optional[GenerationTimings] = None) -> GenerateResponse:
         """Generate files based on configuration"""
         files = {}
-        entities = schema.backend_schema.entities if schema.backend_schema else []
+        for output_path, content in self.iter_generate(schema, timings):
+            files[output_path] = content
+        
+        return GenerateResponse(files=files, commands=self.get_commands())
+    
+    def iter_generate(self, schema: ScafoldrSchema, timings: Optional[GenerationTimings] = None) -> Iterator[Tuple[str, str]]:
+        """Generate files based on configuration, yielding (path, content) pairs as they are rendered.
+        
+        Files are yielded in the same order as generate() adds them. A path may be yielded
+        more than once, in which case the later content replaces the earlier one.
+        When timings is given, static files, every rule and relationship work are recorded as stages.
+        """
+        render_context = RenderContext(schema, self.variable_resolver, self.relationship_handler, timings)
+        entities = render_context.entities
         
         # Generate static files
         if self.config.generation_rules.static_files.enabled:
-            files.update(self._generate_static_files())
+            yield from timed_files(timings, "static_files", self._iter_static_files())
         
         # Generate entity-based files
-        for rule in self.config.generation_rules.entity_based:
-            if rule.enabled:
-                files.update(self._generate_entity_files(rule, entities, schema))
+        if self.parallel_workers > 1 and len(entities) >= PARALLEL_MIN_ENTITIES:
+            yield from timed_files(
+                timings, "entity:parallel",
+                self._iter_lazy(self._generate_entity_files_parallel, entities, schema),
+                entities=len(entities),
+            )
+        else:
+            for rule in self.config.generation_rules.entity_based:
+                if rule.enabled:
+                    yield from timed_files(
+                        timings, f"entity:{rule.name}",
+                        self._iter_entity_files(rule, entities, schema, render_context),
+                        entities=len(entities),
+                    )
         
         # Generate aggregate files
         for rule in self.config.generation_rules.aggregate:
             if rule.enabled:
-                files.update(self._generate_aggregate_files(rule, entities, schema))
+                yield from timed_files(
+                    timings, f"aggregate:{rule.name}",
+                    self._iter_lazy(self._generate_aggregate_files, rule, entities, schema, render_context),
+                    entities=len(entities),
+                )
+    
+    def _iter_lazy(self, generate_files, *args) -> Iterator[Tuple[str, str]]:
+        """Call a method returning a dict of files only when the iterator is first advanced"""
+        yield from generate_files(*args).items()
+    
+    def generate_incremental(self, previous: ScafoldrSchema, schema: ScafoldrSchema) -> ChangeSet:
+        """Re-render only the outputs affected by the differences between two schema versions.
         
-        # Get post-generation commands
-        commands = []
-        if self.config.commands:
-            commands = self.config.commands.post_generation
+        Entity-based files are rendered for added, modified and removed entities (and for
+        entities on either side of a changed reference), aggregate files only when their
+        template or variables use entities, refs or the schema. Rules that read the whole
+        schema are re-rendered for every entity. Affected outputs are rendered for both
+        versions and compared, so unchanged outputs are left out of the change set.
+        Static files do not depend on the schema and only show up in the change set when
+        they are replaced by a rendered file.
+        """
+        diff = SchemaDiff.between(previous, schema)
+        if not diff.has_changes:
+            return ChangeSet()
+        
+        if diff.globals_changed:
+            # Global variables reach every template, compare complete generations
+            return ChangeSet.compare(dict(self.iter_generate(previous)), dict(self.iter_generate(schema)))
         
-        return GenerateResponse(files=files, commands=commands)
+        affected = diff.added_entities | diff.modified_entities | diff.removed_entities | diff.ref_tables
+        return ChangeSet.compare(
+            self._render_affected(previous, affected, diff),
+            self._render_affected(schema, affected, diff),
+        )
+    
+    def _render_affected(self, schema: ScafoldrSchema, affected: set, diff: SchemaDiff) -> Dict[str, str]:
+        """Render the entity-based and aggregate outputs affected by a schema diff"""
+        files = {}
+        render_context = RenderContext(schema, self.variable_resolver, self.relationship_handler)
+        entities = render_context.entities
+        affected_entities = [entity for name, entity in entities_by_table(schema).items() if name in affected]
+        
+        for rule in self.config.generation_rules.entity_based:
+            if not rule.enabled:
+                continue
+            if self._depends_on_schema(rule, entity_based=True):
+                if diff.entities_changed or diff.refs_changed:
+                    files.update(self._iter_entity_files(rule, entities, schema, render_context))
+            elif affected_entities:
+                files.update(self._iter_entity_files(rule, affected_entities, schema, render_context))
+        
+        for rule in self.config.generation_rules.aggregate:
+            if rule.enabled and self._depends_on_schema(rule, entity_based=False):
+                files.update(self._generate_aggregate_files(rule, entities, schema, render_context))
+        
+        return files
+    
+    def _depends_on_schema(self, rule, entity_based: bool) -> bool:
+        """Check whether a rule's template or variables use more than its entity and global variables"""
+        key = (rule.name, rule.template)
+        depends = self._schema_dependencies.get(key)
+        if depends is not None:
+            return depends
+        
+        variable_configs = [rule.variables]
+        if entity_based:
+            variable_configs += [
+                self.config.variables.get("entity_context", {}),
+                self.config.variables.get("computed", {}),
+            ]
+        
+        try:
+            source = self.jinja_env.loader.get_source(self.jinja_env, rule.template)[0]
+            ast = self.jinja_env.parse(source)
+            if list(meta.find_referenced_templates(ast)):
+                # Included templates are not analyzed
+                depends = True
+            else:
+                names = meta.find_undeclared_variables(ast)
+                names |= set(re.findall(r"[A-Za-z_]\w*", str(variable_configs)))
+                depends = bool(names & SCHEMA_WIDE_VARIABLES)
+        except Exception:
+            depends = True
+        
+        self._schema_dependencies[key] = depends
+        return depends
+    
+    def get_commands(self) -> List[str]:
+        """Get post-generation commands"""
+        if self.config.commands:
+            return self.config.commands.post_generation
+        return []
     
     def _generate_static_files(self) -> Dict[str, str]:
         """Generate static (non-template) files"""
+        return dict(self._iter_static_files())
+    
+    def _iter_static_files(self) -> Iterator[Tuple[str, Union[str, bytes]]]:
+        """Yield static (non-template) files from the manifest"""
+        for entry in self._get_static_manifest():
+            yield entry.output_path, entry.read()
+    
+    def invalidate_static_manifest(self):
+        """Forget the static file manifest, it will be rebuilt on the next generation"""
+        with self._static_manifest_lock:
+            self._static_manifest = None
+    
+    def _get_static_manifest(self) -> List[StaticFileEntry]:
+        """Get the static file manifest, building it on first use"""
+        manifest = self._static_manifest
+        if manifest is not None:
+            return manifest
+        
+        with self._static_manifest_lock:
+            if self._static_manifest is None:
+                self._static_manifest = self._build_static_manifest()
+            return self._static_manifest
+    
+    def _build_static_manifest(self) -> List[StaticFileEntry]:
+        """Walk the template directory and resolve every static file once"""
         static_config = self.config.generation_rules.static_files
-        files = {}
+        manifest = []
         
         for root, _, filenames in os.walk(self.template_dir):
             for filename in filenames:
@@ -76,15 +311,6 @@ class ConfigurableGenerator(BaseGenerator):
                 if not self._matches_patterns(str(relative_path), static_config.include_patterns):
                     continue
                 
-                # Read file content
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                except UnicodeDecodeError:
-                    # Handle binary files
-                    with open(file_path, 'rb') as f:
-                        content = f.read()
-                
                 # Apply transformations
                 output_path = str(relative_path)
                 for old_name, new_name in (static_config.transformations or {}).items():
@@ -95,61 +321,189 @@ class ConfigurableGenerator(BaseGenerator):
                 for old_path, new_path in (static_config.path_transformations or {}).items():
                     output_path = output_path.replace(old_path, new_path)
                 
-                files[output_path] = content
+                manifest.append(self._load_static_file(file_path, output_path))
         
-        return files
+        return manifest
     
-    def _generate_entity_files(self, rule, entities: List[Entity], schema: ScafoldrSchema) -> Dict[str, str]:
+    def _load_static_file(self, file_path: Path, output_path: str) -> StaticFileEntry:
+        """Read a static file, deferring the read when it is large"""
+        if file_path.stat().st_size >= STATIC_FILE_LAZY_THRESHOLD:
+            return StaticFileEntry(source_path=file_path, output_path=output_path, is_text=None)
+        
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        
+        try:
+            return StaticFileEntry(source_path=file_path, output_path=output_path, is_text=True, content=_decode_text(data))
+        except UnicodeDecodeError:
+            # Handle binary files
+            return StaticFileEntry(source_path=file_path, output_path=output_path, is_text=False, content=data)
+    
+    def _generate_entity_files(self, rule, entities: List[Entity], schema: ScafoldrSchema, render_context: Optional[RenderContext] = None) -> Dict[str, str]:
         """Generate files for each entity"""
-        files = {}
+        return dict(self._iter_entity_files(rule, entities, schema, render_context))
+    
+    def _iter_entity_files(self, rule, entities: List[Entity], schema: ScafoldrSchema, render_context: Optional[RenderContext] = None) -> Iterator[Tuple[str, str]]:
+        """Yield the file of each entity for an entity-based rule"""
+        render_context = render_context or RenderContext(schema, self.variable_resolver, self.relationship_handler)
         
         try:
             template = self.jinja_env.get_template(rule.template)
         except Exception as e:
             print(f"Error loading template '{rule.template}': {e}")
-            return files
+            return
         
         for entity in entities:
             try:
-                # Resolve variables for this entity
-                variables = self.variable_resolver.resolve_entity_variables(entity, schema)
-                global_vars = self.variable_resolver.resolve_global_variables(schema)
-                
-                # Add rule-specific variables
-                if rule.variables:
-                    rule_vars = self.variable_resolver.resolve_rule_variables(rule.variables, entity, schema)
-                    if isinstance(rule_vars, dict):
-                        variables.update(rule_vars)
-                
-                # Combine all variables
-                context = {
-                    **global_vars,
-                    **variables,
-                    "entity": entity,
-                    "schema": schema,
-                    "computed": variables.get("computed", {})
-                }
-                
-                # Render template
-                content = template.render(context)
-                
-                # Resolve output path
-                output_path_template = self.jinja_env.from_string(rule.output_path)
-                output_path = output_path_template.render(context)
-                
-                files[output_path] = content
-                
+                output_path, content = self._render_entity_file(rule, template, entity, render_context)
             except Exception as e:
                 print(f"Error generating file for entity '{entity.names.pascal_case.singular}' with rule '{rule.name}': {e}")
-                import traceback
                 traceback.print_exc()
                 continue
+            
+            yield output_path, content
+    
+    def _render_entity_file(self, rule, template, entity: Entity, render_context: RenderContext) -> Tuple[str, str]:
+        """Render one entity-based rule for one entity, returns (output_path, content)"""
+        schema = render_context.schema
         
-        return files
+        cache_key = None
+        if self.render_cache is not None:
+            cache_key = self._render_cache_key(rule, render_context, entity)
+            cached = self.render_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        # Variables for this entity are resolved once and shared by all rules
+        variables = dict(render_context.entity_variables(entity))
+        global_vars = render_context.global_variables()
+        
+        # Add rule-specific variables
+        if rule.variables:
+            rule_vars = self.variable_resolver.resolve_rule_variables(
+                rule.variables, entity, schema, computed=render_context.computed_variables(entity)
+            )
+            if isinstance(rule_vars, dict):
+                variables.update(rule_vars)
+        
+        # Combine all variables
+        context = {
+            **global_vars,
+            **variables,
+            "entity": entity,
+            "schema": schema,
+            "computed": variables.get("computed", {}),
+            "relationships": render_context.relationship_graph()
+        }
+        
+        # Render template
+        content = template.render(context)
+        
+        # Resolve output path
+        output_path_template = self._from_string(rule.output_path)
+        output_path = output_path_template.render(context)
+        
+        if cache_key is not None:
+            self.render_cache.set(cache_key, output_path, content)
+        
+        return output_path, content
+    
+    def _render_cache_key(self, rule, render_context: RenderContext, entity: Optional[Entity] = None) -> str:
+        """Hash of everything that determines a rendered file: generator, rule, variables and entity"""
+        parts = [RENDER_CACHE_VERSION, self._generator_digest, rule.name, render_context.global_digest()]
+        if entity is None or self._depends_on_schema(rule, entity_based=True):
+            parts.append(render_context.schema_digest())
+        if entity is not None:
+            parts.append(render_context.entity_digest(entity))
+        return hashlib.sha256("|".join(parts).encode('utf-8')).hexdigest()
+    
+    def _compute_generator_digest(self) -> str:
+        """Content hash of the template configuration and every file in the template directory"""
+        digest = hashlib.sha256(self.config.model_dump_json().encode('utf-8'))
+        for root, dirs, filenames in os.walk(self.template_dir):
+            dirs.sort()
+            for filename in sorted(filenames):
+                file_path = Path(root) / filename
+                digest.update(str(file_path.relative_to(self.template_dir)).encode('utf-8'))
+                with open(file_path, 'rb') as f:
+                    digest.update(hashlib.sha256(f.read()).digest())
+        return digest.hexdigest()
+    
+    def _generate_entity_files_parallel(self, entities: List[Entity], schema: ScafoldrSchema) -> Dict[str, str]:
+        """Render all entity-based rules for all entities in the shared process pool.
+        
+        Entities are split into contiguous chunks, one task per chunk. Results are merged
+        in (rule, entity) order so the output is identical to sequential generation, and
+        errors are collected per entity and reported after all chunks completed.
+        """
+        rule_indexes = []
+        for rule_index, rule in enumerate(self.config.generation_rules.entity_based):
+            if not rule.enabled:
+                continue
+            try:
+                self.jinja_env.get_template(rule.template)
+            except Exception as e:
+                print(f"Error loading template '{rule.template}': {e}")
+                continue
+            rule_indexes.append(rule_index)
+        
+        if not rule_indexes:
+            return {}
+        
+        chunk_size = -(-len(entities) // self.parallel_workers)
+        config_path = os.path.abspath(self.config_path)
+        pool = _get_process_pool(self.parallel_workers)
+        
+        rendered = []
+        errors = []
+        try:
+            futures = [
+                pool.submit(_render_entity_chunk, config_path, schema, rule_indexes, start, min(start + chunk_size, len(entities)))
+                for start in range(0, len(entities), chunk_size)
+            ]
+            for future in futures:
+                chunk_rendered, chunk_errors = future.result()
+                rendered.extend(chunk_rendered)
+                errors.extend(chunk_errors)
+        except Exception as e:
+            print(f"Warning: Parallel entity rendering failed, falling back to sequential rendering: {e}")
+            files = {}
+            for rule_index in rule_indexes:
+                files.update(self._generate_entity_files(self.config.generation_rules.entity_based[rule_index], entities, schema))
+            return files
+        
+        for _, _, message, error_traceback in sorted(errors, key=lambda error: error[:2]):
+            print(message)
+            print(error_traceback, end="")
+        
+        rendered.sort(key=lambda item: item[:2])
+        return {output_path: content for _, _, output_path, content in rendered}
     
-    def _generate_aggregate_files(self, rule, entities: List[Entity], schema: ScafoldrSchema) -> Dict[str, str]:
+    def _render_entity_chunk(self, schema: ScafoldrSchema, rule_indexes: List[int], start: int, stop: int):
+        """Render the given rules for entities[start:stop], collecting errors per entity"""
+        render_context = RenderContext(schema, self.variable_resolver, self.relationship_handler)
+        entities = render_context.entities
+        rendered = []
+        errors = []
+        
+        for rule_index in rule_indexes:
+            rule = self.config.generation_rules.entity_based[rule_index]
+            for entity_index in range(start, stop):
+                entity = entities[entity_index]
+                try:
+                    template = self.jinja_env.get_template(rule.template)
+                    output_path, content = self._render_entity_file(rule, template, entity, render_context)
+                    rendered.append((rule_index, entity_index, output_path, content))
+                except Exception as e:
+                    message = f"Error generating file for entity '{entity.names.pascal_case.singular}' with rule '{rule.name}': {e}"
+                    errors.append((rule_index, entity_index, message, traceback.format_exc()))
+        
+        return rendered, errors
+    
+    def _generate_aggregate_files(self, rule, entities: List[Entity], schema: ScafoldrSchema, render_context: Optional[RenderContext] = None) -> Dict[str, str]:
         """Generate files that process all entities together"""
         files = {}
+        render_context = render_context or RenderContext(schema, self.variable_resolver, self.relationship_handler)
         
         try:
             template = self.jinja_env.get_template(rule.template)
@@ -158,8 +512,17 @@ class ConfigurableGenerator(BaseGenerator):
             return files
         
         try:
+            cache_key = None
+            if self.render_cache is not None:
+                cache_key = self._render_cache_key(rule, render_context)
+                cached = self.render_cache.get(cache_key)
+                if cached is not None:
+                    output_path, content = cached
+                    files[output_path] = content
+                    return files
+            
             # Resolve global variables
-            global_vars = self.variable_resolver.resolve_global_variables(schema)
+            global_vars = render_context.global_variables()
             
             # Prepare context
             context = {
@@ -174,29 +537,40 @@ class ConfigurableGenerator(BaseGenerator):
                 rule_vars = self.variable_resolver.resolve_rule_variables(rule.variables, None, schema, entities)
                 context.update(rule_vars)
             
-            # Add relationship data if needed
-            if self.relationship_handler and "associations" in str(rule.variables):
-                associations = self.relationship_handler.generate_associations(schema.database_schema.refs, entities)
+            # Add relationship data if needed, built once per generation and shared by all rules
+            relationship_graph = render_context.relationship_graph()
+            if relationship_graph and "associations" in str(rule.variables):
+                with optional_stage(render_context.timings, "relationships"):
+                    if entities is render_context.entities:
+                        associations = relationship_graph.associations
+                    else:
+                        associations = self.relationship_handler.generate_associations(schema.database_schema.refs, entities)
                 context["associations"] = associations
             
             # Add backward compatibility for relationships
             # Always provide relationships, even if None, to avoid template errors
-            context["relationships"] = self.relationship_handler
+            context["relationships"] = relationship_graph
             
             # Render template
             content = template.render(context)
             
             # Resolve output path
-            output_path_template = self.jinja_env.from_string(rule.output_path)
+            output_path_template = self._from_string(rule.output_path)
             output_path = output_path_template.render(context)
             
             files[output_path] = content
+            if cache_key is not None:
+                self.render_cache.set(cache_key, output_path, content)
             
         except Exception as e:
             print(f"Error generating aggregate file with rule '{rule.name}': {e}")
         
         return files
     
+    def _from_string(self, source: str):
+        """Get a compiled template for a template string from the shared cache"""
+        return expression_cache.get(self.jinja_env, source)
+    
     def _matches_patterns(self, path: str, patterns: List[str]) -> bool:
         """Check if path matches any of the given patterns"""
         return any(fnmatch.fnmatch(path, pattern) for pattern in patterns)
@@ -1,8 +1,16 @@
 import os
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Any, Optional
 from core.generators.base_generator import BaseGenerator
+from core.generators.config_loader import ConfigurationLoader
 from core.generators.configurable_generator import ConfigurableGenerator
+from core.generators.render_cache import RenderCache, create_render_cache_from_env
+
+# Number of worker processes used to render entity files, 0 or 1 renders in-process
+GENERATION_ENTITY_WORKERS = int(os.getenv("GENERATION_ENTITY_WORKERS", "0"))
 
 # Mapping from backend option to template directory name
 BACKEND_TO_TEMPLATE_DIR = {
@@ -11,7 +19,86 @@ BACKEND_TO_TEMPLATE_DIR = {
     "next-js-typescript": "next-js",
 }
 
-def get_generator(backend_option: str) -> BaseGenerator:
+@dataclass
+class _RegistryEntry:
+    generator: ConfigurableGenerator
+    fingerprint: str
+    checked_at: float
+
+
+class GeneratorRegistry:
+    """Process-wide cache of fully initialized generators.
+
+    Building a ConfigurableGenerator loads and validates the template configuration,
+    creates Jinja environments and registers plugins, so generators are kept warm and
+    only rebuilt when the fingerprint of their template directory changes. The
+    fingerprint is re-checked at most once per `check_interval` seconds.
+    """
+
+    def __init__(self, check_interval: float = 1.0, parallel_workers: int = 0, render_cache: Optional[RenderCache] = None):
+        self.check_interval = check_interval
+        self.parallel_workers = parallel_workers
+        self.render_cache = render_cache
+        self._entries: Dict[str, _RegistryEntry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, config_path: str) -> ConfigurableGenerator:
+        """Return a warm generator for the configuration file, building it if needed"""
+        key = os.path.abspath(config_path)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry.checked_at < self.check_interval:
+                self.hits += 1
+                return entry.generator
+
+        # Fingerprint outside the lock, it touches the filesystem
+        fingerprint = ConfigurationLoader.fingerprint(Path(key).parent)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.fingerprint == fingerprint:
+                entry.checked_at = now
+                self.hits += 1
+                return entry.generator
+
+            if entry:
+                self.invalidations += 1
+            self.misses += 1
+
+            generator = ConfigurableGenerator(key, parallel_workers=self.parallel_workers, render_cache=self.render_cache)
+            self._entries[key] = _RegistryEntry(generator=generator, fingerprint=fingerprint, checked_at=now)
+            return generator
+
+    def clear(self):
+        """Drop all cached generators"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for the registry"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "generators": sorted(self._entries.keys()),
+            }
+
+
+# Shared by all generators, None when disabled with RENDER_CACHE_MAX_BYTES=0
+render_cache = create_render_cache_from_env()
+
+generator_registry = GeneratorRegistry(parallel_workers=GENERATION_ENTITY_WORKERS, render_cache=render_cache)
+
+def get_generator(backend_option: str, use_registry: bool = True) -> BaseGenerator:
     """Get generator for the specified backend option"""
     
     # Find configuration-driven generator
@@ -19,7 +106,9 @@ def get_generator(backend_option: str) -> BaseGenerator:
     config_path = f"./templates/{template_dir}/scafoldr_template_config.json"
     
     if os.path.exists(config_path):
-        return ConfigurableGenerator(config_path)
+        if use_registry:
+            return generator_registry.get(config_path)
+        return ConfigurableGenerator(config_path, parallel_workers=GENERATION_ENTITY_WORKERS, render_cache=render_cache)
     
     raise ValueError(f"No generator found for backend_option '{backend_option}'. Please ensure a scafoldr_template_config.json file exists in ./templates/{template_dir}/")
 
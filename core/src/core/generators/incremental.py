@@ -0,0 +1,94 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+from models.scafoldr_schema import ScafoldrSchema, Entity
+
+def entities_by_table(schema: ScafoldrSchema) -> Dict[str, Entity]:
+    """Map table names to the entities created from them"""
+    entities = schema.backend_schema.entities if schema.backend_schema else []
+    tables = schema.database_schema.tables
+
+    # Schema makers create one entity per table, in table order
+    if len(tables) == len(entities):
+        return {table.name: entity for table, entity in zip(tables, entities)}
+    return {entity.names.snake_case.singular: entity for entity in entities}
+
+@dataclass
+class SchemaDiff:
+    """Differences between two versions of a ScafoldrSchema, by table name"""
+    added_entities: Set[str] = field(default_factory=set)
+    modified_entities: Set[str] = field(default_factory=set)
+    removed_entities: Set[str] = field(default_factory=set)
+    # Tables on either side of a reference that was added or removed
+    ref_tables: Set[str] = field(default_factory=set)
+    refs_changed: bool = False
+    # Project metadata, backend settings or entity order changed
+    globals_changed: bool = False
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(
+            self.added_entities or self.modified_entities or self.removed_entities
+            or self.refs_changed or self.globals_changed
+        )
+
+    @property
+    def entities_changed(self) -> bool:
+        return bool(self.added_entities or self.modified_entities or self.removed_entities)
+
+    @classmethod
+    def between(cls, previous: ScafoldrSchema, current: ScafoldrSchema) -> "SchemaDiff":
+        diff = cls()
+
+        previous_entities = entities_by_table(previous)
+        current_entities = entities_by_table(current)
+
+        diff.added_entities = set(current_entities) - set(previous_entities)
+        diff.removed_entities = set(previous_entities) - set(current_entities)
+        diff.modified_entities = {
+            name for name in set(previous_entities) & set(current_entities)
+            if previous_entities[name] != current_entities[name]
+        }
+
+        previous_refs = [ref.model_dump_json() for ref in previous.database_schema.refs]
+        current_refs = [ref.model_dump_json() for ref in current.database_schema.refs]
+        diff.refs_changed = previous_refs != current_refs
+        changed_refs = set(previous_refs) ^ set(current_refs)
+        for ref in previous.database_schema.refs + current.database_schema.refs:
+            if ref.model_dump_json() in changed_refs:
+                diff.ref_tables.update((ref.col1.table, ref.col2.table))
+
+        previous_globals = previous.model_dump(exclude={"database_schema": True, "backend_schema": {"entities"}})
+        current_globals = current.model_dump(exclude={"database_schema": True, "backend_schema": {"entities"}})
+        same_order = [name for name in previous_entities if name in current_entities] == \
+            [name for name in current_entities if name in previous_entities]
+        diff.globals_changed = previous_globals != current_globals or not same_order
+
+        return diff
+
+@dataclass
+class ChangeSet:
+    """Generated files that changed between two schema versions"""
+    added: Dict[str, str] = field(default_factory=dict)
+    modified: Dict[str, str] = field(default_factory=dict)
+    deleted: List[str] = field(default_factory=list)
+
+    @property
+    def files(self) -> Dict[str, str]:
+        """Files that have to be written, added and modified"""
+        return {**self.added, **self.modified}
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.modified or self.deleted)
+
+    @classmethod
+    def compare(cls, previous_files: Dict[str, str], current_files: Dict[str, str]) -> "ChangeSet":
+        """Build a change set from the outputs rendered for the previous and current schema"""
+        return cls(
+            added={path: content for path, content in current_files.items() if path not in previous_files},
+            modified={
+                path: content for path, content in current_files.items()
+                if path in previous_files and previous_files[path] != content
+            },
+            deleted=[path for path in previous_files if path not in current_files],
+        )
@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+from models.scafoldr_schema import ScafoldrSchema, Entity, Reference, RefColumn
+from core.generators.relationship_handler import RelationshipHandler
+
+# DBML reference types
+REF_KINDS = {
+    ">": "many_to_one",
+    "<": "many_to_one",
+    "-": "one_to_one",
+    "<>": "many_to_many",
+}
+
+@dataclass
+class RelationshipEdge:
+    """A reference between two tables, oriented from the referencing (many) side"""
+    ref: Reference
+    kind: str
+    many_col: RefColumn
+    one_col: RefColumn
+
+    @property
+    def many_table(self) -> str:
+        return self.many_col.table
+
+    @property
+    def one_table(self) -> str:
+        return self.one_col.table
+
+
+class RelationshipGraph:
+    """Relationships of a schema, built once per generation and shared by all templates.
+
+    Edges, reverse edges and join tables are computed on first access, and association
+    snippets rendered by the RelationshipHandler are cached per reference. Other
+    attributes are looked up on the handler, so the graph can be used wherever templates
+    expect `relationships`.
+    """
+
+    def __init__(self, schema: ScafoldrSchema, entities: List[Entity], relationship_handler: RelationshipHandler):
+        self.schema = schema
+        self.refs: List[Reference] = schema.database_schema.refs
+        self.entities = entities
+        self.relationship_handler = relationship_handler
+        self._edges: Optional[List[RelationshipEdge]] = None
+        self._many_to_one: Dict[str, List[RelationshipEdge]] = {}
+        self._one_to_many: Dict[str, List[RelationshipEdge]] = {}
+        self._join_tables: Optional[Set[str]] = None
+        self._associations: Optional[List[str]] = None
+        self._entity_by_table: Optional[Dict[str, Entity]] = None
+        # Keyed by (generator name, id(ref)), refs are kept alive by the schema
+        self._ref_associations: Dict[tuple, List[str]] = {}
+
+    @property
+    def entity_by_table(self) -> Dict[str, Entity]:
+        """Entities of the schema by table name, shared by all association lookups"""
+        if self._entity_by_table is None:
+            self._entity_by_table = self.relationship_handler.index_entities(self.entities)
+        return self._entity_by_table
+
+    @property
+    def edges(self) -> List[RelationshipEdge]:
+        if self._edges is None:
+            self._build_edges()
+        return self._edges
+
+    def _build_edges(self):
+        edges = []
+        for ref in self.refs:
+            kind = REF_KINDS.get(ref.type)
+            if kind is None:
+                continue
+            if ref.type == "<":
+                edge = RelationshipEdge(ref=ref, kind=kind, many_col=ref.col2, one_col=ref.col1)
+            else:
+                edge = RelationshipEdge(ref=ref, kind=kind, many_col=ref.col1, one_col=ref.col2)
+            edges.append(edge)
+            self._many_to_one.setdefault(edge.many_table, []).append(edge)
+            self._one_to_many.setdefault(edge.one_table, []).append(edge)
+        self._edges = edges
+
+    def many_to_one(self, table: str) -> List[RelationshipEdge]:
+        """References from a table to the tables it points at"""
+        if self._edges is None:
+            self._build_edges()
+        return self._many_to_one.get(table, [])
+
+    def one_to_many(self, table: str) -> List[RelationshipEdge]:
+        """Reverse edges, references from other tables to a table"""
+        if self._edges is None:
+            self._build_edges()
+        return self._one_to_many.get(table, [])
+
+    @property
+    def join_tables(self) -> Set[str]:
+        """Tables that only link two or more other tables, every column is a key or reference"""
+        if self._join_tables is None:
+            join_tables = set()
+            for table in self.schema.database_schema.tables:
+                outgoing = self.many_to_one(table.name)
+                targets = {edge.one_table for edge in outgoing}
+                if len(targets) < 2:
+                    continue
+                fk_columns = {edge.many_col.name for edge in outgoing}
+                if all(column.pk or column.name in fk_columns for column in table.columns):
+                    join_tables.add(table.name)
+            self._join_tables = join_tables
+        return self._join_tables
+
+    @property
+    def associations(self) -> List[str]:
+        """Associations generated from the configured patterns for all references"""
+        if self._associations is None:
+            self._associations = self.relationship_handler.generate_associations(self.refs, self.entities, self.entity_by_table)
+        return self._associations
+
+    def generate_sequelize_associations(self, ref: Reference, entities: List[Entity] = None) -> List[str]:
+        return self._cached_associations("sequelize", ref, entities)
+
+    def generate_jpa_associations(self, ref: Reference, entities: List[Entity] = None) -> List[str]:
+        return self._cached_associations("jpa", ref, entities)
+
+    def _cached_associations(self, kind: str, ref: Reference, entities: Optional[List[Entity]]) -> List[str]:
+        generate = getattr(self.relationship_handler, f"generate_{kind}_associations")
+        # Only results for this graph's entities are cached
+        if entities is not self.entities:
+            return generate(ref, entities)
+
+        key = (kind, id(ref))
+        associations = self._ref_associations.get(key)
+        if associations is None:
+            associations = generate(ref, entities, self.entity_by_table)
+            self._ref_associations[key] = associations
+        return associations
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes the graph does not define
+        handler = self.__dict__.get("relationship_handler")
+        if handler is None:
+            raise AttributeError(name)
+        return getattr(handler, name)
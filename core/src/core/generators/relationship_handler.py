@@ -1,29 +1,89 @@
+import re
 from typing import Dict, List, Any, Optional
 from models.template_config import RelationshipConfig
 from models.scafoldr_schema import Reference, Entity
 from jinja2 import Environment, BaseLoader
+from core.generators.template_cache import expression_cache, create_bytecode_cache
+
+# Conditions that only compare the reference type are matched without Jinja
+_REF_TYPE_CONDITION = re.compile(r"""^\s*ref\.type\s*==\s*(['"])([^'"]*)\1\s*$""")
+
+class _CompiledPattern:
+    """An association pattern with its condition and side expressions compiled once"""
+    
+    def __init__(self, name: str, pattern: Any, jinja_env: Environment):
+        self.name = name
+        self.pattern = pattern
+        match = _REF_TYPE_CONDITION.match(pattern.condition)
+        self.ref_type = match.group(2) if match else None
+        self.condition_template = None
+        self.many_side_template = None
+        self.one_side_template = None
+        self.templates = None
+        self.error = None
+        try:
+            if self.ref_type is None:
+                self.condition_template = expression_cache.get(jinja_env, f"{{{{ {pattern.condition} }}}}")
+            self.many_side_template = expression_cache.get(jinja_env, f"{{{{ {pattern.many_side} }}}}")
+            self.one_side_template = expression_cache.get(jinja_env, f"{{{{ {pattern.one_side} }}}}")
+            self.templates = [expression_cache.get(jinja_env, source) for source in pattern.templates]
+        except Exception as e:
+            # Reported when the pattern is used, like expressions compiled on demand
+            self.error = e
+
 
 class RelationshipHandler:
     def __init__(self, relationship_config: Optional[RelationshipConfig]):
         self.config = relationship_config
-        self.jinja_env = Environment(loader=BaseLoader())
+        self.jinja_env = Environment(loader=BaseLoader(), bytecode_cache=create_bytecode_cache("expressions"))
+        self._patterns = self._compile_patterns()
+    
+    def _compile_patterns(self) -> List[_CompiledPattern]:
+        """Compile the association patterns in configuration order"""
+        if not self.config or not self.config.association_patterns:
+            return []
+        return [
+            _CompiledPattern(name, pattern, self.jinja_env)
+            for name, pattern in self.config.association_patterns.items()
+        ]
+    
+    @staticmethod
+    def index_entities(entities: List[Entity]) -> Dict[str, Entity]:
+        """Map table names to entities.
+
+        The handler is shared by all generations, so the index is not kept here: callers
+        that resolve many references, such as RelationshipGraph, build it once per
+        generation and pass it as entity_by_table.
+        """
+        index: Dict[str, Entity] = {}
+        for entity in entities:
+            # Keep the first entity for a table name, like a linear search would
+            index.setdefault(entity.names.snake_case.singular, entity)
+        return index
+    
+    def _from_string(self, source: str):
+        """Get a compiled template for an expression string from the shared cache"""
+        return expression_cache.get(self.jinja_env, source)
     
-    def generate_associations(self, refs: List[Reference], entities: List[Entity]) -> List[str]:
+    def generate_associations(self, refs: List[Reference], entities: List[Entity],
+                              entity_by_table: Optional[Dict[str, Entity]] = None) -> List[str]:
         """Generate association code based on database references"""
         if not self.config or not self.config.association_patterns:
             return []
         
         associations = []
+        if entity_by_table is None:
+            entity_by_table = self.index_entities(entities)
         
         for ref in refs:
             # Find matching pattern
-            pattern = self._find_matching_pattern(ref)
-            if not pattern:
+            compiled = self._match_pattern(ref)
+            if not compiled:
                 continue
             
             # Get entities involved in the relationship
-            many_entity, one_entity, many_col, one_col = self._resolve_relationship_entities(
-                ref, entities, pattern
+            many_entity, one_entity, many_col, one_col = self._resolve_compiled_entities(
+                ref, entity_by_table, compiled
             )
             
             if not many_entity or not one_entity:
@@ -38,14 +98,14 @@ class RelationshipHandler:
                 'one_col': one_col
             }
             
-            for template_str in pattern.templates:
-                template = self.jinja_env.from_string(template_str)
+            for template in compiled.templates:
                 association = template.render(context)
                 associations.append(association)
         
         return associations
     
-    def generate_sequelize_associations(self, ref: Reference, entities: List[Entity] = None) -> List[str]:
+    def generate_sequelize_associations(self, ref: Reference, entities: List[Entity] = None,
+                                        entity_by_table: Optional[Dict[str, Entity]] = None) -> List[str]:
         """Generate Sequelize-specific associations (for backward compatibility)"""
         if not entities:
             return []
@@ -62,8 +122,10 @@ class RelationshipHandler:
             many_col, one_col = ref.col2, ref.col1
         
         # Find entities by table name
-        many_entity = next((e for e in entities if e.names.snake_case.singular == many_col.table), None)
-        one_entity = next((e for e in entities if e.names.snake_case.singular == one_col.table), None)
+        if entity_by_table is None:
+            entity_by_table = self.index_entities(entities)
+        many_entity = entity_by_table.get(many_col.table)
+        one_entity = entity_by_table.get(one_col.table)
         
         if many_entity and one_entity:
             many_model = many_entity.names.pascal_case.singular
@@ -81,21 +143,34 @@ class RelationshipHandler:
     
     def _find_matching_pattern(self, ref: Reference) -> Optional[Any]:
         """Find the association pattern that matches the reference"""
-        if not self.config or not self.config.association_patterns:
-            return None
-        
-        for pattern_name, pattern in self.config.association_patterns.items():
-            if self._evaluate_pattern_condition(pattern.condition, ref):
-                return pattern
+        compiled = self._match_pattern(ref)
+        return compiled.pattern if compiled else None
+    
+    def _match_pattern(self, ref: Reference) -> Optional[_CompiledPattern]:
+        """Find the compiled pattern that matches the reference"""
+        for compiled in self._patterns:
+            if compiled.ref_type is not None:
+                if ref.type == compiled.ref_type:
+                    return compiled
+            elif self._render_condition(compiled.pattern.condition, compiled.condition_template or compiled.error, ref):
+                return compiled
         
         return None
     
     def _evaluate_pattern_condition(self, condition: str, ref: Reference) -> bool:
         """Evaluate if a pattern condition matches the reference"""
         try:
-            context = {'ref': ref}
-            template = self.jinja_env.from_string(f"{{{{ {condition} }}}}")
-            result = template.render(context)
+            template = self._from_string(f"{{{{ {condition} }}}}")
+        except Exception as e:
+            template = e
+        return self._render_condition(condition, template, ref)
+    
+    def _render_condition(self, condition: str, template, ref: Reference) -> bool:
+        """Render a compiled condition, template is the compile error if compiling failed"""
+        try:
+            if isinstance(template, Exception):
+                raise template
+            result = template.render({'ref': ref})
             return result.lower() in ['true', '1', 'yes']
         except Exception as e:
             print(f"Warning: Failed to evaluate pattern condition '{condition}': {e}")
@@ -103,29 +178,34 @@ class RelationshipHandler:
     
     def _resolve_relationship_entities(self, ref: Reference, entities: List[Entity], pattern: Any) -> tuple:
         """Resolve the entities and columns involved in a relationship"""
+        compiled = next((c for c in self._patterns if c.pattern is pattern), None)
+        if compiled is None:
+            try:
+                compiled = _CompiledPattern("", pattern, self.jinja_env)
+            except Exception as e:
+                print(f"Warning: Failed to resolve relationship entities: {e}")
+                return None, None, None, None
+        return self._resolve_compiled_entities(ref, self.index_entities(entities), compiled)
+    
+    def _resolve_compiled_entities(self, ref: Reference, entity_by_table: Dict[str, Entity], compiled: _CompiledPattern) -> tuple:
         try:
-            # Evaluate many_side and one_side expressions
-            many_side_expr = pattern.many_side
-            one_side_expr = pattern.one_side
+            if compiled.error is not None:
+                raise compiled.error
             
             context = {'ref': ref}
             
-            # Get many side column
-            many_template = self.jinja_env.from_string(f"{{{{ {many_side_expr} }}}}")
-            many_col = many_template.render(context)
-            
-            # Get one side column  
-            one_template = self.jinja_env.from_string(f"{{{{ {one_side_expr} }}}}")
-            one_col = one_template.render(context)
+            # Evaluate many_side and one_side expressions
+            many_col = compiled.many_side_template.render(context)
+            one_col = compiled.one_side_template.render(context)
             
             # Find entities by table name
             many_entity = None
             one_entity = None
             
             if hasattr(many_col, 'table'):
-                many_entity = next((e for e in entities if e.names.snake_case.singular == many_col.table), None)
+                many_entity = entity_by_table.get(many_col.table)
             if hasattr(one_col, 'table'):
-                one_entity = next((e for e in entities if e.names.snake_case.singular == one_col.table), None)
+                one_entity = entity_by_table.get(one_col.table)
             
             return many_entity, one_entity, many_col, one_col
             
@@ -133,7 +213,8 @@ class RelationshipHandler:
             print(f"Warning: Failed to resolve relationship entities: {e}")
             return None, None, None, None
     
-    def generate_jpa_associations(self, ref: Reference, entities: List[Entity] = None) -> List[str]:
+    def generate_jpa_associations(self, ref: Reference, entities: List[Entity] = None,
+                                  entity_by_table: Optional[Dict[str, Entity]] = None) -> List[str]:
         """Generate JPA/Hibernate associations"""
         if not entities:
             return []
@@ -150,8 +231,10 @@ class RelationshipHandler:
             many_col, one_col = ref.col2, ref.col1
         
         # Find entities by table name
-        many_entity = next((e for e in entities if e.names.snake_case.singular == many_col.table), None)
-        one_entity = next((e for e in entities if e.names.snake_case.singular == one_col.table), None)
+        if entity_by_table is None:
+            entity_by_table = self.index_entities(entities)
+        many_entity = entity_by_table.get(many_col.table)
+        one_entity = entity_by_table.get(one_col.table)
         
         if many_entity and one_entity:
             many_class = many_entity.names.pascal_case.singular
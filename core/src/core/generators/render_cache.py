@@ -0,0 +1,206 @@
+import json
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Bump when the layout of cached values or cache keys changes
+RENDER_CACHE_VERSION = "1"
+
+class BaseRenderCacheBackend(ABC):
+    """Shared store for rendered files, keyed by content hash"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: str):
+        pass
+
+
+class DiskRenderCache(BaseRenderCacheBackend):
+    """Render cache stored as files in a local directory, shared by all processes on a host"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def set(self, key: str, value: str):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class RedisRenderCache(BaseRenderCacheBackend):
+    """Render cache stored in Redis, shared by all workers"""
+
+    def __init__(self, redis_params: Dict[str, Any], ttl: int = 7 * 24 * 3600, prefix: str = "render"):
+        import redis
+
+        self.client = redis.Redis(**redis_params)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(f"{self.prefix}:{key}")
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, key: str, value: str):
+        self.client.set(f"{self.prefix}:{key}", value, ex=self.ttl)
+
+
+class RenderCache:
+    """Two-level cache of rendered (output_path, content) pairs.
+
+    Entries are kept in a byte-bounded in-process LRU and, when configured, in a shared
+    backend so other workers and later processes can reuse them. Backend errors are
+    reported and otherwise ignored, a cache must never break generation.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, shared: Optional[BaseRenderCacheBackend] = None):
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self._entries: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        if self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except Exception as e:
+                print(f"Warning: Failed to read from shared render cache: {e}")
+                value = None
+            if value is not None:
+                output_path, content = json.loads(value)
+                self._store_local(key, (output_path, content))
+                with self._lock:
+                    self.shared_hits += 1
+                return output_path, content
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, output_path: str, content: str):
+        self._store_local(key, (output_path, content))
+        if self.shared is not None:
+            try:
+                self.shared.set(key, json.dumps([output_path, content]))
+            except Exception as e:
+                print(f"Warning: Failed to write to shared render cache: {e}")
+
+    def _store_local(self, key: str, entry: Tuple[str, str]):
+        size = len(entry[0]) + len(entry[1])
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[0]) + len(previous[1])
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[0]) + len(evicted[1])
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all locally cached entries"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and memory usage of the local cache"""
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "shared_backend": type(self.shared).__name__ if self.shared is not None else None,
+            }
+
+
+def create_render_cache_from_env() -> Optional[RenderCache]:
+    """Create the render cache configured by environment variables.
+
+    RENDER_CACHE_MAX_BYTES bounds the in-process cache (0 disables render caching).
+    RENDER_CACHE_BACKEND selects an optional shared backend: "disk" (stored under
+    RENDER_CACHE_DIR) or "redis" (using the REDIS_* connection settings).
+    """
+    max_bytes = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    if max_bytes <= 0:
+        return None
+
+    shared = create_shared_backend(
+        os.getenv("RENDER_CACHE_BACKEND", ""),
+        os.getenv("RENDER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "scafoldr-render-cache")),
+        prefix="render",
+    )
+    return RenderCache(max_bytes=max_bytes, shared=shared)
+
+
+def create_shared_backend(backend: str, directory: str, prefix: str) -> Optional[BaseRenderCacheBackend]:
+    """Create a shared cache backend by name: "disk" (stored under directory) or "redis".
+
+    Redis connections use the REDIS_* settings and keys are namespaced by prefix.
+    Returns None for an empty name, or when the backend can not be set up.
+    """
+    backend = backend.lower()
+    try:
+        if backend == "disk":
+            return DiskRenderCache(directory)
+        if backend == "redis":
+            return RedisRenderCache({
+                'host': os.getenv("REDIS_HOST", "redis"),
+                'port': int(os.getenv("REDIS_PORT", "6379")),
+                'db': int(os.getenv("REDIS_DB", "0")),
+                'password': os.getenv("REDIS_PASSWORD"),
+                'socket_connect_timeout': 5,
+                'socket_timeout': 5,
+            }, prefix=prefix)
+        if backend:
+            print(f"Warning: Unknown {prefix} cache backend '{backend}', using the in-process cache only")
+    except Exception as e:
+        print(f"Warning: Failed to set up shared {prefix} cache backend '{backend}': {e}")
+    return None
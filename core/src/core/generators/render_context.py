@@ -0,0 +1,88 @@
+import hashlib
+import json
+from typing import Dict, Any, List, Optional
+from models.scafoldr_schema import ScafoldrSchema, Entity
+from core.generators.variable_resolver import VariableResolver
+from core.generators.relationship_handler import RelationshipHandler
+from core.generators.relationship_graph import RelationshipGraph
+from core.timings import GenerationTimings
+
+class RenderContext:
+    """Variables resolved during a single generate() call.
+
+    Global variables are resolved once per call, entity variables (entity_context
+    and computed) once per entity and the relationship graph once per schema, then
+    shared by every entity-based and aggregate rule.
+    A RenderContext is not thread-safe and must not outlive the generation it belongs to.
+    """
+
+    def __init__(self, schema: ScafoldrSchema, variable_resolver: VariableResolver, relationship_handler: Optional[RelationshipHandler] = None,
+                 timings: Optional[GenerationTimings] = None):
+        self.schema = schema
+        # Stage timings of the generation this context belongs to, if recorded
+        self.timings = timings
+        self.entities: List[Entity] = schema.backend_schema.entities if schema.backend_schema else []
+        self.variable_resolver = variable_resolver
+        self.relationship_handler = relationship_handler
+        self._relationship_graph: Optional[RelationshipGraph] = None
+        self._global_variables: Optional[Dict[str, Any]] = None
+        # Keyed by id(), entities are kept alive by the schema for the whole generation
+        self._entity_variables: Dict[int, Dict[str, Any]] = {}
+        self._computed_variables: Dict[int, Dict[str, Any]] = {}
+        self._entity_digests: Dict[int, str] = {}
+        self._global_digest: Optional[str] = None
+        self._schema_digest: Optional[str] = None
+
+    def global_variables(self) -> Dict[str, Any]:
+        """Global variables, resolved on first access"""
+        if self._global_variables is None:
+            self._global_variables = self.variable_resolver.resolve_global_variables(self.schema)
+        return self._global_variables
+
+    def relationship_graph(self) -> Optional[RelationshipGraph]:
+        """Relationship graph of the schema, None when the template has no relationship config"""
+        if self._relationship_graph is None and self.relationship_handler is not None:
+            self._relationship_graph = RelationshipGraph(self.schema, self.entities, self.relationship_handler)
+        return self._relationship_graph
+
+    def entity_variables(self, entity: Entity) -> Dict[str, Any]:
+        """Entity context and computed variables of an entity, resolved on first access"""
+        key = id(entity)
+        variables = self._entity_variables.get(key)
+        if variables is None:
+            variables = self.variable_resolver.resolve_entity_variables(entity, self.schema)
+            self._entity_variables[key] = variables
+        return variables
+
+    def computed_variables(self, entity: Entity) -> Dict[str, Any]:
+        """Only the computed variables of an entity, as exposed to rule variables"""
+        key = id(entity)
+        computed = self._computed_variables.get(key)
+        if computed is None:
+            variables = self.entity_variables(entity)
+            computed_config = self.variable_resolver.variables_config.get("computed", {})
+            computed = {name: variables[name] for name in computed_config if name in variables}
+            self._computed_variables[key] = computed
+        return computed
+
+    def global_digest(self) -> str:
+        """Content hash of the resolved global variables"""
+        if self._global_digest is None:
+            serialized = json.dumps(self.global_variables(), sort_keys=True, default=str)
+            self._global_digest = hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+        return self._global_digest
+
+    def schema_digest(self) -> str:
+        """Content hash of the whole schema"""
+        if self._schema_digest is None:
+            self._schema_digest = hashlib.sha256(self.schema.model_dump_json().encode('utf-8')).hexdigest()
+        return self._schema_digest
+
+    def entity_digest(self, entity: Entity) -> str:
+        """Content hash of an entity"""
+        key = id(entity)
+        digest = self._entity_digests.get(key)
+        if digest is None:
+            digest = hashlib.sha256(entity.model_dump_json().encode('utf-8')).hexdigest()
+            self._entity_digests[key] = digest
+        return digest
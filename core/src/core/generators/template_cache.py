@@ -0,0 +1,125 @@
+import os
+import stat
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from jinja2 import Environment, FileSystemBytecodeCache, Template
+
+# Directory of the on-disk Jinja bytecode cache. Unset uses a private per-user directory
+# in the system temp dir, an empty string disables the cache.
+JINJA_BYTECODE_CACHE_DIR = os.getenv("JINJA_BYTECODE_CACHE_DIR")
+
+def _ensure_private_directory(directory: str):
+    """Create directory with mode 0700, refuse it unless only the current user can write to it.
+
+    Cached bytecode is loaded and executed, a directory other users can write to would
+    let them run code in this process.
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise OSError(f"'{directory}' is not a directory private to the current user")
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        raise OSError(f"'{directory}' is not owned by the current user")
+
+def create_bytecode_cache(namespace: str) -> Optional[FileSystemBytecodeCache]:
+    """Create an on-disk bytecode cache for an environment, None when disabled.
+
+    Buckets are keyed by template name and validated against the checksum of the
+    template source. The namespace keeps environments with different options apart.
+    """
+    if JINJA_BYTECODE_CACHE_DIR == "":
+        return None
+    pattern = f"{namespace}-%s.cache"
+    try:
+        if JINJA_BYTECODE_CACHE_DIR is None:
+            # Jinja creates a 0700 directory for the current user and checks its owner
+            return FileSystemBytecodeCache(pattern=pattern)
+        _ensure_private_directory(JINJA_BYTECODE_CACHE_DIR)
+        return FileSystemBytecodeCache(JINJA_BYTECODE_CACHE_DIR, pattern=pattern)
+    except (OSError, RuntimeError) as e:
+        print(f"Warning: Jinja bytecode cache disabled, can not use '{JINJA_BYTECODE_CACHE_DIR or 'the default directory'}': {e}")
+        return None
+
+class CompiledTemplateCache:
+    """Bounded, thread-safe LRU cache of templates compiled from strings.
+
+    `Environment.from_string` parses the source, generates Python code and compiles it
+    to bytecode on every call. Variable and relationship expressions are evaluated for
+    every entity and every reference, so each distinct expression is compiled once per
+    environment and reused afterwards.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        # A cached template holds a reference to its environment, so the id() of a
+        # live environment can not be reused by another one while the entry exists.
+        self._templates: "OrderedDict[Tuple[int, str], Template]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, env: Environment, source: str) -> Template:
+        """Return the compiled template for source in env, compiling it on first use"""
+        key = (id(env), source)
+
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                self.hits += 1
+                return template
+            self.misses += 1
+
+        # Compile outside the lock, other expressions can still be served meanwhile
+        template = self._compile(env, source)
+
+        with self._lock:
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+                self.evictions += 1
+
+        return template
+
+    def _compile(self, env: Environment, source: str) -> Template:
+        """Compile source, reusing bytecode from the environment's bytecode cache if any"""
+        bcc = env.bytecode_cache
+        if bcc is None:
+            return env.from_string(source)
+
+        # Expressions have no name, the source itself identifies the bucket
+        bucket = bcc.get_bucket(env, source, None, source)
+        code = bucket.code
+        if code is None:
+            code = env.compile(source)
+            bucket.code = code
+            try:
+                bcc.set_bucket(bucket)
+            except OSError:
+                pass
+        return env.template_class.from_code(env, code, env.make_globals(None), None)
+
+    def clear(self):
+        """Drop all compiled templates"""
+        with self._lock:
+            self._templates.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters for the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "size": len(self._templates),
+                "maxsize": self.maxsize,
+            }
+
+
+# Shared by VariableResolver, RelationshipHandler and ConfigurableGenerator
+expression_cache = CompiledTemplateCache()
@@ -2,33 +2,111 @@ import re
 from typing import Dict, List, Optional, Set
 from models.template_config import TypeMapping
 
+_WHITESPACE = re.compile(r'\s+')
+_SPACE_AROUND_PUNCTUATION = re.compile(r'\s*([(),\[\]])\s*')
+
+def normalize_sql_type(sql_type: str) -> str:
+    """Lowercase a SQL type and normalize its whitespace, e.g. 'VARCHAR (255)' -> 'varchar(255)'"""
+    normalized = _WHITESPACE.sub(' ', sql_type.strip().lower())
+    return _SPACE_AROUND_PUNCTUATION.sub(r'\1', normalized)
+
+
+class _CompiledCondition:
+    """A custom mapping condition compiled once to a Python code object"""
+    
+    def __init__(self, condition: str):
+        self.condition = condition
+        # Handle .contains() method calls first (before other replacements)
+        source = re.sub(r"\.contains\('([^']+)'\)", r".find('\1') != -1", condition)
+        # The SQL type is bound as a variable instead of being substituted into the source
+        source = source.replace("type.lower()", "__sql_lower__")
+        source = source.replace("type", "__sql__")
+        self.source = source
+        try:
+            self.code = compile(source, '<condition>', 'eval')
+            self.error = None
+        except SyntaxError as e:
+            self.code = None
+            self.error = e
+    
+    def __call__(self, sql_type: str) -> bool:
+        type_lower = sql_type.lower()
+        if self.code is None:
+            print(f"Warning: Failed to evaluate condition '{self.condition}' for type '{sql_type}': {self.error}")
+            return False
+        
+        try:
+            # Create a safe evaluation context
+            context = {
+                '__sql__': sql_type,
+                '__sql_lower__': type_lower,
+                'contains': lambda s: s in type_lower,
+                'startswith': lambda s: type_lower.startswith(s),
+                'endswith': lambda s: type_lower.endswith(s),
+                'equals': lambda s: type_lower == s.lower(),
+                'len': len,
+                'str': str,
+                'int': int,
+                'float': float,
+                'bool': bool,
+                'and': lambda a, b: a and b,
+                'or': lambda a, b: a or b,
+                'not': lambda a: not a,
+            }
+            return eval(self.code, {"__builtins__": {}}, context)
+        except Exception as e:
+            print(f"Warning: Failed to evaluate condition '{self.condition}' for type '{sql_type}': {e}")
+            return False
+
+
 class TypeMapper:
     def __init__(self, type_mapping: TypeMapping):
         self.sql_to_framework = type_mapping.sql_to_framework
         self.import_mappings = type_mapping.import_mappings or {}
         self.default_type = type_mapping.default_type
         self.custom_mappings = type_mapping.custom_mappings or []
+        # Conditions are compiled once, results are memoized per normalized SQL type
+        self._conditions = [
+            (_CompiledCondition(mapping.condition), mapping.result) for mapping in self.custom_mappings
+        ]
+        self._resolved: Dict[str, str] = {}
+        self._imports: Dict[str, Optional[str]] = {}
     
     def resolve(self, sql_type: str) -> str:
-        """Resolve SQL type to framework-specific type"""
+        """Resolve SQL type to framework-specific type.
+        
+        Types are matched and conditions evaluated on the normalized type, so spellings
+        that differ only in case or spacing resolve alike and share one memo entry.
+        """
+        sql_type = normalize_sql_type(sql_type)
+        framework_type = self._resolved.get(sql_type)
+        if framework_type is None:
+            framework_type = self._resolve_uncached(sql_type)
+            self._resolved[sql_type] = framework_type
+        return framework_type
+    
+    def _resolve_uncached(self, sql_type: str) -> str:
         # First try exact match
-        framework_type = self.sql_to_framework.get(sql_type.lower())
+        framework_type = self.sql_to_framework.get(sql_type)
         if framework_type:
             return framework_type
         
         # Try custom mappings with conditions
-        for mapping in self.custom_mappings:
-            condition = mapping.condition
-            if self._evaluate_condition(condition, sql_type):
-                return mapping.result
+        for condition, result in self._conditions:
+            if condition(sql_type):
+                return result
         
         # Return default type
         return self.default_type
     
     def get_imports(self, sql_type: str) -> Optional[str]:
         """Get required import for a SQL type"""
-        framework_type = self.resolve(sql_type)
-        return self.import_mappings.get(framework_type)
+        sql_type = normalize_sql_type(sql_type)
+        if sql_type in self._imports:
+            return self._imports[sql_type]
+        import_stmt = self.import_mappings.get(self.resolve(sql_type))
+        self._imports[sql_type] = import_stmt
+        return import_stmt
     
     def get_all_imports(self, sql_types: List[str]) -> Set[str]:
         """Get all required imports for a list of SQL types"""
@@ -45,36 +123,4 @@ class TypeMapper:
     
     def _evaluate_condition(self, condition: str, sql_type: str) -> bool:
         """Evaluate a condition string against SQL type"""
-        # Simple condition evaluation - can be extended
-        type_lower = sql_type.lower()
-        
-        try:
-            # Create a safe evaluation context
-            context = {
-                'type': sql_type,
-                'contains': lambda s: s in type_lower,
-                'startswith': lambda s: type_lower.startswith(s),
-                'endswith': lambda s: type_lower.endswith(s),
-                'equals': lambda s: type_lower == s.lower(),
-                'len': len,
-                'str': str,
-                'int': int,
-                'float': float,
-                'bool': bool,
-                'and': lambda a, b: a and b,
-                'or': lambda a, b: a or b,
-                'not': lambda a: not a,
-            }
-            
-            # Handle .contains() method calls first (before other replacements)
-            condition = re.sub(r"\.contains\('([^']+)'\)", r".find('\1') != -1", condition)
-            
-            # Replace common patterns for easier condition writing
-            condition = condition.replace("type.lower()", f"'{type_lower}'")
-            condition = condition.replace("type", f"'{sql_type}'")
-            
-            # Evaluate the condition
-            return eval(condition, {"__builtins__": {}}, context)
-        except Exception as e:
-            print(f"Warning: Failed to evaluate condition '{condition}' for type '{sql_type}': {e}")
-            return False
\ No newline at end of file
+        return _CompiledCondition(condition)(sql_type)
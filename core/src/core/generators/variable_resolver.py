@@ -2,16 +2,21 @@ from typing import Dict, Any, List
 from jinja2 import Environment, BaseLoader, meta
 from models.scafoldr_schema import ScafoldrSchema, Entity
 from core.generators.type_mapper import TypeMapper
+from core.generators.template_cache import expression_cache, create_bytecode_cache
 
 class VariableResolver:
     def __init__(self, variables_config: Dict[str, Any], type_mapper: TypeMapper):
         self.variables_config = variables_config
         self.type_mapper = type_mapper
-        self.jinja_env = Environment(loader=BaseLoader())
+        self.jinja_env = Environment(loader=BaseLoader(), bytecode_cache=create_bytecode_cache("expressions"))
         
         # Add type_mapper methods to Jinja environment
         self.jinja_env.globals['type_mappings'] = type_mapper
     
+    def _from_string(self, source: str):
+        """Get a compiled template for an expression string from the shared cache"""
+        return expression_cache.get(self.jinja_env, source)
+    
     def resolve_global_variables(self, schema: ScafoldrSchema) -> Dict[str, Any]:
         """Resolve global template variables"""
         global_vars = self.variables_config.get("global", {})
@@ -20,7 +25,7 @@ class VariableResolver:
         resolved = {}
         for key, template_str in global_vars.items():
             if isinstance(template_str, str) and "{{" in template_str:
-                template = self.jinja_env.from_string(template_str)
+                template = self._from_string(template_str)
                 resolved[key] = template.render(context)
             else:
                 resolved[key] = template_str
@@ -43,7 +48,7 @@ class VariableResolver:
         # Resolve entity context variables
         for key, template_str in entity_vars.items():
             if isinstance(template_str, str) and "{{" in template_str:
-                template = self.jinja_env.from_string(template_str)
+                template = self._from_string(template_str)
                 resolved[key] = template.render(context)
             else:
                 resolved[key] = template_str
@@ -57,13 +62,17 @@ class VariableResolver:
         
         return resolved
     
-    def resolve_rule_variables(self, variables: Dict[str, Any], entity: Entity = None, schema: ScafoldrSchema = None, entities: List[Entity] = None) -> Dict[str, Any]:
-        """Resolve rule-specific variables"""
+    def resolve_rule_variables(self, variables: Dict[str, Any], entity: Entity = None, schema: ScafoldrSchema = None, entities: List[Entity] = None, computed: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Resolve rule-specific variables
+        
+        Pass already resolved computed variables of the entity as `computed` to avoid
+        resolving them again for every rule.
+        """
         resolved = {}
         
         # First resolve computed variables if we have an entity
-        computed_vars = {}
-        if entity:
+        computed_vars = computed if computed is not None else {}
+        if entity and computed is None:
             computed_config = self.variables_config.get("computed", {})
             for key, config in computed_config.items():
                 computed_vars[key] = self._resolve_computed_variable(config, entity, {
@@ -93,7 +102,7 @@ class VariableResolver:
                 resolved[key] = self._resolve_computed_variable(config, entity, context, entities)
             elif isinstance(config, str) and "{{" in config:
                 # Resolve template string
-                template = self.jinja_env.from_string(config)
+                template = self._from_string(config)
                 resolved[key] = template.render(context)
             else:
                 resolved[key] = config
@@ -153,7 +162,7 @@ class VariableResolver:
         else:
             # Try to resolve as a template expression
             try:
-                template = self.jinja_env.from_string(f"{{{{ {source} }}}}")
+                template = self._from_string(f"{{{{ {source} }}}}")
                 return template.render(context or {})
             except:
                 return []
@@ -185,7 +194,7 @@ class VariableResolver:
                 item_context = {**context, "attr": item, "item": item}
                 if "{{" in transform:
                     try:
-                        template = self.jinja_env.from_string(transform)
+                        template = self._from_string(transform)
                         result = template.render(item_context)
                         transformed_data.append(result)
                     except Exception as e:
@@ -206,7 +215,7 @@ class VariableResolver:
             for key, template_str in transform.items():
                 if isinstance(template_str, str) and "{{" in template_str:
                     try:
-                        template = self.jinja_env.from_string(template_str)
+                        template = self._from_string(template_str)
                         transformed_item[key] = template.render(item_context)
                     except Exception as e:
                         print(f"Warning: Failed to transform {key} with template '{template_str}': {e}")
@@ -231,7 +240,7 @@ class VariableResolver:
         """Evaluate a filter expression"""
         try:
             # Simple evaluation - can be extended for more complex expressions
-            template = self.jinja_env.from_string(f"{{{{ {filter_expr} }}}}")
+            template = self._from_string(f"{{{{ {filter_expr} }}}}")
             result = template.render(context)
             
             # Handle boolean conversion
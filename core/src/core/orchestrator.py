@@ -1,14 +1,92 @@
-from core.generators.generator_factory import get_generator
-from core.scafoldr_schema.dbml_scafoldr_schema_maker import DbmlScafoldrSchemaMaker
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from core.generators.generator_factory import get_generator, generator_registry, render_cache
+from core.generators.template_cache import expression_cache
+from core.generators.incremental import ChangeSet
+from core.scafoldr_schema.base_scafoldr_schema_maker import names_cache
+from core.scafoldr_schema.dbml_scafoldr_schema_maker import DbmlScafoldrSchemaMaker, schema_cache
+from core.timings import GenerationTimings
 from models.generate import GenerateRequest, GenerateResponse
 
-def generate_backend(request: GenerateRequest) -> GenerateResponse:
+def generate_backend(request: GenerateRequest, timings: Optional[GenerationTimings] = None, report: bool = True) -> GenerateResponse:
+    """Generate the backend for a request.
+
+    Stage timings are recorded in timings (a new instance when None), then logged
+    and added to the stage histograms unless report is False.
+    """
+    if timings is None:
+        timings = GenerationTimings()
+    
     # Create ScafoldrSchema from the request
     schema_maker = DbmlScafoldrSchemaMaker()
-    scafoldr_schema = schema_maker.make_schema(request)
+    scafoldr_schema = schema_maker.make_schema(request, timings)
     
     # Generate code using the schema
     generator = get_generator(request.backend_option)
-    project_files = generator.generate(scafoldr_schema)
+    project_files = generator.generate(scafoldr_schema, timings)
     
+    timings.annotate(
+        backend_option=request.backend_option,
+        entities=len(scafoldr_schema.backend_schema.entities),
+        files=len(project_files.files),
+    )
+    if report:
+        timings.report("generate")
     return project_files
+
+def generate_backend_job(request: GenerateRequest) -> Tuple[GenerateResponse, GenerationTimings]:
+    """Generation pool entry point, the caller reports the returned timings in its own process"""
+    timings = GenerationTimings()
+    return generate_backend(request, timings, report=False), timings
+
+def generation_cache_stats() -> Dict[str, Any]:
+    """Counters of the generation caches of the current process"""
+    return {
+        "generator_registry": generator_registry.stats(),
+        "expression_cache": expression_cache.stats(),
+        "render_cache": render_cache.stats() if render_cache else None,
+        "names_cache": names_cache.stats(),
+        "schema_cache": schema_cache.stats() if schema_cache else None,
+    }
+
+def stream_backend(request: GenerateRequest) -> Tuple[Iterator[Tuple[str, str]], List[str]]:
+    """Like generate_backend, but files are rendered lazily while the returned iterator is consumed.
+
+    The schema is built eagerly, so DBML errors are raised here and not while iterating.
+    Returns the (path, content) iterator and the post-generation commands.
+    """
+    timings = GenerationTimings()
+    schema_maker = DbmlScafoldrSchemaMaker()
+    scafoldr_schema = schema_maker.make_schema(request, timings)
+    
+    generator = get_generator(request.backend_option)
+    files = _report_when_done(
+        generator.iter_generate(scafoldr_schema, timings),
+        timings,
+        backend_option=request.backend_option,
+        entities=len(scafoldr_schema.backend_schema.entities),
+    )
+    return files, generator.get_commands()
+
+def _report_when_done(files: Iterator[Tuple[str, str]], timings: GenerationTimings, **fields) -> Iterator[Tuple[str, str]]:
+    """Pass files through and report the timings once all of them were generated"""
+    count = 0
+    for path, content in files:
+        count += 1
+        yield path, content
+    timings.report("generate_stream", files=count, **fields)
+
+def generate_backend_incremental(previous_request: GenerateRequest, request: GenerateRequest) -> ChangeSet:
+    """Regenerate only the files affected by the changes between two requests.
+
+    Returns the change set of added, modified and deleted paths relative to the files
+    generated for previous_request.
+    """
+    if previous_request.backend_option != request.backend_option:
+        raise ValueError("Incremental generation requires the same backend option for both requests")
+    
+    schema_maker = DbmlScafoldrSchemaMaker()
+    previous_schema = schema_maker.make_schema(previous_request)
+    scafoldr_schema = schema_maker.make_schema(request)
+    
+    generator = get_generator(request.backend_option)
+    return generator.generate_incremental(previous_schema, scafoldr_schema)
@@ -1,12 +1,75 @@
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 import re
+import threading
+from typing import Any, Dict, Optional
 import inflect
 from models.scafoldr_schema import ScafoldrSchema, Names, NameVariations
 
+# Building an inflect engine is expensive, all schema makers share one
+_inflect_engine = inflect.engine()
+_inflect_lock = threading.Lock()
+
+class NamesCache:
+    """Bounded, thread-safe LRU cache of Names keyed by the original name.
+
+    Column names such as `id` or `created_at` repeat in almost every table, so each
+    distinct name is inflected once. Names are immutable, so the cached instance is
+    shared by all callers.
+    """
+
+    def __init__(self, maxsize: int = 8192):
+        self.maxsize = maxsize
+        self._names: "OrderedDict[str, Names]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, original_name: str) -> Optional[Names]:
+        with self._lock:
+            names = self._names.get(original_name)
+            if names is None:
+                self.misses += 1
+                return None
+            self._names.move_to_end(original_name)
+            self.hits += 1
+        return names
+
+    def set(self, original_name: str, names: Names):
+        with self._lock:
+            self._names[original_name] = names
+            self._names.move_to_end(original_name)
+            while len(self._names) > self.maxsize:
+                self._names.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all cached names"""
+        with self._lock:
+            self._names.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters for the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "size": len(self._names),
+                "maxsize": self.maxsize,
+            }
+
+
+# Shared by all schema makers
+names_cache = NamesCache()
+
 class ScafoldrSchemaMaker(ABC):
     
     def __init__(self):
-        self.inflect_engine = inflect.engine()
+        self.inflect_engine = _inflect_engine
     
     def _to_camel_case(self, snake_str: str) -> str:
         """Convert snake_case to camelCase"""
@@ -31,14 +94,23 @@ class ScafoldrSchemaMaker(ABC):
     
     def _pluralize(self, word: str) -> str:
         """Pluralize using inflect library"""
-        return self.inflect_engine.plural(word)
+        with _inflect_lock:
+            return self.inflect_engine.plural(word)
     
     def _create_names(self, original_name: str) -> Names:
-        """Create Names object with all case variations"""
+        """Create Names object with all case variations, memoized by original name"""
+        names = names_cache.get(original_name)
+        if names is None:
+            names = self._inflect_names(original_name)
+            names_cache.set(original_name, names)
+        return names
+    
+    def _inflect_names(self, original_name: str) -> Names:
         snake_name = self._to_snake_case(original_name)
         
         # Get the singular form first - if input is plural, convert to singular
-        singular_noun = self.inflect_engine.singular_noun(snake_name)
+        with _inflect_lock:
+            singular_noun = self.inflect_engine.singular_noun(snake_name)
         if singular_noun:
             # Input was plural, use the singular form
             snake_singular = singular_noun
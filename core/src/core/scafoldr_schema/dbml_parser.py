@@ -0,0 +1,270 @@
+import re
+from typing import Dict, List, Tuple
+from models.scafoldr_schema import DatabaseSchema, Table, Column, Reference, RefColumn
+
+class UnsupportedDbmlError(Exception):
+    """Raised when DBML uses constructs the native parser does not handle.
+
+    Callers fall back to PyDBML, which also reports syntax errors with their
+    line and column, so error payloads stay the same.
+    """
+
+    def __init__(self, message: str, line: int = 0):
+        super().__init__(f"{message} (line:{line})" if line else message)
+        self.line = line
+
+
+_NAME = r'(?:"[^"\n]+"|[A-Za-z_][A-Za-z0-9_]*)'
+_TYPE = r'(?:"[^"\n]+"|[A-Za-z_][A-Za-z0-9_]*(?:\([^()\n]*\))?(?:\[\])?)'
+_ENDPOINT = rf'({_NAME})\.({_NAME})'
+_REF_OP = r'(<>|<|>|-)'
+_STRING = r"""(?:'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")"""
+
+_TABLE_START = re.compile(rf'^Table\s+({_NAME})\s*\{{$')
+_PROJECT_START = re.compile(rf'^Project\s+{_NAME}\s*\{{$')
+_REF_SHORT = re.compile(rf'^Ref(?:\s+{_NAME})?\s*:\s*{_ENDPOINT}\s*{_REF_OP}\s*{_ENDPOINT}$')
+_REF_LONG_START = re.compile(rf'^Ref(?:\s+{_NAME})?\s*\{{$')
+_REF_BODY = re.compile(rf'^{_ENDPOINT}\s*{_REF_OP}\s*{_ENDPOINT}$')
+_COLUMN = re.compile(rf'^({_NAME})\s+({_TYPE})(?:\s+\[(.*)\])?$')
+_TABLE_NOTE = re.compile(rf'^Note:\s*{_STRING}$')
+_PROJECT_SETTING = re.compile(rf'^[A-Za-z_][A-Za-z0-9_]*:\s*{_STRING}$')
+_KEY_VALUE_SETTING = re.compile(r'^(note|default|ref):\s*(.*)$', re.IGNORECASE)
+_INLINE_REF = re.compile(rf'^{_REF_OP}\s*{_ENDPOINT}$')
+_DEFAULT_STRING = re.compile(r"""^(?:'([^'\\\n]*)'|"([^"\\\n]*)")$""")
+
+# Column settings without a value, mapped to the Column field they set
+_FLAG_SETTINGS = {
+    "pk": ("pk", True),
+    "primary key": ("pk", True),
+    "not null": ("not_null", True),
+    "null": ("not_null", False),
+    "unique": ("unique", True),
+    "increment": None,
+}
+
+def _unquote(name: str) -> str:
+    return name[1:-1] if name.startswith('"') else name
+
+def _strip_comment(line: str, line_number: int) -> str:
+    """Remove a trailing // comment, respecting quoted strings"""
+    quote = None
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in ('"', "'"):
+            quote = char
+        elif line.startswith('//', i):
+            return line[:i]
+        elif line.startswith('/*', i):
+            raise UnsupportedDbmlError("block comments", line_number)
+        i += 1
+    if quote:
+        raise UnsupportedDbmlError("unterminated or multi-line string", line_number)
+    return line
+
+def _split_settings(settings: str, line_number: int) -> List[str]:
+    """Split column settings on commas outside quoted strings"""
+    items = []
+    quote = None
+    start = 0
+    i = 0
+    while i < len(settings):
+        char = settings[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in ('"', "'"):
+            quote = char
+        elif char in '[]':
+            raise UnsupportedDbmlError("nested brackets in column settings", line_number)
+        elif char == ',':
+            items.append(settings[start:i].strip())
+            start = i + 1
+        i += 1
+    items.append(settings[start:].strip())
+    if any(not item for item in items):
+        raise UnsupportedDbmlError("empty column setting", line_number)
+    return items
+
+
+class NativeDbmlParser:
+    """Single-pass, line-based parser for the DBML subset used by Scafoldr.
+
+    Supports Project blocks (ignored), tables with column settings (pk, primary key,
+    not null, null, unique, increment, note, string defaults and inline refs), table
+    notes, and short or long standalone Refs. Anything else raises UnsupportedDbmlError,
+    and so does input PyDBML would reject (unknown ref targets, duplicate tables, columns
+    or refs), so the result always matches what PyDBML would build.
+    """
+
+    def __init__(self, dbml: str):
+        self.dbml = dbml
+        self.tables: List[Table] = []
+        self.refs: List[Tuple[str, Tuple[str, str], Tuple[str, str], int]] = []
+
+    def parse(self) -> DatabaseSchema:
+        if "'''" in self.dbml or '`' in self.dbml:
+            raise UnsupportedDbmlError("multi-line strings or expressions")
+
+        lines = [
+            (number, _strip_comment(raw, number).strip())
+            for number, raw in enumerate(self.dbml.splitlines(), start=1)
+        ]
+        position = 0
+        seen_project = False
+        while position < len(lines):
+            number, line = lines[position]
+            position += 1
+            if not line:
+                continue
+
+            match = _TABLE_START.match(line)
+            if match:
+                position = self._parse_table(_unquote(match.group(1)), lines, position, number)
+                continue
+
+            match = _REF_SHORT.match(line)
+            if match:
+                self._add_ref(match.groups(), number)
+                continue
+
+            if _REF_LONG_START.match(line):
+                position = self._parse_ref_block(lines, position, number)
+                continue
+
+            if _PROJECT_START.match(line) and not seen_project:
+                seen_project = True
+                position = self._skip_project(lines, position, number)
+                continue
+
+            raise UnsupportedDbmlError("unsupported statement", number)
+
+        return self._build()
+
+    def _next_line(self, lines, position: int, start_line: int) -> Tuple[int, str, int]:
+        """Return the next non-empty line, its number and the following position"""
+        while position < len(lines):
+            number, line = lines[position]
+            position += 1
+            if line:
+                return number, line, position
+        raise UnsupportedDbmlError("unterminated block", start_line)
+
+    def _parse_table(self, name: str, lines, position: int, start_line: int) -> int:
+        columns: List[Column] = []
+        while True:
+            number, line, position = self._next_line(lines, position, start_line)
+            if line == '}':
+                break
+            if _TABLE_NOTE.match(line):
+                continue
+            match = _COLUMN.match(line)
+            if not match:
+                raise UnsupportedDbmlError("unsupported table element", number)
+            columns.append(self._parse_column(name, match, number))
+
+        if not columns:
+            raise UnsupportedDbmlError("table without columns", start_line)
+        self.tables.append(Table(name=name, columns=columns))
+        return position
+
+    def _parse_column(self, table: str, match, number: int) -> Column:
+        name = _unquote(match.group(1))
+        if name.lower() in ("note", "indexes"):
+            raise UnsupportedDbmlError("keyword used as column name", number)
+        fields = {"pk": False, "not_null": False, "unique": False, "default": None}
+        settings = match.group(3)
+        if settings is not None:
+            for item in _split_settings(settings, number):
+                flag = item.lower()
+                if flag in _FLAG_SETTINGS:
+                    if _FLAG_SETTINGS[flag]:
+                        field, value = _FLAG_SETTINGS[flag]
+                        fields[field] = value
+                    continue
+
+                setting = _KEY_VALUE_SETTING.match(item)
+                if not setting:
+                    raise UnsupportedDbmlError(f"unsupported column setting '{item}'", number)
+                key, value = setting.group(1).lower(), setting.group(2).strip()
+                if key == "note":
+                    if not re.fullmatch(_STRING, value):
+                        raise UnsupportedDbmlError("unsupported note", number)
+                elif key == "default":
+                    default = _DEFAULT_STRING.match(value)
+                    if not default:
+                        raise UnsupportedDbmlError("non-string default", number)
+                    fields["default"] = default.group(1) if default.group(1) is not None else default.group(2)
+                else:
+                    ref = _INLINE_REF.match(value)
+                    if not ref:
+                        raise UnsupportedDbmlError("unsupported inline ref", number)
+                    op, ref_table, ref_column = ref.groups()
+                    self.refs.append((op, (table, name), (_unquote(ref_table), _unquote(ref_column)), number))
+
+        return Column(name=name, type=_unquote(match.group(2)), **fields)
+
+    def _parse_ref_block(self, lines, position: int, start_line: int) -> int:
+        number, line, position = self._next_line(lines, position, start_line)
+        match = _REF_BODY.match(line)
+        if not match:
+            raise UnsupportedDbmlError("unsupported ref", number)
+        self._add_ref(match.groups(), number)
+
+        number, line, position = self._next_line(lines, position, start_line)
+        if line != '}':
+            raise UnsupportedDbmlError("unsupported ref", number)
+        return position
+
+    def _add_ref(self, groups: Tuple[str, ...], number: int):
+        table1, column1, op, table2, column2 = groups
+        self.refs.append((op, (_unquote(table1), _unquote(column1)), (_unquote(table2), _unquote(column2)), number))
+
+    def _skip_project(self, lines, position: int, start_line: int) -> int:
+        while True:
+            number, line, position = self._next_line(lines, position, start_line)
+            if line == '}':
+                return position
+            if not (_TABLE_NOTE.match(line) or _PROJECT_SETTING.match(line)):
+                raise UnsupportedDbmlError("unsupported project setting", number)
+
+    def _build(self) -> DatabaseSchema:
+        # PyDBML rejects duplicates, leave reporting them to it
+        columns: Dict[str, set] = {}
+        for table in self.tables:
+            if table.name in columns:
+                raise UnsupportedDbmlError(f"duplicate table '{table.name}'")
+            names = {column.name for column in table.columns}
+            if len(names) != len(table.columns):
+                raise UnsupportedDbmlError(f"duplicate column in table '{table.name}'")
+            columns[table.name] = names
+
+        refs = []
+        seen_pairs = set()
+        for op, (table1, column1), (table2, column2), number in self.refs:
+            for table, column in ((table1, column1), (table2, column2)):
+                if column not in columns.get(table, ()):
+                    raise UnsupportedDbmlError(f"unknown ref column '{table}.{column}'", number)
+            pair = frozenset(((table1, column1), (table2, column2)))
+            if len(pair) == 1 or pair in seen_pairs:
+                raise UnsupportedDbmlError("duplicate ref", number)
+            seen_pairs.add(pair)
+            refs.append(Reference(
+                type=op,
+                col1=RefColumn(table=table1, name=column1),
+                col2=RefColumn(table=table2, name=column2),
+            ))
+
+        return DatabaseSchema(tables=self.tables, refs=refs)
+
+
+def parse_dbml(dbml: str) -> DatabaseSchema:
+    """Parse DBML with the native parser, raises UnsupportedDbmlError to request a fallback"""
+    return NativeDbmlParser(dbml).parse()
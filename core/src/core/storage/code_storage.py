@@ -1,13 +1,18 @@
 import asyncio
 import threading
-from typing import Dict, Any, Optional, Callable, List, Set
-from dataclasses import dataclass
+from typing import Dict, Any, AsyncIterator, Optional, Callable, List, Set, Tuple
+from dataclasses import dataclass, asdict
+from datetime import datetime
+import hashlib
 import time
+import uuid
 import logging
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
 from weakref import WeakSet
 
 from core.storage.storage_provider import BaseStorageProvider
+from core.storage.file_cache import FileCache, content_size
 
 logger = logging.getLogger(__name__)
 
@@ -115,6 +120,41 @@ class ThreadSafeEventManager:
         self._executor.shutdown(wait=False)
 
 
+# Number of characters of a file kept as its preview
+PREVIEW_LENGTH = 100
+
+
+@dataclass
+class FileMetadata:
+    """Metadata stored next to a file, so listings do not need its content"""
+    hash: str  # md5 of the content
+    size: int  # bytes
+    preview: str
+    last_modified: float
+    
+    @classmethod
+    def from_content(cls, content: str, last_modified: Optional[float] = None) -> "FileMetadata":
+        encoded = content.encode()
+        return cls(
+            hash=hashlib.md5(encoded).hexdigest(),
+            size=len(encoded),
+            preview=content[:PREVIEW_LENGTH] + "..." if len(content) > PREVIEW_LENGTH else content,
+            last_modified=last_modified if last_modified is not None else time.time()
+        )
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FileMetadata":
+        return cls(**data)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+    
+    @property
+    def timestamp(self) -> str:
+        """Last modification time in ISO format"""
+        return datetime.fromtimestamp(self.last_modified).isoformat()
+
+
 @dataclass
 class CodeChange:
     project_id: str
@@ -122,6 +162,7 @@ class CodeChange:
     action: str  # 'create', 'update', 'delete', 'project_deleted'
     content: Optional[str] = None
     timestamp: float = None
+    metadata: Optional[FileMetadata] = None
     
     def __post_init__(self):
         if self.timestamp is None:
@@ -129,14 +170,69 @@ class CodeChange:
 
 
 class CodeStorage:
-    """Code storage with thread-safe event management"""
+    """Code storage with thread-safe event management.
     
-    def __init__(self, backend: BaseStorageProvider):
+    With a FileCache, file contents and project listings, and so whole projects, are
+    served from memory. Local
+    writes invalidate the cache directly and are announced to other workers, whose
+    listeners (see start_invalidation_listener) drop their copies.
+    """
+    
+    def __init__(self, backend: BaseStorageProvider, cache: Optional[FileCache] = None):
         self.backend = backend
+        self.cache = cache
         self.event_manager = ThreadSafeEventManager()
         # File-level locks to prevent race conditions
         self._file_locks: Dict[str, asyncio.Lock] = {}
         self._lock_registry = asyncio.Lock()
+        # Identifies this worker's own invalidation messages
+        self.worker_id = uuid.uuid4().hex
+        self._listener_task: Optional[asyncio.Task] = None
+    
+    async def _invalidate(self, project_id: str, file_paths: Optional[List[str]] = None):
+        """Drop cached entries after a write and tell other workers to do the same"""
+        if self.cache is None:
+            return
+        self.cache.invalidate(project_id, file_paths)
+        try:
+            await self.backend.publish_invalidation({
+                "worker": self.worker_id,
+                "project_id": project_id,
+                "file_paths": file_paths
+            })
+        except Exception as e:
+            logger.warning(f"Error publishing cache invalidation for {project_id}: {e}")
+    
+    async def start_invalidation_listener(self):
+        """Start applying other workers' invalidations, a no-op without a cache"""
+        if self.cache is None or self._listener_task is not None:
+            return
+        self._listener_task = asyncio.create_task(self._listen_invalidations())
+    
+    async def stop_invalidation_listener(self):
+        if self._listener_task is None:
+            return
+        self._listener_task.cancel()
+        try:
+            await self._listener_task
+        except asyncio.CancelledError:
+            pass
+        self._listener_task = None
+    
+    async def _listen_invalidations(self):
+        while True:
+            try:
+                async for message in self.backend.listen_invalidations():
+                    if message.get("worker") != self.worker_id:
+                        self.cache.invalidate(message["project_id"], message.get("file_paths"))
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Invalidations may have been missed while disconnected
+                logger.warning(f"Cache invalidation listener failed, retrying: {e}")
+                self.cache.clear()
+                await asyncio.sleep(1)
     
     async def _get_file_lock(self, key: str) -> asyncio.Lock:
         """Get or create a lock for a specific file"""
@@ -145,29 +241,38 @@ class CodeStorage:
                 self._file_locks[key] = asyncio.Lock()
             return self._file_locks[key]
     
-    async def save_file(self, project_id: str, file_path: str, content: str):
-        """Save generated code file"""
+    async def _get_file_locks(self, keys: List[str]) -> List[asyncio.Lock]:
+        """Get or create the locks for several files at once"""
+        async with self._lock_registry:
+            return [self._file_locks.setdefault(key, asyncio.Lock()) for key in keys]
+    
+    async def save_file(self, project_id: str, file_path: str, content: str) -> FileMetadata:
+        """Save generated code file, returns the metadata stored with it"""
         lock_key = f"{project_id}:{file_path}"
         file_lock = await self._get_file_lock(lock_key)
         
         async with file_lock:
             try:
                 # Check if file exists to determine action
-                existing = await self.backend.get_file(project_id, file_path)
-                action = 'update' if existing is not None else 'create'
+                existing = await self.backend.exists_many(project_id, [file_path])
+                action = 'update' if existing.get(file_path) else 'create'
                 
-                # Save the file
-                await self.backend.set_file(project_id, file_path, content)
+                # Save the file together with its metadata
+                metadata = FileMetadata.from_content(content)
+                await self.backend.set_file(project_id, file_path, content, metadata.to_dict())
+                await self._invalidate(project_id, [file_path])
                 
                 # Create and publish change event
                 change = CodeChange(
                     project_id=project_id,
                     file_path=file_path,
                     action=action,
-                    content=content
+                    content=content,
+                    metadata=metadata
                 )
                 
                 await self.event_manager.publish('file_changed', change)
+                return metadata
                 
             except Exception as e:
                 logger.error(f"Error saving file {project_id}/{file_path}: {e}")
@@ -179,11 +284,19 @@ class CodeStorage:
         file_lock = await self._get_file_lock(lock_key)
         
         async with file_lock:
+            if self.cache is not None:
+                cached = self.cache.get(project_id, file_path)
+                if cached is not None:
+                    return cached[0]
+                token = self.cache.token()
             try:
-                return await self.backend.get_file(project_id, file_path)
+                content = await self.backend.get_file(project_id, file_path)
             except Exception as e:
                 logger.error(f"Error getting file {project_id}/{file_path}: {e}")
                 raise
+            if self.cache is not None and content is not None:
+                self.cache.put(token, project_id, file_path, (content, None), content_size(content))
+            return content
     
     async def delete_file(self, project_id: str, file_path: str):
         """Delete file"""
@@ -193,6 +306,7 @@ class CodeStorage:
         async with file_lock:
             try:
                 await self.backend.delete_file(project_id, file_path)
+                await self._invalidate(project_id, [file_path])
                 
                 change = CodeChange(
                     project_id=project_id,
@@ -206,18 +320,151 @@ class CodeStorage:
                 logger.error(f"Error deleting file {project_id}/{file_path}: {e}")
                 raise
     
+    async def get_file_with_metadata(self, project_id: str, file_path: str) -> Tuple[Optional[str], Optional[FileMetadata]]:
+        """Get file content with its metadata, both None when the file does not exist"""
+        lock_key = f"{project_id}:{file_path}"
+        file_lock = await self._get_file_lock(lock_key)
+        
+        async with file_lock:
+            if self.cache is not None:
+                cached = self.cache.get(project_id, file_path)
+                if cached is not None and cached[1] is not None:
+                    return cached
+                token = self.cache.token()
+            try:
+                content, metadata = await self.backend.get_file_with_metadata(project_id, file_path)
+            except Exception as e:
+                logger.error(f"Error getting file {project_id}/{file_path}: {e}")
+                raise
+        
+        if content is None:
+            return None, None
+        metadata = FileMetadata.from_content(content) if metadata is None else FileMetadata.from_dict(metadata)
+        if self.cache is not None:
+            self.cache.put(token, project_id, file_path, (content, metadata), content_size(content) + content_size(metadata.preview))
+        return content, metadata
+    
+    async def get_project_metadata(self, project_id: str) -> Dict[str, FileMetadata]:
+        """Get the metadata of all files of a project without reading their content.
+        
+        Files stored before metadata existed (or by providers that do not store it) are
+        read once, and their metadata is written back. Listings are cached as a whole.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(project_id)
+            if cached is not None:
+                return dict(cached)
+            token = self.cache.token()
+        try:
+            stored = await self.backend.get_project_metadata(project_id)
+            file_paths = await self.backend.list_file_paths(project_id)
+            
+            missing = [file_path for file_path in file_paths if file_path not in stored]
+            backfilled = {}
+            if missing:
+                contents = await self.backend.get_files(project_id, missing)
+                backfilled = {
+                    file_path: FileMetadata.from_content(content)
+                    for file_path, content in contents.items()
+                    if content is not None
+                }
+                await self.backend.set_metadata(project_id, {path: item.to_dict() for path, item in backfilled.items()})
+            
+            present = set(file_paths)
+            stale = [file_path for file_path in stored if file_path not in present]
+            if stale:
+                await self.backend.delete_metadata(project_id, stale)
+            
+            listing = {
+                file_path: backfilled[file_path] if file_path in backfilled else FileMetadata.from_dict(stored[file_path])
+                for file_path in file_paths
+                if file_path in backfilled or file_path in stored
+            }
+            if self.cache is not None:
+                size = sum(content_size(file_path) + content_size(item.preview) + 200 for file_path, item in listing.items())
+                self.cache.put(token, project_id, None, listing, size)
+            return dict(listing)
+        except Exception as e:
+            logger.error(f"Error getting project metadata for {project_id}: {e}")
+            raise
+    
     async def get_project_files(self, project_id: str) -> Dict[str, str]:
-        """Get all files for a project"""
+        """Get all files for a project.
+        
+        With a cache, the project is read as its listing plus the files that are not
+        cached yet, which are fetched in one batch and cached one by one. Writes
+        invalidate them like any other cached file.
+        """
         try:
-            return await self.backend.get_project_files(project_id)
+            if self.cache is None:
+                return await self.backend.get_project_files(project_id)
+            
+            token = self.cache.token()
+            listing = await self.get_project_metadata(project_id)
+            files = {}
+            missing = []
+            for file_path in listing:
+                cached = self.cache.get(project_id, file_path)
+                if cached is not None:
+                    files[file_path] = cached[0]
+                else:
+                    missing.append(file_path)
+            
+            if missing:
+                contents = await self.backend.get_files(project_id, missing)
+                for file_path, content in contents.items():
+                    if content is None:
+                        continue
+                    files[file_path] = content
+                    metadata = listing[file_path]
+                    self.cache.put(token, project_id, file_path, (content, metadata), content_size(content) + content_size(metadata.preview))
+            return {file_path: files[file_path] for file_path in listing if file_path in files}
         except Exception as e:
             logger.error(f"Error getting project files for {project_id}: {e}")
             raise
     
+    async def iter_project_files(self, project_id: str, batch_size: int = 100) -> AsyncIterator[Tuple[str, str]]:
+        """Iterate over the (path, content) pairs of a project, holding at most about batch_size files"""
+        try:
+            async for file_path, content in self.backend.iter_project_files(project_id, batch_size):
+                yield file_path, content
+        except Exception as e:
+            logger.error(f"Error iterating project files for {project_id}: {e}")
+            raise
+    
+    async def get_project_state(self, project_id: str, name: str) -> Optional[str]:
+        """Internal state of a project, e.g. the request of its last scaffold.
+        
+        State is not a file: it is not listed, returned with the project files or
+        announced to subscribers, and it is deleted with the project.
+        """
+        try:
+            return await self.backend.get_project_state(project_id, name)
+        except Exception as e:
+            logger.error(f"Error getting state {name} of project {project_id}: {e}")
+            raise
+    
+    async def set_project_state(self, project_id: str, name: str, value: str):
+        """Store internal state of a project"""
+        try:
+            await self.backend.set_project_state(project_id, name, value)
+        except Exception as e:
+            logger.error(f"Error setting state {name} of project {project_id}: {e}")
+            raise
+    
+    async def get_project_storage_stats(self, project_id: str) -> Dict[str, Any]:
+        """Raw vs stored bytes of a project"""
+        try:
+            return await self.backend.get_project_storage_stats(project_id)
+        except Exception as e:
+            logger.error(f"Error getting storage stats for {project_id}: {e}")
+            raise
+    
     async def delete_project(self, project_id: str):
         """Delete entire project"""
         try:
             await self.backend.delete_project(project_id)
+            await self._invalidate(project_id)
             
             change = CodeChange(
                 project_id=project_id,
@@ -231,42 +478,51 @@ class CodeStorage:
             logger.error(f"Error deleting project {project_id}: {e}")
             raise
 
-    async def save_files_bulk(self, project_id: str, files: Dict[str, str]):
-        """Save multiple files in bulk"""
-        changes = []
-        errors = []
+    async def save_files_bulk(self, project_id: str, files: Dict[str, str]) -> Dict[str, FileMetadata]:
+        """Save multiple files in bulk, returns the metadata stored with each saved file.
+        
+        Existence is checked and all files are written with one backend call each, so the
+        number of round-trips does not grow with the number of files. The file locks are
+        taken in sorted order to avoid deadlocks with concurrent bulk saves. If the batch
+        fails, files are saved one by one and those that fail are logged and left out.
+        """
+        if not files:
+            return {}
         
-        for file_path, content in files.items():
+        file_paths = sorted(files)
+        metadata = {file_path: FileMetadata.from_content(content) for file_path, content in files.items()}
+        file_locks = await self._get_file_locks([f"{project_id}:{file_path}" for file_path in file_paths])
+        
+        async with AsyncExitStack() as stack:
+            for file_lock in file_locks:
+                await stack.enter_async_context(file_lock)
             try:
-                lock_key = f"{project_id}:{file_path}"
-                file_lock = await self._get_file_lock(lock_key)
-                
-                async with file_lock:
-                    # Check if file exists
-                    existing = await self.backend.get_file(project_id, file_path)
-                    action = 'update' if existing is not None else 'create'
-                    
-                    # Save file
-                    await self.backend.set_file(project_id, file_path, content)
-                    
-                    # Collect change for bulk notification
-                    change = CodeChange(
-                        project_id=project_id,
-                        file_path=file_path,
-                        action=action,
-                        content=content
-                    )
-                    changes.append(change)
-                    
+                existing = await self.backend.exists_many(project_id, file_paths)
+                await self.backend.set_files(project_id, files, {path: item.to_dict() for path, item in metadata.items()})
+                saved = set(file_paths)
             except Exception as e:
-                logger.error(f"Error saving file {file_path} in bulk operation: {e}")
-                errors.append((file_path, str(e)))
+                logger.error(f"Error saving {len(files)} files in bulk for {project_id}, saving them one by one: {e}")
+                existing, saved = await self._save_files_one_by_one(project_id, files, metadata)
+            # Files that failed may have been written partially, drop them too
+            await self._invalidate(project_id, file_paths)
+        
+        changes = [
+            CodeChange(
+                project_id=project_id,
+                file_path=file_path,
+                action='update' if existing.get(file_path) else 'create',
+                content=content,
+                metadata=metadata[file_path]
+            )
+            for file_path, content in files.items()
+            if file_path in saved
+        ]
         
         # Publish all changes
         for change in changes:
             await self.event_manager.publish('file_changed', change)
         
-        # Optionally publish a bulk change event
+        # Publish a bulk change event
         if changes:
             bulk_change = {
                 'project_id': project_id,
@@ -275,10 +531,49 @@ class CodeStorage:
                 'timestamp': time.time()
             }
             await self.event_manager.publish('bulk_changed', bulk_change)
+        return {file_path: item for file_path, item in metadata.items() if file_path in saved}
+    
+    async def _save_files_one_by_one(self, project_id: str, files: Dict[str, str],
+                                     metadata: Dict[str, FileMetadata]) -> Tuple[Dict[str, bool], Set[str]]:
+        """Save files separately after a failed batch, returns existence before the save and the saved paths"""
+        existing = {}
+        saved = set()
+        errors = []
+        
+        for file_path in sorted(files):
+            try:
+                existing.update(await self.backend.exists_many(project_id, [file_path]))
+                await self.backend.set_file(project_id, file_path, files[file_path], metadata[file_path].to_dict())
+                saved.add(file_path)
+            except Exception as e:
+                logger.error(f"Error saving file {file_path} in bulk operation: {e}")
+                errors.append((file_path, str(e)))
         
         if errors:
             logger.warning(f"Bulk save completed with {len(errors)} errors")
+        return existing, saved
+
+    async def open(self):
+        """Keep backend connections open for the current, long-lived event loop"""
+        await self.backend.open()
+
+    async def ping(self) -> bool:
+        """Check that the storage backend is reachable"""
+        return await self.backend.ping()
+
+    async def close(self):
+        """Stop the invalidation listener and release the connections of the storage backend"""
+        await self.stop_invalidation_listener()
+        await self.backend.close()
 
+    def stats(self) -> Dict[str, Any]:
+        """Return backend counters, e.g. connection pool usage, and cache counters"""
+        backend_stats = getattr(self.backend, "stats", None)
+        return {
+            "backend": type(self.backend).__name__,
+            **(backend_stats() if backend_stats else {}),
+            "cache": self.cache.stats() if self.cache else None,
+        }
 
     def on_file_change(self, callback: Callable):
         """Subscribe to file changes"""
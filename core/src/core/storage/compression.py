@@ -0,0 +1,41 @@
+import zlib
+
+# Stored values starting with this header are compressed, anything else is plain UTF-8.
+# Layout: MAGIC, format version byte, codec byte, payload.
+COMPRESSION_MAGIC = b"\x00scz"
+COMPRESSION_VERSION = 1
+CODEC_ZLIB = b"z"
+
+_HEADER = COMPRESSION_MAGIC + bytes([COMPRESSION_VERSION]) + CODEC_ZLIB
+
+# zlib level 1 is the fastest level and already shrinks generated code several times
+ZLIB_LEVEL = 1
+
+def encode_content(content: str, threshold: int) -> bytes:
+    """Encode file content for storage, compressing it when it is at least threshold bytes.
+
+    A threshold of 0 disables compression. Content is stored uncompressed when
+    compression does not make it smaller.
+    """
+    raw = content.encode('utf-8')
+    if threshold <= 0 or len(raw) < threshold:
+        return raw
+    compressed = _HEADER + zlib.compress(raw, ZLIB_LEVEL)
+    return compressed if len(compressed) < len(raw) else raw
+
+def is_compressed(value: bytes) -> bool:
+    """Whether a stored value carries the compression header"""
+    return value.startswith(COMPRESSION_MAGIC)
+
+def decode_content(value: bytes) -> str:
+    """Decode a stored value, compressed or written before compression existed"""
+    if not is_compressed(value):
+        return value.decode('utf-8')
+
+    header_size = len(COMPRESSION_MAGIC)
+    version = value[header_size]
+    codec = value[header_size + 1:header_size + 2]
+    if version != COMPRESSION_VERSION or codec != CODEC_ZLIB:
+        raise ValueError(f"Unsupported stored content format (version {version}, codec {codec!r})")
+    return zlib.decompress(value[header_size + 2:]).decode('utf-8')
+
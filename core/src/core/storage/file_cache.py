@@ -0,0 +1,115 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Name of the Redis pub/sub channel other workers' writes are announced on
+INVALIDATION_CHANNEL = "scafoldr:code_storage:invalidate"
+
+class FileCache:
+    """Size-bounded, thread-safe LRU of file contents and project listings.
+
+    Entries expire after `ttl` seconds, which bounds staleness if an invalidation
+    from another worker is lost. Fills are guarded by a token taken before reading
+    the backend, so a read that raced with an invalidation is not cached.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: float = 300):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # (project_id, file_path) for files, (project_id, None) for the project listing
+        self._entries: "OrderedDict[Tuple[str, Optional[str]], Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def token(self) -> int:
+        """Take before reading the backend, pass to put()"""
+        with self._lock:
+            return self._generation
+
+    def get(self, project_id: str, file_path: Optional[str] = None) -> Optional[Any]:
+        """Cached file entry, or the project listing when file_path is None"""
+        key = (project_id, file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, token: int, project_id: str, file_path: Optional[str], value: Any, size: int):
+        """Cache a value read from the backend, unless something was invalidated since token"""
+        if size > self.max_bytes:
+            return
+        key = (project_id, file_path)
+        with self._lock:
+            if token != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, project_id: str, file_paths: Optional[Iterable[str]] = None):
+        """Drop files of a project and its listing, all of its entries when file_paths is None"""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            if file_paths is None:
+                keys = [key for key in self._entries if key[0] == project_id]
+            else:
+                keys = [(project_id, file_path) for file_path in file_paths] + [(project_id, None)]
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def content_size(content: Optional[str]) -> int:
+    """Approximate memory used by a cached string"""
+    return sys.getsizeof(content) if content is not None else 0
+
+def create_file_cache_from_env() -> Optional[FileCache]:
+    """Create the code storage cache configured by CODE_STORAGE_CACHE_MAX_BYTES (default 32 MiB, 0 disables it)"""
+    max_bytes = int(os.getenv("CODE_STORAGE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    if max_bytes <= 0:
+        return None
+    return FileCache(max_bytes=max_bytes, ttl=float(os.getenv("CODE_STORAGE_CACHE_TTL", "300")))
@@ -1,9 +1,26 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from core.storage.compression import encode_content, decode_content
+from core.storage.file_cache import INVALIDATION_CHANNEL
+
+logger = logging.getLogger(__name__)
 
 class BaseStorageProvider(ABC):
+    """Stores project files and, where supported, per-file metadata next to them.
+
+    Metadata is a JSON-serializable dict written together with the content. Providers
+    that do not store it return no metadata, CodeStorage then computes it from content.
+    """
+
     @abstractmethod
-    async def set_file(self, project_id: str, file_path: str, content: str):
+    async def set_file(self, project_id: str, file_path: str, content: str, metadata: Optional[Dict[str, Any]] = None):
         pass
 
     @abstractmethod
@@ -22,15 +39,109 @@ class BaseStorageProvider(ABC):
     async def delete_project(self, project_id: str):
         pass
 
+    async def set_files(self, project_id: str, files: Dict[str, str], metadata: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Store several files of a project, providers override this with a single round-trip"""
+        metadata = metadata or {}
+        for file_path, content in files.items():
+            await self.set_file(project_id, file_path, content, metadata.get(file_path))
+
+    async def get_files(self, project_id: str, file_paths: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Get several files of a project, None for missing files"""
+        return {file_path: await self.get_file(project_id, file_path) for file_path in file_paths}
+
+    async def exists_many(self, project_id: str, file_paths: Iterable[str]) -> Dict[str, bool]:
+        """Check which of several files of a project exist"""
+        files = await self.get_files(project_id, file_paths)
+        return {file_path: content is not None for file_path, content in files.items()}
+
+    async def list_file_paths(self, project_id: str) -> List[str]:
+        """Paths of all files of a project, without their content"""
+        return list(await self.get_project_files(project_id))
+
+    async def iter_project_files(self, project_id: str, batch_size: int = 100) -> AsyncIterator[Tuple[str, str]]:
+        """Yield the (path, content) pairs of a project, reading at most batch_size files at a time"""
+        file_paths = await self.list_file_paths(project_id)
+        for start in range(0, len(file_paths), batch_size):
+            batch = await self.get_files(project_id, file_paths[start:start + batch_size])
+            for file_path, content in batch.items():
+                if content is not None:
+                    yield file_path, content
+
+    async def get_file_with_metadata(self, project_id: str, file_path: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Get the content of a file with its stored metadata"""
+        return await self.get_file(project_id, file_path), None
+
+    async def get_project_metadata(self, project_id: str) -> Dict[str, Dict[str, Any]]:
+        """Stored metadata of the files of a project, keyed by path"""
+        return {}
+
+    async def set_metadata(self, project_id: str, metadata: Dict[str, Dict[str, Any]]):
+        """Store metadata without touching the content, e.g. for files written before metadata existed"""
+        pass
+
+    async def delete_metadata(self, project_id: str, file_paths: Iterable[str]):
+        """Remove stored metadata of files"""
+        pass
+
+    async def get_project_state(self, project_id: str, name: str) -> Optional[str]:
+        """Internal state stored with a project, outside its files"""
+        return None
+
+    async def set_project_state(self, project_id: str, name: str, value: str):
+        """Store internal state with a project, it is removed with the project"""
+        pass
+
+    async def get_project_storage_stats(self, project_id: str) -> Dict[str, Any]:
+        """Raw and stored bytes of the files of a project"""
+        files = await self.get_project_files(project_id)
+        size = sum(len(content.encode('utf-8')) for content in files.values())
+        return _storage_stats(len(files), size, size)
+
+    async def publish_invalidation(self, message: Dict[str, Any]):
+        """Announce a write to the code storage caches of other workers"""
+        pass
+
+    async def listen_invalidations(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield invalidations published by other workers, nothing for single-process providers"""
+        return
+        yield
+
+    async def ping(self) -> bool:
+        """Check that the storage is reachable"""
+        return True
+
+    async def open(self):
+        """Keep connections open for the current event loop until close()"""
+        pass
+
+    async def close(self):
+        """Release connections held by the provider"""
+        pass
+
+
+def _storage_stats(files: int, raw_bytes: int, stored_bytes: int) -> Dict[str, Any]:
+    return {
+        "files": files,
+        "raw_bytes": raw_bytes,
+        "stored_bytes": stored_bytes,
+        "ratio": stored_bytes / raw_bytes if raw_bytes else 1.0,
+    }
+
 
 class InMemoryStorage(BaseStorageProvider):
     def __init__(self):
         self.storage: Dict[str, Dict[str, str]] = {}
+        self.metadata: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.state: Dict[str, Dict[str, str]] = {}
 
-    async def set_file(self, project_id: str, file_path: str, content: str):
+    async def set_file(self, project_id: str, file_path: str, content: str, metadata: Optional[Dict[str, Any]] = None):
         if project_id not in self.storage:
             self.storage[project_id] = {}
         self.storage[project_id][file_path] = content
+        if metadata is not None:
+            self.metadata.setdefault(project_id, {})[file_path] = metadata
+        else:
+            self.metadata.get(project_id, {}).pop(file_path, None)
 
     async def get_file(self, project_id: str, file_path: str) -> Optional[str]:
         return self.storage.get(project_id, {}).get(file_path)
@@ -38,88 +149,711 @@ class InMemoryStorage(BaseStorageProvider):
     async def delete_file(self, project_id: str, file_path: str):
         if project_id in self.storage and file_path in self.storage[project_id]:
             del self.storage[project_id][file_path]
+        self.metadata.get(project_id, {}).pop(file_path, None)
 
     async def get_project_files(self, project_id: str) -> Dict[str, str]:
         return self.storage.get(project_id, {}).copy()
 
+    async def set_files(self, project_id: str, files: Dict[str, str], metadata: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.storage.setdefault(project_id, {}).update(files)
+        project_metadata = self.metadata.setdefault(project_id, {})
+        for file_path in files:
+            if metadata and file_path in metadata:
+                project_metadata[file_path] = metadata[file_path]
+            else:
+                project_metadata.pop(file_path, None)
+
+    async def get_files(self, project_id: str, file_paths: Iterable[str]) -> Dict[str, Optional[str]]:
+        project = self.storage.get(project_id, {})
+        return {file_path: project.get(file_path) for file_path in file_paths}
+
+    async def exists_many(self, project_id: str, file_paths: Iterable[str]) -> Dict[str, bool]:
+        project = self.storage.get(project_id, {})
+        return {file_path: file_path in project for file_path in file_paths}
+
+    async def list_file_paths(self, project_id: str) -> List[str]:
+        return list(self.storage.get(project_id, {}))
+
+    async def iter_project_files(self, project_id: str, batch_size: int = 100) -> AsyncIterator[Tuple[str, str]]:
+        # Iterate over a snapshot of the paths, the project may change between batches
+        project = self.storage.get(project_id, {})
+        file_paths = list(project)
+        for start in range(0, len(file_paths), batch_size):
+            for file_path in file_paths[start:start + batch_size]:
+                content = project.get(file_path)
+                if content is not None:
+                    yield file_path, content
+            await asyncio.sleep(0)
+
+    async def get_file_with_metadata(self, project_id: str, file_path: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        return self.storage.get(project_id, {}).get(file_path), self.metadata.get(project_id, {}).get(file_path)
+
+    async def get_project_metadata(self, project_id: str) -> Dict[str, Dict[str, Any]]:
+        return self.metadata.get(project_id, {}).copy()
+
+    async def set_metadata(self, project_id: str, metadata: Dict[str, Dict[str, Any]]):
+        self.metadata.setdefault(project_id, {}).update(metadata)
+
+    async def delete_metadata(self, project_id: str, file_paths: Iterable[str]):
+        project_metadata = self.metadata.get(project_id, {})
+        for file_path in file_paths:
+            project_metadata.pop(file_path, None)
+
+    async def get_project_state(self, project_id: str, name: str) -> Optional[str]:
+        return self.state.get(project_id, {}).get(name)
+
+    async def set_project_state(self, project_id: str, name: str, value: str):
+        self.state.setdefault(project_id, {})[name] = value
+
     async def delete_project(self, project_id: str):
         if project_id in self.storage:
             del self.storage[project_id]
+        self.metadata.pop(project_id, None)
+        self.state.pop(project_id, None)
 
 
 class RedisStorage(BaseStorageProvider):
-    def __init__(self, redis_params):
+    def __init__(self, redis_params: Dict[str, Any], max_connections: int = 50, pool_timeout: float = 20,
+                 compression_threshold: int = 0):
         """
-        Initialize with a Redis connection parameters, a new client will be created for each operation.
+        Initialize with Redis connection parameters. Event loops that call open() get a
+        connection pool of their own, redis.asyncio connections cannot be shared between
+        loops, other loops connect per operation. When all max_connections are in use, operations wait up to pool_timeout seconds for a free connection.
+        File contents of at least compression_threshold bytes are stored compressed,
+        0 disables compression. Uncompressed values are always readable.
         """
         self.redis_params = redis_params
+        self.max_connections = max_connections
+        self.pool_timeout = pool_timeout
+        self.compression_threshold = compression_threshold
+        self.raw_bytes_written = 0
+        self.stored_bytes_written = 0
+        self.compressed_writes = 0
+        self.writes = 0
+        # Pools of long-lived event loops that called open(), until they call close()
+        self._pools: Dict[asyncio.AbstractEventLoop, Any] = {}
+        self._clients: Dict[asyncio.AbstractEventLoop, Any] = {}
+        self._lock = threading.Lock()
     
-    async def _get_redis_client(self):
-        """Get a Redis client that works with the current event loop"""
+    async def open(self):
+        """Keep a connection pool for the current event loop until close() is called from it.
+
+        Only long-lived loops, such as the server loop, should be opened. Operations on
+        other loops use a client of their own that is closed when the operation ends.
+        """
+        import redis.asyncio as redis
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # Connections of loops closed without close() can not be awaited anymore
+            for closed in [other for other in self._clients if other.is_closed()]:
+                del self._pools[closed], self._clients[closed]
+            if loop not in self._clients:
+                pool = redis.BlockingConnectionPool(
+                    max_connections=self.max_connections,
+                    timeout=self.pool_timeout,
+                    **self.redis_params
+                )
+                self._pools[loop] = pool
+                self._clients[loop] = redis.Redis(connection_pool=pool)
+
+    @asynccontextmanager
+    async def _redis_client(self) -> AsyncIterator[Any]:
+        """Yield the pooled client of an opened event loop, or a client for this operation only"""
         import redis.asyncio as redis
-        import logging
         
-        # For safety, always create a new client for the current event loop
-        # This is the most reliable way to avoid event loop conflicts
-        if self.redis_params:
-            return redis.Redis(**self.redis_params)
-        else:
+        if not self.redis_params:
             # This should never happen, but just in case
-            logging.error("No Redis parameters available")
+            logger.error("No Redis parameters available")
             raise ValueError("No Redis client or parameters available")
-
-    async def set_file(self, project_id: str, file_path: str, content: str):
-        redis_client = await self._get_redis_client()
-        key = f"project:{project_id}"
-        await redis_client.hset(key, file_path, content)
         
-        # Close the client
-        await redis_client.close()
+        with self._lock:
+            client = self._clients.get(asyncio.get_running_loop())
+        if client is not None:
+            yield client
+            return
+
+        # The client owns this pool and disconnects it on aclose()
+        client = redis.Redis.from_pool(redis.ConnectionPool(**self.redis_params))
+        try:
+            yield client
+        finally:
+            await client.aclose()
+
+    def _encode(self, content: str) -> bytes:
+        """Encode content for storage and count raw vs stored bytes"""
+        value = encode_content(content, self.compression_threshold)
+        raw_size = len(content.encode('utf-8'))
+        with self._lock:
+            self.writes += 1
+            self.raw_bytes_written += raw_size
+            self.stored_bytes_written += len(value)
+            if len(value) != raw_size:
+                self.compressed_writes += 1
+        return value
+
+    async def set_file(self, project_id: str, file_path: str, content: str, metadata: Optional[Dict[str, Any]] = None):
+        async with self._redis_client() as redis_client:
+            key = f"project:{project_id}"
+            meta_key = f"project_meta:{project_id}"
+            # Content and metadata change together
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.hset(key, file_path, self._encode(content))
+                if metadata is not None:
+                    pipe.hset(meta_key, file_path, json.dumps(metadata))
+                else:
+                    pipe.hdel(meta_key, file_path)
+                await pipe.execute()
 
     async def get_file(self, project_id: str, file_path: str) -> Optional[str]:
-        redis_client = await self._get_redis_client()
-        key = f"project:{project_id}"
-        result = await redis_client.hget(key, file_path)
-        
-        # Close the client
-        await redis_client.close()
+        async with self._redis_client() as redis_client:
+            key = f"project:{project_id}"
+            result = await redis_client.hget(key, file_path)
 
-        return result.decode('utf-8') if result else None
+            return decode_content(result) if result is not None else None
 
     async def delete_file(self, project_id: str, file_path: str):
-        redis_client = await self._get_redis_client()
-        key = f"project:{project_id}"
-        await redis_client.hdel(key, file_path)
-
-        # Close the client
-        await redis_client.close()
+        async with self._redis_client() as redis_client:
+            key = f"project:{project_id}"
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.hdel(key, file_path)
+                pipe.hdel(f"project_meta:{project_id}", file_path)
+                await pipe.execute()
 
     async def get_project_files(self, project_id: str) -> Dict[str, str]:
-        import logging
+        async with self._redis_client() as redis_client:
+            key = f"project:{project_id}"
+            try:
+                result = await redis_client.hgetall(key)
+                return {k.decode('utf-8'): decode_content(v) for k, v in result.items()}
+            except Exception as e:
+                logger.error(f"Error in get_project_files: {str(e)}")
+                raise
+
+    async def delete_project(self, project_id: str):
+        async with self._redis_client() as redis_client:
+            key = f"project:{project_id}"
+            await redis_client.delete(key, f"project_meta:{project_id}", f"project_state:{project_id}")
+
+    async def set_files(self, project_id: str, files: Dict[str, str], metadata: Optional[Dict[str, Dict[str, Any]]] = None):
+        if not files:
+            return
+        async with self._redis_client() as redis_client:
+            key = f"project:{project_id}"
+            meta_key = f"project_meta:{project_id}"
+            metadata = metadata or {}
+            stored = {file_path: json.dumps(metadata[file_path]) for file_path in files if file_path in metadata}
+            stale = [file_path for file_path in files if file_path not in metadata]
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping={file_path: self._encode(content) for file_path, content in files.items()})
+                if stored:
+                    pipe.hset(meta_key, mapping=stored)
+                if stale:
+                    pipe.hdel(meta_key, *stale)
+                await pipe.execute()
+
+    async def get_files(self, project_id: str, file_paths: Iterable[str]) -> Dict[str, Optional[str]]:
+        file_paths = list(file_paths)
+        if not file_paths:
+            return {}
+        async with self._redis_client() as redis_client:
+            key = f"project:{project_id}"
+            results = await redis_client.hmget(key, file_paths)
+            return {
+                file_path: decode_content(result) if result is not None else None
+                for file_path, result in zip(file_paths, results)
+            }
+
+    async def exists_many(self, project_id: str, file_paths: Iterable[str]) -> Dict[str, bool]:
+        file_paths = list(file_paths)
+        if not file_paths:
+            return {}
+        async with self._redis_client() as redis_client:
+            key = f"project:{project_id}"
+            # HEXISTS does not transfer the file contents, unlike HMGET
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for file_path in file_paths:
+                    pipe.hexists(key, file_path)
+                results = await pipe.execute()
+            return {file_path: bool(result) for file_path, result in zip(file_paths, results)}
+
+    async def list_file_paths(self, project_id: str) -> List[str]:
+        async with self._redis_client() as redis_client:
+            return [file_path.decode('utf-8') for file_path in await redis_client.hkeys(f"project:{project_id}")]
+
+    async def iter_project_files(self, project_id: str, batch_size: int = 100) -> AsyncIterator[Tuple[str, str]]:
+        async with self._redis_client() as redis_client:
+            key = f"project:{project_id}"
+            # HSCAN may return a field more than once while the hash is rehashed
+            seen = set()
+            cursor = 0
+            while True:
+                cursor, batch = await redis_client.hscan(key, cursor, count=batch_size)
+                for file_path, content in batch.items():
+                    file_path = file_path.decode('utf-8')
+                    if file_path in seen:
+                        continue
+                    seen.add(file_path)
+                    yield file_path, decode_content(content)
+                if cursor == 0:
+                    break
+
+    async def get_file_with_metadata(self, project_id: str, file_path: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        async with self._redis_client() as redis_client:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.hget(f"project:{project_id}", file_path)
+                pipe.hget(f"project_meta:{project_id}", file_path)
+                content, metadata = await pipe.execute()
+            return (
+                decode_content(content) if content is not None else None,
+                json.loads(metadata) if metadata is not None else None,
+            )
+
+    async def get_project_metadata(self, project_id: str) -> Dict[str, Dict[str, Any]]:
+        async with self._redis_client() as redis_client:
+            result = await redis_client.hgetall(f"project_meta:{project_id}")
+            return {k.decode('utf-8'): json.loads(v) for k, v in result.items()}
+
+    async def set_metadata(self, project_id: str, metadata: Dict[str, Dict[str, Any]]):
+        if not metadata:
+            return
+        async with self._redis_client() as redis_client:
+            await redis_client.hset(
+                f"project_meta:{project_id}",
+                mapping={file_path: json.dumps(item) for file_path, item in metadata.items()}
+            )
+
+    async def delete_metadata(self, project_id: str, file_paths: Iterable[str]):
+        file_paths = list(file_paths)
+        if not file_paths:
+            return
+        async with self._redis_client() as redis_client:
+            await redis_client.hdel(f"project_meta:{project_id}", *file_paths)
+
+    async def get_project_storage_stats(self, project_id: str) -> Dict[str, Any]:
+        """Raw and stored bytes of a project, without transferring contents that have metadata"""
+        async with self._redis_client() as redis_client:
+            key = f"project:{project_id}"
+            file_paths = await self.list_file_paths(project_id)
+            if not file_paths:
+                return _storage_stats(0, 0, 0)
+        
+            metadata = await self.get_project_metadata(project_id)
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for file_path in file_paths:
+                    pipe.hstrlen(key, file_path)
+                stored_sizes = await pipe.execute()
         
-        # Always create a new Redis client for this operation to ensure it uses the current event loop
-        redis_client = await self._get_redis_client()
+            raw_bytes = sum(metadata[file_path]["size"] for file_path in file_paths if file_path in metadata)
+            missing = [file_path for file_path in file_paths if file_path not in metadata]
+            if missing:
+                contents = await self.get_files(project_id, missing)
+                raw_bytes += sum(len(content.encode('utf-8')) for content in contents.values() if content is not None)
+            return _storage_stats(len(file_paths), raw_bytes, sum(stored_sizes))
+
+    async def get_project_state(self, project_id: str, name: str) -> Optional[str]:
+        async with self._redis_client() as redis_client:
+            value = await redis_client.hget(f"project_state:{project_id}", name)
+            return value.decode('utf-8') if value is not None else None
+
+    async def set_project_state(self, project_id: str, name: str, value: str):
+        async with self._redis_client() as redis_client:
+            await redis_client.hset(f"project_state:{project_id}", name, value)
+
+    async def publish_invalidation(self, message: Dict[str, Any]):
+        async with self._redis_client() as redis_client:
+            await redis_client.publish(INVALIDATION_CHANNEL, json.dumps(message))
 
-        key = f"project:{project_id}"
+    async def listen_invalidations(self) -> AsyncIterator[Dict[str, Any]]:
+        async with self._redis_client() as redis_client:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        yield json.loads(message["data"])
+            finally:
+                await pubsub.aclose()
+
+    async def ping(self) -> bool:
+        """Check that Redis is reachable from the current event loop"""
         try:
-            result = await redis_client.hgetall(key)
-            
-            # Close the client:
-            await redis_client.close()
-                
-            return {k.decode('utf-8'): v.decode('utf-8') for k, v in result.items()}
+            async with self._redis_client() as redis_client:
+                return bool(await redis_client.ping())
         except Exception as e:
-            logging.error(f"Error in get_project_files: {str(e)}")
-            
-            # Close the client
-            await redis_client.close()
-                
-            raise
+            logger.warning(f"Redis health check failed: {e}")
+            return False
+
+    async def close(self):
+        """Disconnect the pool opened by the current event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pool = self._pools.pop(loop, None)
+            self._clients.pop(loop, None)
+        if pool is not None:
+            await pool.disconnect()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return connection counts summed over the pools of all opened event loops"""
+        with self._lock:
+            pools = list(self._pools.values())
+        available = sum(len(getattr(pool, "_available_connections", ())) for pool in pools)
+        in_use = sum(len(getattr(pool, "_in_use_connections", ())) for pool in pools)
+        with self._lock:
+            compression = {
+                "threshold": self.compression_threshold,
+                "writes": self.writes,
+                "compressed_writes": self.compressed_writes,
+                "raw_bytes_written": self.raw_bytes_written,
+                "stored_bytes_written": self.stored_bytes_written,
+            }
+        return {
+            "compression": compression,
+            "pools": len(pools),
+            "max_connections": self.max_connections,
+            "available_connections": available,
+            "in_use_connections": in_use,
+        }
+
+
+# The dedup scripts below derive blob keys from the project hash and access them without
+# declaring them in KEYS. Blobs are shared between projects, so their keys can not share a
+# hash slot with the project keys: deduplicated storage requires a single Redis node (or
+# a primary with replicas) and is refused on Redis Cluster, see DedupRedisStorage.open.
+
+# Project hash values starting with this marker reference a blob instead of holding content
+BLOB_REF_PREFIX = b"\x00blob:"
+
+# Writes a batch of files as blob references. ARGV: ref prefix, blob key prefix, then
+# per file: path, content hash, '1' when the encoded content follows or '0' when the blob
+# exists or its content is sent for another path of the batch, encoded content, metadata
+# JSON ('' to drop it). Blobs are only written from sent content. Returns the hashes of
+# expected blobs that are missing, nothing is written then and the caller retries with
+# their content. All references are added before old ones are released, so contents moved
+# between paths of the same batch are never deleted in between.
+_SET_BLOBS_SCRIPT = """
+local project, meta, refs = KEYS[1], KEYS[2], KEYS[3]
+local prefix, blob_prefix = ARGV[1], ARGV[2]
+local missing = {}
+local changed = {}
+local provided = {}
+for i = 3, #ARGV, 5 do
+    if ARGV[i + 2] == '1' then
+        provided[ARGV[i + 1]] = true
+    end
+end
+for i = 3, #ARGV, 5 do
+    local old = redis.call('HGET', project, ARGV[i])
+    if old ~= prefix .. ARGV[i + 1] then
+        table.insert(changed, {i, old})
+        local hash = ARGV[i + 1]
+        if not provided[hash] and redis.call('EXISTS', blob_prefix .. hash) == 0 then
+            provided[hash] = true
+            table.insert(missing, hash)
+        end
+    end
+end
+if #missing > 0 then
+    return missing
+end
+for i = 3, #ARGV, 5 do
+    if ARGV[i + 2] == '1' then
+        redis.call('SET', blob_prefix .. ARGV[i + 1], ARGV[i + 3], 'NX')
+    end
+end
+for _, change in ipairs(changed) do
+    local i = change[1]
+    redis.call('HINCRBY', refs, ARGV[i + 1], 1)
+    redis.call('HSET', project, ARGV[i], prefix .. ARGV[i + 1])
+end
+for _, change in ipairs(changed) do
+    local old = change[2]
+    if old and string.sub(old, 1, #prefix) == prefix then
+        local old_hash = string.sub(old, #prefix + 1)
+        if redis.call('HINCRBY', refs, old_hash, -1) <= 0 then
+            redis.call('HDEL', refs, old_hash)
+            redis.call('DEL', blob_prefix .. old_hash)
+        end
+    end
+end
+for i = 3, #ARGV, 5 do
+    if ARGV[i + 4] == '' then
+        redis.call('HDEL', meta, ARGV[i])
+    else
+        redis.call('HSET', meta, ARGV[i], ARGV[i + 4])
+    end
+end
+return missing
+"""
+
+# Removes files (ARGV: ref prefix, blob key prefix, paths; no paths removes the whole
+# project) and releases the blobs they referenced.
+_DELETE_BLOBS_SCRIPT = """
+local project, meta, refs = KEYS[1], KEYS[2], KEYS[3]
+local prefix, blob_prefix = ARGV[1], ARGV[2]
+local values = {}
+if #ARGV == 2 then
+    values = redis.call('HVALS', project)
+    redis.call('DEL', project, meta)
+else
+    for i = 3, #ARGV do
+        local value = redis.call('HGET', project, ARGV[i])
+        if value then
+            table.insert(values, value)
+        end
+        redis.call('HDEL', project, ARGV[i])
+        redis.call('HDEL', meta, ARGV[i])
+    end
+end
+for _, value in ipairs(values) do
+    if string.sub(value, 1, #prefix) == prefix then
+        local hash = string.sub(value, #prefix + 1)
+        if redis.call('HINCRBY', refs, hash, -1) <= 0 then
+            redis.call('HDEL', refs, hash)
+            redis.call('DEL', blob_prefix .. hash)
+        end
+    end
+end
+return #values
+"""
+
+# Reads files (ARGV: ref prefix, blob key prefix, paths), resolving blob references
+_GET_BLOBS_SCRIPT = """
+local prefix, blob_prefix = ARGV[1], ARGV[2]
+local values = redis.call('HMGET', KEYS[1], unpack(ARGV, 3))
+for i = 1, #ARGV - 2 do
+    local value = values[i]
+    if value and string.sub(value, 1, #prefix) == prefix then
+        values[i] = redis.call('GET', blob_prefix .. string.sub(value, #prefix + 1))
+    end
+end
+return values
+"""
+
+
+class DedupRedisStorage(RedisStorage):
+    """RedisStorage that stores each distinct file content once.
+
+    Contents live under `blob:{sha256}` with a reference count in the `blob_refs` hash,
+    and `project:{id}` maps each path to a reference to its blob. Writing a file that
+    already has the same content is a no-op, and identical files of different projects
+    share one blob. Blobs are released when their last reference is overwritten or
+    deleted. Plain values written without deduplication are still read as before.
+    Reference counting runs in Lua scripts, so concurrent workers stay consistent.
+    The scripts touch blob keys they do not declare, so Redis Cluster is not supported.
+    """
+
+    BLOB_PREFIX = "blob:"
+    REFS_KEY = "blob_refs"
+    # Files per script call, keeps the Lua argument list small
+    SCRIPT_BATCH_SIZE = 500
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.skipped_writes = 0
+
+    async def open(self):
+        """Open the connection pool, refusing servers that run in cluster mode"""
+        await super().open()
+        async with self._redis_client() as redis_client:
+            try:
+                info = await redis_client.info("cluster")
+            except Exception:
+                # Unreachable servers, or servers without INFO, are not checked here
+                return
+        if info.get("cluster_enabled"):
+            await self.close()
+            raise ValueError("REDIS_DEDUP=1 requires a single Redis node, Redis Cluster is not supported")
+
+    def _keys(self, project_id: str) -> List[str]:
+        return [f"project:{project_id}", f"project_meta:{project_id}", self.REFS_KEY]
+
+    def _script_args(self) -> List[Any]:
+        return [BLOB_REF_PREFIX, self.BLOB_PREFIX]
+
+    @staticmethod
+    def _blob_hash(content: str) -> str:
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _blob_hash_of_ref(self, value: Optional[bytes]) -> Optional[str]:
+        if value is not None and value.startswith(BLOB_REF_PREFIX):
+            return value[len(BLOB_REF_PREFIX):].decode('ascii')
+        return None
+
+    async def set_file(self, project_id: str, file_path: str, content: str, metadata: Optional[Dict[str, Any]] = None):
+        await self.set_files(project_id, {file_path: content}, {file_path: metadata} if metadata is not None else None)
+
+    async def set_files(self, project_id: str, files: Dict[str, str], metadata: Optional[Dict[str, Dict[str, Any]]] = None):
+        metadata = metadata or {}
+        file_paths = list(files)
+        for start in range(0, len(file_paths), self.SCRIPT_BATCH_SIZE):
+            batch = file_paths[start:start + self.SCRIPT_BATCH_SIZE]
+            await self._set_batch(project_id, {file_path: files[file_path] for file_path in batch}, metadata)
+
+    async def _set_batch(self, project_id: str, files: Dict[str, str], metadata: Dict[str, Dict[str, Any]]):
+        async with self._redis_client() as redis_client:
+            key = f"project:{project_id}"
+            hashes = {file_path: self._blob_hash(content) for file_path, content in files.items()}
+            unique_hashes = list(set(hashes.values()))
+
+            # Skip unchanged files and avoid sending contents whose blob already exists
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.hmget(key, list(files))
+                pipe.hmget(self.REFS_KEY, unique_hashes)
+                current, ref_counts = await pipe.execute()
+            existing = {blob_hash for blob_hash, count in zip(unique_hashes, ref_counts) if count is not None}
+            changed = [
+                file_path for file_path, value in zip(files, current)
+                if self._blob_hash_of_ref(value) != hashes[file_path]
+            ]
+            with self._lock:
+                self.skipped_writes += len(files) - len(changed)
+            if not changed:
+                return
+
+            script = redis_client.register_script(_SET_BLOBS_SCRIPT)
+            send_content = set(unique_hashes) - existing
+            for _ in range(3):
+                args = self._script_args()
+                encoded = set()
+                for file_path in changed:
+                    blob_hash = hashes[file_path]
+                    # Contents shared by several paths of the batch are sent once
+                    send = blob_hash in send_content and blob_hash not in encoded
+                    if send:
+                        encoded.add(blob_hash)
+                    args.extend([
+                        file_path,
+                        blob_hash,
+                        "1" if send else "0",
+                        self._encode(files[file_path]) if send else b"",
+                        json.dumps(metadata[file_path]) if file_path in metadata else "",
+                    ])
+                missing = await script(keys=self._keys(project_id), args=args)
+                if not missing:
+                    return
+                # Blobs released by another worker since they were checked
+                send_content.update(blob_hash.decode('ascii') for blob_hash in missing)
+            raise RuntimeError(f"Could not store {len(changed)} files of project {project_id}, blobs kept disappearing")
+
+    async def _get_batch(self, project_id: str, file_paths: List[str]) -> List[Optional[bytes]]:
+        async with self._redis_client() as redis_client:
+            script = redis_client.register_script(_GET_BLOBS_SCRIPT)
+            values = []
+            for start in range(0, len(file_paths), self.SCRIPT_BATCH_SIZE):
+                batch = file_paths[start:start + self.SCRIPT_BATCH_SIZE]
+                values.extend(await script(keys=[f"project:{project_id}"], args=self._script_args() + batch))
+            return values
+
+    async def _resolve(self, redis_client, values: List[bytes]) -> List[Optional[bytes]]:
+        """Replace blob references in values read from a project hash by the blob contents"""
+        refs = [(index, self._blob_hash_of_ref(value)) for index, value in enumerate(values)]
+        refs = [(index, blob_hash) for index, blob_hash in refs if blob_hash is not None]
+        if not refs:
+            return values
+        blobs = await redis_client.mget([self.BLOB_PREFIX + blob_hash for _, blob_hash in refs])
+        resolved = list(values)
+        for (index, _), blob in zip(refs, blobs):
+            resolved[index] = blob
+        return resolved
+
+    async def get_file(self, project_id: str, file_path: str) -> Optional[str]:
+        result = (await self._get_batch(project_id, [file_path]))[0]
+        return decode_content(result) if result is not None else None
+
+    async def get_files(self, project_id: str, file_paths: Iterable[str]) -> Dict[str, Optional[str]]:
+        file_paths = list(file_paths)
+        if not file_paths:
+            return {}
+        results = await self._get_batch(project_id, file_paths)
+        return {
+            file_path: decode_content(result) if result is not None else None
+            for file_path, result in zip(file_paths, results)
+        }
+
+    async def get_file_with_metadata(self, project_id: str, file_path: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        content = await self.get_file(project_id, file_path)
+        if content is None:
+            return None, None
+        async with self._redis_client() as redis_client:
+            metadata = await redis_client.hget(f"project_meta:{project_id}", file_path)
+            return content, json.loads(metadata) if metadata is not None else None
+
+    async def get_project_files(self, project_id: str) -> Dict[str, str]:
+        async with self._redis_client() as redis_client:
+            try:
+                result = await redis_client.hgetall(f"project:{project_id}")
+                file_paths = list(result)
+                values = await self._resolve(redis_client, [result[file_path] for file_path in file_paths])
+                return {
+                    file_path.decode('utf-8'): decode_content(value)
+                    for file_path, value in zip(file_paths, values)
+                    if value is not None
+                }
+            except Exception as e:
+                logger.error(f"Error in get_project_files: {str(e)}")
+                raise
+
+    async def iter_project_files(self, project_id: str, batch_size: int = 100) -> AsyncIterator[Tuple[str, str]]:
+        async with self._redis_client() as redis_client:
+            key = f"project:{project_id}"
+            # HSCAN may return a field more than once while the hash is rehashed
+            seen = set()
+            cursor = 0
+            while True:
+                cursor, batch = await redis_client.hscan(key, cursor, count=batch_size)
+                file_paths = [file_path for file_path in batch if file_path not in seen]
+                seen.update(file_paths)
+                values = await self._resolve(redis_client, [batch[file_path] for file_path in file_paths])
+                for file_path, value in zip(file_paths, values):
+                    if value is not None:
+                        yield file_path.decode('utf-8'), decode_content(value)
+                if cursor == 0:
+                    break
+
+    async def delete_file(self, project_id: str, file_path: str):
+        async with self._redis_client() as redis_client:
+            script = redis_client.register_script(_DELETE_BLOBS_SCRIPT)
+            await script(keys=self._keys(project_id), args=self._script_args() + [file_path])
 
     async def delete_project(self, project_id: str):
-        redis_client = await self._get_redis_client()
-        key = f"project:{project_id}"
-        await redis_client.delete(key)
-        
-        # Close the client
-        await redis_client.close()
+        async with self._redis_client() as redis_client:
+            script = redis_client.register_script(_DELETE_BLOBS_SCRIPT)
+            await script(keys=self._keys(project_id), args=self._script_args())
+            await redis_client.delete(f"project_state:{project_id}")
+
+    async def get_project_storage_stats(self, project_id: str) -> Dict[str, Any]:
+        """Raw bytes of a project and the stored bytes of the blobs it references.
+
+        Blobs shared with other projects are counted in full, so stored bytes of several
+        projects do not add up to the memory used.
+        """
+        async with self._redis_client() as redis_client:
+            result = await redis_client.hgetall(f"project:{project_id}")
+            if not result:
+                return {**_storage_stats(0, 0, 0), "blobs": 0}
+
+            metadata = await self.get_project_metadata(project_id)
+            blob_hashes = {self._blob_hash_of_ref(value) for value in result.values()} - {None}
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for blob_hash in blob_hashes:
+                    pipe.strlen(self.BLOB_PREFIX + blob_hash)
+                blob_sizes = await pipe.execute()
+            # Plain values written without deduplication
+            stored_bytes = sum(blob_sizes) + sum(
+                len(value) for value in result.values() if self._blob_hash_of_ref(value) is None
+            )
+
+            file_paths = [file_path.decode('utf-8') for file_path in result]
+            raw_bytes = sum(metadata[file_path]["size"] for file_path in file_paths if file_path in metadata)
+            missing = [file_path for file_path in file_paths if file_path not in metadata]
+            if missing:
+                contents = await self.get_files(project_id, missing)
+                raw_bytes += sum(len(content.encode('utf-8')) for content in contents.values() if content is not None)
+            return {**_storage_stats(len(file_paths), raw_bytes, stored_bytes), "blobs": len(blob_hashes)}
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        with self._lock:
+            stats["dedup"] = {"skipped_writes": self.skipped_writes}
+        return stats
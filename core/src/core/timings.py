@@ -0,0 +1,170 @@
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("scafoldr.generation")
+
+# Upper bounds in seconds of the histogram buckets, the last bucket is unbounded
+HISTOGRAM_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+class StageTiming:
+    """Accumulated duration and counts of one generation stage"""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self.files = 0
+        self.bytes = 0
+        self.entities = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seconds": round(self.seconds, 6),
+            "calls": self.calls,
+            "files": self.files,
+            "bytes": self.bytes,
+            "entities": self.entities,
+        }
+
+
+class GenerationTimings:
+    """Per-stage timings and counts of a single generation.
+
+    Stages are recorded in the order they first run. Recording the same stage again
+    adds to it, e.g. relationship work done by several aggregate rules.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, StageTiming] = {}
+        # Extra fields of the structured log event, e.g. the backend option
+        self.fields: Dict[str, Any] = {}
+
+    def annotate(self, **fields):
+        """Add fields to the event logged by report()"""
+        self.fields.update(fields)
+
+    def add(self, stage: str, seconds: float, files: int = 0, bytes: int = 0, entities: int = 0):
+        timing = self.stages.get(stage)
+        if timing is None:
+            timing = self.stages[stage] = StageTiming()
+        timing.seconds += seconds
+        timing.calls += 1
+        timing.files += files
+        timing.bytes += bytes
+        timing.entities += entities
+
+    @contextmanager
+    def stage(self, stage: str, entities: int = 0):
+        """Time the body of a with block as a stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start, entities=entities)
+
+    def iter_files(self, stage: str, files: Iterator[Tuple[str, Any]], entities: int = 0) -> Iterator[Tuple[str, Any]]:
+        """Pass (path, content) pairs through, timing only the work of producing them.
+
+        Time spent by the consumer between files (e.g. writing a streamed response) is
+        not counted. The stage is recorded when the iterator is exhausted or closed.
+        """
+        elapsed = 0.0
+        count = 0
+        size = 0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    path, content = next(files)
+                except StopIteration:
+                    elapsed += time.perf_counter() - start
+                    break
+                elapsed += time.perf_counter() - start
+                count += 1
+                size += len(content)
+                yield path, content
+        finally:
+            self.add(stage, elapsed, files=count, bytes=size, entities=entities)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(timing.seconds for timing in self.stages.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_seconds": round(self.total_seconds, 6),
+            "stages": {name: timing.to_dict() for name, timing in self.stages.items()},
+        }
+
+    def report(self, event: str, **fields):
+        """Log the timings as one structured event and add them to the stage histograms"""
+        for name, timing in self.stages.items():
+            stage_histograms.observe(name, timing.seconds)
+        stage_histograms.observe("total", self.total_seconds)
+        logger.info(json.dumps({"event": event, **self.fields, **fields, **self.to_dict()}))
+
+
+class StageHistograms:
+    """Process-wide, thread-safe duration histograms per generation stage"""
+
+    def __init__(self, buckets: List[float] = None):
+        self.buckets = buckets or HISTOGRAM_BUCKETS
+        self._histograms: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = {
+                    "counts": [0] * (len(self.buckets) + 1),
+                    "count": 0,
+                    "sum": 0.0,
+                }
+            histogram["counts"][bisect_left(self.buckets, seconds)] += 1
+            histogram["count"] += 1
+            histogram["sum"] += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cumulative bucket counts per stage, in the layout of Prometheus histograms"""
+        with self._lock:
+            result = {}
+            for stage, histogram in self._histograms.items():
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(self.buckets + ["+Inf"], histogram["counts"]):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                result[stage] = {
+                    "buckets": buckets,
+                    "count": histogram["count"],
+                    "sum": round(histogram["sum"], 6),
+                }
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+# Shared by all generations in the process, exposed on /metrics
+stage_histograms = StageHistograms()
+
+@contextmanager
+def optional_stage(timings: Optional[GenerationTimings], stage: str, entities: int = 0):
+    """Like GenerationTimings.stage, but does nothing when timings is None"""
+    if timings is None:
+        yield
+    else:
+        with timings.stage(stage, entities=entities):
+            yield
+
+def timed_files(timings: Optional[GenerationTimings], stage: str, files: Iterator[Tuple[str, Any]], entities: int = 0) -> Iterator[Tuple[str, Any]]:
+    """Like GenerationTimings.iter_files, but passes files through untouched when timings is None"""
+    if timings is None:
+        return files
+    return timings.iter_files(stage, files, entities=entities)
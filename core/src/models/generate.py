@@ -1,3 +1,4 @@
+from typing import Any, Dict, Optional
 from pydantic import BaseModel
 from models.scafoldr_schema import ScafoldrSchema
 
@@ -16,3 +17,4 @@ class GenerateRequest(BaseModel):
 class GenerateResponse(BaseModel):
     files: dict[str, str]
     commands: list[str]
+    metadata: Optional[Dict[str, Any]] = None  # e.g. stage timings, only when requested
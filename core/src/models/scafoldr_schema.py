@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Dict, Optional
 
 class Column(BaseModel):
@@ -27,10 +27,15 @@ class DatabaseSchema(BaseModel):
     refs: List[Reference] = []
 
 class NameVariations(BaseModel):
+    # Immutable, so Names can be shared between schemas (see NamesCache)
+    model_config = ConfigDict(frozen=True)
+
     singular: str
     plural: str
 
 class Names(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     camel_case: NameVariations
     pascal_case: NameVariations
     kebab_case: NameVariations
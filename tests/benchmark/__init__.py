@@ -0,0 +1,13 @@
+"""
+Generation benchmark package for Scafoldr.
+"""
+
+from .synthetic_dbml import generate_dbml
+from .runner import BenchmarkRunner, compare_results, load_results
+
+__all__ = [
+    'generate_dbml',
+    'BenchmarkRunner',
+    'compare_results',
+    'load_results',
+]
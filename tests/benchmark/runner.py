@@ -0,0 +1,180 @@
+"""
+In-process generation benchmark: times every stage from DBML parsing to rendering.
+"""
+
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .synthetic_dbml import generate_dbml
+
+CORE_DIR = Path(__file__).resolve().parent.parent.parent / "core"
+
+# Make the core package importable when running from the tests directory
+if str(CORE_DIR / "src") not in sys.path:
+    sys.path.insert(0, str(CORE_DIR / "src"))
+
+from pydbml import PyDBML  # noqa: E402
+from core.generators.configurable_generator import ConfigurableGenerator  # noqa: E402
+from core.generators.generator_factory import BACKEND_TO_TEMPLATE_DIR  # noqa: E402
+from core.generators.render_context import RenderContext  # noqa: E402
+from core.scafoldr_schema.base_scafoldr_schema_maker import names_cache  # noqa: E402
+from core.scafoldr_schema.dbml_parser import parse_dbml, UnsupportedDbmlError  # noqa: E402
+from core.scafoldr_schema.dbml_scafoldr_schema_maker import DbmlScafoldrSchemaMaker, schema_cache  # noqa: E402
+
+DEFAULT_SIZES = [10, 100, 1000, 5000]
+
+
+class BenchmarkRunner:
+    """Runs the generation pipeline stage by stage on synthetic schemas.
+
+    Caches that would hide the cost of a stage (the DBML schema cache, name inflection
+    cache and render cache) are cleared or disabled, so every run measures cold work
+    on a warm process. Each stage keeps the fastest of `repeat` runs.
+    """
+
+    def __init__(self, templates: List[str] = None, sizes: List[int] = None, columns_per_table: int = 8,
+                 ref_density: float = 1.0, repeat: int = 3, verbose: bool = False):
+        self.templates = templates or list(BACKEND_TO_TEMPLATE_DIR.keys())
+        self.sizes = sizes or DEFAULT_SIZES
+        self.columns_per_table = columns_per_table
+        self.ref_density = ref_density
+        self.repeat = repeat
+        self.verbose = verbose
+
+    def run(self) -> Dict:
+        """Run all sizes and templates, returns the JSON-serializable results"""
+        results = []
+        for size in self.sizes:
+            dbml = generate_dbml(size, self.columns_per_table, self.ref_density)
+            self._log(f"{size} tables: {len(dbml) / 1024:.0f} KB of DBML")
+
+            results.append({"tables": size, "template": None, "stages": self._time_parsing(dbml)})
+            schema = DbmlScafoldrSchemaMaker().from_dbml(dbml, project_name="benchmark")
+
+            for template in self.templates:
+                stages = self._time_generation(template, schema)
+                results.append({"tables": size, "template": template, "stages": stages})
+                self._log(f"  {template}: {stages['generate_total']:.3f}s total")
+
+        return {
+            "metadata": {
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "columns_per_table": self.columns_per_table,
+                "ref_density": self.ref_density,
+                "repeat": self.repeat,
+            },
+            "results": results,
+        }
+
+    def _time_parsing(self, dbml: str) -> Dict[str, float]:
+        stages = {"pydbml_parse": self._measure(lambda: PyDBML(dbml))}
+
+        def native_parse():
+            try:
+                parse_dbml(dbml)
+            except UnsupportedDbmlError:
+                pass
+        stages["native_parse"] = self._measure(native_parse)
+
+        def from_dbml():
+            if schema_cache:
+                schema_cache.clear()
+            names_cache.clear()
+            DbmlScafoldrSchemaMaker().from_dbml(dbml, project_name="benchmark")
+        stages["from_dbml"] = self._measure(from_dbml)
+        return stages
+
+    def _time_generation(self, template: str, schema) -> Dict[str, float]:
+        config_path = CORE_DIR / "templates" / BACKEND_TO_TEMPLATE_DIR.get(template, template) / "scafoldr_template_config.json"
+        generator = ConfigurableGenerator(str(config_path), render_cache=None)
+        rules = generator.config.generation_rules
+        stages: Dict[str, float] = {}
+
+        def static_files():
+            generator.invalidate_static_manifest()
+            generator._generate_static_files()
+        if rules.static_files.enabled:
+            stages["static_files"] = self._measure(static_files)
+
+        def relationships():
+            graph = RenderContext(schema, generator.variable_resolver, generator.relationship_handler).relationship_graph()
+            if graph:
+                graph.edges, graph.join_tables, graph.associations
+        stages["relationships"] = self._measure(relationships)
+
+        # Each rule gets a fresh render context, so shared variable resolution is counted once per rule
+        for rule in rules.entity_based:
+            if rule.enabled:
+                stages[f"entity:{rule.name}"] = self._measure(lambda rule=rule: generator._generate_entity_files(
+                    rule, schema.backend_schema.entities, schema,
+                    RenderContext(schema, generator.variable_resolver, generator.relationship_handler)))
+        for rule in rules.aggregate:
+            if rule.enabled:
+                stages[f"aggregate:{rule.name}"] = self._measure(lambda rule=rule: generator._generate_aggregate_files(
+                    rule, schema.backend_schema.entities, schema,
+                    RenderContext(schema, generator.variable_resolver, generator.relationship_handler)))
+
+        stages["generate_total"] = self._measure(lambda: generator.generate(schema))
+        return stages
+
+    def _measure(self, func: Callable[[], object]) -> float:
+        best = None
+        for _ in range(self.repeat):
+            # Generators print warnings per entity, keep them out of the report
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output if not self.verbose else sys.stdout):
+                start = time.perf_counter()
+                func()
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return round(best, 6)
+
+    def _log(self, message: str):
+        print(message, file=sys.stderr)
+
+
+def compare_results(current: Dict, baseline: Dict, threshold: float = 0.2, min_seconds: float = 0.005) -> List[Dict]:
+    """Find stages that got slower than the baseline.
+
+    A stage regresses when it takes more than `threshold` (relative) and `min_seconds`
+    (absolute) longer than in the baseline. Stages missing from the baseline are skipped.
+    """
+    baseline_stages = {
+        (result["tables"], result["template"]): result["stages"] for result in baseline.get("results", [])
+    }
+    regressions = []
+    for result in current.get("results", []):
+        previous = baseline_stages.get((result["tables"], result["template"]))
+        if not previous:
+            continue
+        for stage, seconds in result["stages"].items():
+            before = previous.get(stage)
+            if before is None:
+                continue
+            if seconds > before * (1 + threshold) and seconds - before > min_seconds:
+                regressions.append({
+                    "tables": result["tables"],
+                    "template": result["template"],
+                    "stage": stage,
+                    "baseline": before,
+                    "current": seconds,
+                    "change": (seconds - before) / before if before else None,
+                })
+    return regressions
+
+
+def load_results(path: Path) -> Optional[Dict]:
+    """Load benchmark results from a JSON file, None if it does not exist"""
+    if not path.exists():
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
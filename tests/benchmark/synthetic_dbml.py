@@ -0,0 +1,82 @@
+"""
+Synthetic DBML schemas for benchmarking generation at scale.
+"""
+
+import math
+import random
+from typing import List
+
+COLUMN_TYPES = [
+    'integer', 'bigint', 'varchar', 'varchar(255)', 'text', 'boolean',
+    'timestamp', 'date', 'decimal(10,2)', 'float', 'uuid', 'serial',
+]
+
+WORDS = [
+    'account', 'order', 'product', 'customer', 'invoice', 'payment', 'category',
+    'review', 'shipment', 'supplier', 'warehouse', 'employee', 'project', 'task',
+    'comment', 'message', 'session', 'device', 'address', 'coupon',
+]
+
+
+def generate_dbml(tables: int, columns_per_table: int = 8, ref_density: float = 1.0, seed: int = 42) -> str:
+    """Generate a DBML schema with the given number of tables.
+
+    Args:
+        tables: Number of tables
+        columns_per_table: Regular columns per table, besides the primary key and foreign keys
+        ref_density: Average number of foreign keys per table, pointing at earlier tables
+        seed: Random seed, the same arguments always produce the same DBML
+    Returns:
+        The DBML schema as a string
+    """
+    rng = random.Random(seed)
+    names = _table_names(tables, rng)
+    blocks: List[str] = ['Project benchmark {\n  database_type: "PostgreSQL"\n}']
+    refs: List[str] = []
+
+    for index, name in enumerate(names):
+        lines = [f"Table {name} {{", "  id serial [pk]"]
+        for column in range(columns_per_table):
+            settings = []
+            if rng.random() < 0.3:
+                settings.append("not null")
+            if rng.random() < 0.1:
+                settings.append("unique")
+            suffix = f" [{', '.join(settings)}]" if settings else ""
+            lines.append(f"  {rng.choice(WORDS)}_{column} {rng.choice(COLUMN_TYPES)}{suffix}")
+
+        # Foreign keys only point at earlier tables, so the schema has no cycles
+        fk_count = _poisson(ref_density, rng) if index else 0
+        for target in sorted(set(rng.randrange(index) for _ in range(fk_count))):
+            column = f"{names[target]}_id"
+            if rng.random() < 0.5:
+                lines.append(f"  {column} integer [ref: > {names[target]}.id]")
+            else:
+                lines.append(f"  {column} integer [not null]")
+                refs.append(f"Ref: {name}.{column} > {names[target]}.id")
+
+        lines.append("  created_at timestamp")
+        lines.append("}")
+        blocks.append("\n".join(lines))
+
+    return "\n\n".join(blocks + refs) + "\n"
+
+
+def _table_names(count: int, rng: random.Random) -> List[str]:
+    """Plural snake_case table names, unique and stable for a seed"""
+    names = []
+    for index in range(count):
+        names.append(f"{rng.choice(WORDS)}_{index}s")
+    return names
+
+
+def _poisson(mean: float, rng: random.Random) -> int:
+    """Small Poisson sampler, keeps the benchmark free of extra dependencies"""
+    if mean <= 0:
+        return 0
+    threshold = math.exp(-mean)
+    count, product = 0, rng.random()
+    while product > threshold:
+        count += 1
+        product *= rng.random()
+    return count
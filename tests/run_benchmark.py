@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Large-schema generation benchmark for Scafoldr.
+Times each stage (parsing, schema building, static files, every generation rule,
+relationships) in-process for synthetic schemas, without Docker or a running API.
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from benchmark import BenchmarkRunner, compare_results, load_results
+
+DEFAULT_BASELINE = Path(__file__).parent / "benchmark" / "baseline.json"
+
+
+def create_argument_parser():
+    """Create and configure argument parser."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark Scafoldr code generation on synthetic DBML schemas",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                                    # 10/100/1000/5000 tables, all templates
+  %(prog)s --sizes 10 100 --template java-spring
+  %(prog)s --output results.json              # Write results to a file
+  %(prog)s --save-baseline                    # Store results as the new baseline
+  %(prog)s --compare                          # Fail if a stage regressed against the baseline
+"""
+    )
+    parser.add_argument('--sizes', type=int, nargs='+', help='Table counts to benchmark (default: 10 100 1000 5000)')
+    parser.add_argument('--template', '-t', action='append', dest='templates',
+                        help='Backend option to benchmark (can be specified multiple times)')
+    parser.add_argument('--columns', type=int, default=8, help='Regular columns per table (default: 8)')
+    parser.add_argument('--ref-density', type=float, default=1.0, help='Average foreign keys per table (default: 1.0)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per stage, the fastest is kept (default: 3)')
+    parser.add_argument('--output', '-o', help='Write JSON results to this file instead of stdout')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help=f'Baseline file (default: {DEFAULT_BASELINE})')
+    parser.add_argument('--save-baseline', action='store_true', help='Store the results as the baseline')
+    parser.add_argument('--compare', action='store_true', help='Compare the results against the baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Relative slowdown that counts as a regression (default: 0.2)')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Show generator output')
+    return parser
+
+
+def main():
+    """Main entry point."""
+    args = create_argument_parser().parse_args()
+
+    # Fail before a long run when there is nothing to compare against
+    baseline_path = Path(args.baseline)
+    baseline = None
+    if args.compare:
+        baseline = load_results(baseline_path)
+        if baseline is None:
+            print(f"❌ No baseline found at {baseline_path}, run with --save-baseline first", file=sys.stderr)
+            return 1
+
+    runner = BenchmarkRunner(
+        templates=args.templates,
+        sizes=args.sizes,
+        columns_per_table=args.columns,
+        ref_density=args.ref_density,
+        repeat=args.repeat,
+        verbose=args.verbose,
+    )
+    results = runner.run()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+        print(f"📋 Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    if args.compare:
+        regressions = compare_results(results, baseline, threshold=args.threshold)
+        if regressions:
+            print("❌ Regressions against the baseline:", file=sys.stderr)
+            for regression in regressions:
+                print(
+                    f"   {regression['tables']:>5} tables {regression['template'] or 'parsing':20} "
+                    f"{regression['stage']:40} {regression['baseline']:.4f}s → {regression['current']:.4f}s",
+                    file=sys.stderr
+                )
+            return 1
+        print("✅ No regressions against the baseline", file=sys.stderr)
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(output)
+        print(f"✅ Baseline saved to {baseline_path}", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+"""
+Unit tests for the Scafoldr core package.
+"""
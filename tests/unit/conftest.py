@@ -0,0 +1,30 @@
+"""
+Shared setup for the core unit tests.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+CORE_DIR = Path(__file__).resolve().parent.parent.parent / "core"
+
+# Make the core package importable when running from the tests directory
+if str(CORE_DIR / "src") not in sys.path:
+    sys.path.insert(0, str(CORE_DIR / "src"))
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine to completion on a fresh event loop"""
+    return asyncio.run
+
+
+@pytest.fixture
+def redis_params():
+    """Connection parameters of RedisStorage for an isolated in-memory Redis server"""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    from fakeredis.aioredis import FakeAsyncRedisConnection
+    return {"connection_class": FakeAsyncRedisConnection, "server": fakeredis.FakeServer()}
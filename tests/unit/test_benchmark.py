@@ -0,0 +1,27 @@
+"""
+Regression detection of the generation benchmark.
+"""
+
+from benchmark import compare_results, load_results
+
+
+def _results(**stages):
+    return {"results": [{"tables": 10, "template": "java-spring", "stages": stages}]}
+
+
+def test_flags_stages_slower_than_the_threshold():
+    baseline = _results(generate_total=0.100, static_files=0.001)
+    current = _results(generate_total=0.150, static_files=0.004, new_stage=1.0)
+    (regression,) = compare_results(current, baseline, threshold=0.2)
+    assert regression["stage"] == "generate_total" and round(regression["change"], 2) == 0.5
+
+
+def test_ignores_noise_and_unknown_sizes():
+    baseline = _results(generate_total=0.100)
+    assert compare_results(_results(generate_total=0.110), baseline, threshold=0.2) == []
+    other_size = {"results": [{"tables": 100, "template": "java-spring", "stages": {"generate_total": 9.0}}]}
+    assert compare_results(other_size, baseline) == []
+
+
+def test_missing_baseline(tmp_path):
+    assert load_results(tmp_path / "baseline.json") is None
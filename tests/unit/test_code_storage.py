@@ -0,0 +1,105 @@
+"""
+CodeStorage behavior on the in-memory and Redis providers.
+"""
+
+import asyncio
+
+import pytest
+
+from core.storage.code_storage import CodeStorage
+from core.storage.storage_provider import InMemoryStorage, RedisStorage
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return InMemoryStorage()
+    return RedisStorage(request.getfixturevalue("redis_params"))
+
+
+def test_project_state_is_not_a_file(run, backend):
+    async def scenario():
+        storage = CodeStorage(backend)
+        await storage.save_file("p", "a.py", "print(1)")
+        await storage.set_project_state("p", "scaffold", '{"project_name": "p"}')
+        assert await storage.get_project_state("p", "scaffold") == '{"project_name": "p"}'
+        assert await storage.get_project_state("p", "other") is None
+        assert await storage.get_project_files("p") == {"a.py": "print(1)"}
+        assert list(await storage.get_project_metadata("p")) == ["a.py"]
+        await storage.delete_project("p")
+        assert await storage.get_project_state("p", "scaffold") is None
+    run(scenario())
+
+
+def test_bulk_save_and_metadata(run, backend):
+    async def scenario():
+        storage = CodeStorage(backend)
+        metadata = await storage.save_files_bulk("p", {"a.py": "x" * 500, "empty.py": ""})
+        assert metadata["a.py"].size == 500 and metadata["empty.py"].size == 0
+        content, stored = await storage.get_file_with_metadata("p", "empty.py")
+        assert content == "" and stored.hash == metadata["empty.py"].hash
+        assert dict([item async for item in storage.iter_project_files("p", 1)]) == {"a.py": "x" * 500, "empty.py": ""}
+    run(scenario())
+
+
+def test_ping(run, backend):
+    assert run(CodeStorage(backend).ping()) is True
+
+
+def test_ping_unreachable_redis(run):
+    storage = CodeStorage(RedisStorage({"host": "127.0.0.1", "port": 1, "socket_connect_timeout": 0.5}))
+    assert run(storage.ping()) is False
+
+
+def test_unopened_event_loops_close_their_connections(run, redis_params, monkeypatch):
+    import redis.asyncio as redis
+
+    closed = []
+    aclose = redis.Redis.aclose
+
+    async def counting_aclose(client, *args, **kwargs):
+        closed.append(client)
+        await aclose(client, *args, **kwargs)
+
+    monkeypatch.setattr(redis.Redis, "aclose", counting_aclose)
+    storage = RedisStorage(redis_params)
+    for i in range(5):
+        run(storage.set_file("p", f"f{i}.py", "x"))
+    assert run(storage.get_file("p", "f4.py")) == "x"
+    assert len(closed) == 6
+    assert storage.stats()["pools"] == 0
+
+
+def test_opened_event_loop_reuses_its_pool(run, redis_params):
+    async def scenario():
+        storage = CodeStorage(RedisStorage(redis_params))
+        await storage.open()
+        for i in range(5):
+            await storage.save_file("p", f"f{i}.py", "x")
+        stats = storage.stats()
+        assert (stats["pools"], stats["available_connections"]) == (1, 1)
+        await storage.close()
+        assert storage.stats()["pools"] == 0
+    run(scenario())
+
+
+def test_failed_bulk_save_falls_back_to_single_files(run):
+    class FlakyStorage(InMemoryStorage):
+        async def set_files(self, project_id, files, metadata=None):
+            raise ConnectionError("pipeline failed")
+
+        async def set_file(self, project_id, file_path, content, metadata=None):
+            if file_path == "bad.py":
+                raise ConnectionError("write failed")
+            await super().set_file(project_id, file_path, content, metadata)
+
+    async def scenario():
+        storage = CodeStorage(FlakyStorage())
+        changed = []
+        storage.on_file_change(lambda change: changed.append(change.file_path))
+        saved = await storage.save_files_bulk("p", {"a.py": "a", "bad.py": "b", "c.py": "c"})
+        assert sorted(saved) == ["a.py", "c.py"]
+        assert await storage.get_project_files("p") == {"a.py": "a", "c.py": "c"}
+        await asyncio.sleep(0)
+        assert sorted(changed) == ["a.py", "c.py"]
+    run(scenario())
@@ -0,0 +1,48 @@
+"""
+Compressed storage of large file contents.
+"""
+
+import os
+
+import pytest
+
+from core.storage.compression import COMPRESSION_MAGIC, decode_content, encode_content, is_compressed
+from core.storage.storage_provider import RedisStorage
+
+
+def test_round_trip_above_threshold():
+    content = "const a = 1;\n" * 1000
+    stored = encode_content(content, threshold=4096)
+    assert is_compressed(stored) and len(stored) < len(content)
+    assert decode_content(stored) == content
+
+
+@pytest.mark.parametrize("content,threshold", [("small", 4096), ("x" * 10000, 0), ("", 1)])
+def test_small_contents_or_disabled_threshold_stay_plain(content, threshold):
+    stored = encode_content(content, threshold)
+    assert stored == content.encode("utf-8") and not is_compressed(stored)
+    assert decode_content(stored) == content
+
+
+def test_incompressible_contents_stay_plain():
+    content = os.urandom(3000).hex()[:5000]
+    stored = encode_content(content, threshold=16)
+    assert decode_content(stored) == content
+
+
+def test_unknown_format_version_is_rejected():
+    with pytest.raises(ValueError):
+        decode_content(COMPRESSION_MAGIC + bytes([9]) + b"z" + b"payload")
+
+
+def test_redis_storage_reads_plain_and_compressed_values(run, redis_params):
+    async def scenario():
+        plain = RedisStorage(redis_params)
+        await plain.set_file("p", "old.txt", "a" * 10000)
+        storage = RedisStorage(redis_params, compression_threshold=4096)
+        await storage.set_files("p", {"big.txt": "b" * 10000, "small.txt": "c"})
+        assert await storage.get_project_files("p") == {"old.txt": "a" * 10000, "big.txt": "b" * 10000, "small.txt": "c"}
+        stats = storage.stats()["compression"]
+        assert (stats["writes"], stats["compressed_writes"]) == (2, 1)
+        assert stats["stored_bytes_written"] < stats["raw_bytes_written"]
+    run(scenario())
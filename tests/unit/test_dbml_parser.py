@@ -0,0 +1,60 @@
+"""
+The native DBML parser against PyDBML.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from benchmark import generate_dbml
+from core.scafoldr_schema.dbml_parser import UnsupportedDbmlError, parse_dbml
+from core.scafoldr_schema.dbml_scafoldr_schema_maker import DbmlScafoldrSchemaMaker
+
+INPUT_DIR = Path(__file__).resolve().parent.parent / "input"
+
+
+def _pydbml(dbml):
+    return DbmlScafoldrSchemaMaker()._parse_with_pydbml(dbml)
+
+
+@pytest.mark.parametrize("dbml_file", sorted(path.name for path in INPUT_DIR.glob("*.dbml")))
+def test_matches_pydbml_on_sample_schemas(dbml_file):
+    dbml = (INPUT_DIR / dbml_file).read_text()
+    assert parse_dbml(dbml) == _pydbml(dbml)
+
+
+def test_matches_pydbml_on_synthetic_schema():
+    dbml = generate_dbml(50, ref_density=2.0)
+    assert parse_dbml(dbml) == _pydbml(dbml)
+
+
+def test_parses_settings_and_refs():
+    dbml = """
+    Table users {
+      id integer [pk, increment]
+      email varchar(255) [not null, unique, note: 'login']
+      role varchar [default: 'member']
+    }
+
+    Table posts {
+      id integer [pk]
+      user_id integer [ref: > users.id] // author
+    }
+    """
+    schema = parse_dbml(dbml)
+    email = schema.tables[0].columns[1]
+    assert (email.type, email.not_null, email.unique) == ("varchar(255)", True, True)
+    assert schema.tables[0].columns[2].default == "member"
+    (ref,) = schema.refs
+    assert (ref.type, ref.col1.table, ref.col2.table) == (">", "posts", "users")
+    assert schema == _pydbml(dbml)
+
+
+@pytest.mark.parametrize("dbml", [
+    "Enum status {\n  active\n}\n",
+    "Table users {\n  id integer [pk]\n  indexes {\n    id\n  }\n}\n",
+    "Table users {\n  id integer [pk\n}\n",
+])
+def test_unsupported_or_invalid_dbml_is_left_to_pydbml(dbml):
+    with pytest.raises(UnsupportedDbmlError):
+        parse_dbml(dbml)
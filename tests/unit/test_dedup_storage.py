@@ -0,0 +1,133 @@
+"""
+Round trips through DedupRedisStorage, the content-addressed storage mode.
+"""
+
+import pytest
+import redis.asyncio as redis
+
+from core.storage.code_storage import CodeStorage
+from core.storage.storage_provider import DedupRedisStorage, RedisStorage
+
+
+async def _blob_state(redis_params):
+    client = redis.Redis(connection_pool=redis.ConnectionPool(**redis_params))
+    refs = await client.hgetall("blob_refs")
+    blobs = await client.keys("blob:*")
+    await client.aclose()
+    return {key.decode(): int(value) for key, value in refs.items()}, len(blobs)
+
+
+def test_round_trip(run, redis_params):
+    async def scenario():
+        storage = DedupRedisStorage(redis_params, compression_threshold=16)
+        files = {"a.py": "print('a')", "big.txt": "x" * 1000, "same.py": "print('a')"}
+        await storage.set_files("p", files)
+        assert await storage.get_files("p", list(files) + ["nope"]) == {**files, "nope": None}
+        assert await storage.get_project_files("p") == files
+        assert dict([item async for item in storage.iter_project_files("p", 1)]) == files
+        refs, blobs = await _blob_state(redis_params)
+        assert blobs == 2 and sorted(refs.values()) == [1, 2]
+    run(scenario())
+
+
+def test_swapping_contents_between_paths(run, redis_params):
+    async def scenario():
+        storage = DedupRedisStorage(redis_params)
+        await storage.set_files("p", {"a": "AAA", "b": "BBB"})
+        await storage.set_files("p", {"a": "BBB", "b": "AAA"})
+        assert await storage.get_files("p", ["a", "b"]) == {"a": "BBB", "b": "AAA"}
+        refs, blobs = await _blob_state(redis_params)
+        assert blobs == 2 and sorted(refs.values()) == [1, 1]
+    run(scenario())
+
+
+def test_moving_content_to_another_path_of_the_batch(run, redis_params):
+    async def scenario():
+        storage = DedupRedisStorage(redis_params)
+        await storage.set_files("p", {"a": "AAA", "b": "BBB"})
+        await storage.set_files("p", {"a": "CCC", "b": "AAA"})
+        assert await storage.get_files("p", ["a", "b"]) == {"a": "CCC", "b": "AAA"}
+        refs, blobs = await _blob_state(redis_params)
+        assert blobs == 2 and sorted(refs.values()) == [1, 1]
+    run(scenario())
+
+
+def test_rewriting_same_content_is_a_no_op(run, redis_params):
+    async def scenario():
+        storage = DedupRedisStorage(redis_params)
+        await storage.set_files("p", {"a": "AAA"})
+        await storage.set_file("p", "a", "AAA")
+        await storage.set_files("p", {"a": "AAA"})
+        assert await storage.get_file("p", "a") == "AAA"
+        assert storage.stats()["dedup"]["skipped_writes"] == 2
+        refs, blobs = await _blob_state(redis_params)
+        assert blobs == 1 and list(refs.values()) == [1]
+    run(scenario())
+
+
+def test_empty_files(run, redis_params):
+    async def scenario():
+        storage = DedupRedisStorage(redis_params)
+        await storage.set_files("p", {"__init__.py": "", ".gitkeep": ""})
+        await storage.set_file("q", "__init__.py", "")
+        assert await storage.get_file("p", "__init__.py") == ""
+        assert await storage.get_files("p", [".gitkeep"]) == {".gitkeep": ""}
+        assert await storage.get_file("q", "__init__.py") == ""
+        refs, blobs = await _blob_state(redis_params)
+        assert blobs == 1 and list(refs.values()) == [3]
+    run(scenario())
+
+
+def test_missing_blob_is_uploaded_again(run, redis_params):
+    async def scenario():
+        storage = DedupRedisStorage(redis_params)
+        await storage.set_file("p", "a", "AAA")
+        client = redis.Redis(connection_pool=redis.ConnectionPool(**redis_params))
+        # The reference count says the blob exists, but it is gone
+        await client.delete(*await client.keys("blob:*"))
+        await client.aclose()
+        await storage.set_file("q", "a", "AAA")
+        assert await storage.get_file("q", "a") == "AAA"
+    run(scenario())
+
+
+def test_releasing_blobs(run, redis_params):
+    async def scenario():
+        storage = DedupRedisStorage(redis_params)
+        code_storage = CodeStorage(storage)
+        await code_storage.save_files_bulk("p1", {"lock.json": "L" * 100, "a.txt": "A"})
+        await code_storage.save_files_bulk("p2", {"lock.json": "L" * 100})
+        await code_storage.delete_file("p1", "a.txt")
+        assert (await _blob_state(redis_params))[1] == 1
+        await code_storage.delete_project("p1")
+        await code_storage.delete_project("p2")
+        assert await _blob_state(redis_params) == ({}, 0)
+    run(scenario())
+
+
+def test_plain_values_stay_readable(run, redis_params):
+    async def scenario():
+        await RedisStorage(redis_params).set_files("p", {"legacy.txt": "old", "empty.txt": ""})
+        storage = DedupRedisStorage(redis_params)
+        assert await storage.get_file("p", "legacy.txt") == "old"
+        assert await storage.get_file("p", "empty.txt") == ""
+        await storage.set_file("p", "legacy.txt", "new")
+        assert await storage.get_project_files("p") == {"legacy.txt": "new", "empty.txt": ""}
+    run(scenario())
+
+
+def test_cluster_mode_is_refused(run, redis_params, monkeypatch):
+    async def cluster_info(client, section=None, *args, **kwargs):
+        return {"cluster_enabled": 1}
+
+    async def scenario():
+        storage = DedupRedisStorage(redis_params)
+        # The in-memory server has no INFO command, open() then skips the check
+        await storage.open()
+        await storage.close()
+
+        monkeypatch.setattr(redis.Redis, "info", cluster_info)
+        with pytest.raises(ValueError):
+            await storage.open()
+        assert storage.stats()["pools"] == 0
+    run(scenario())
@@ -0,0 +1,153 @@
+"""
+Code storage cache, within a worker and across workers.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from core.storage import file_cache
+from core.storage.code_storage import CodeStorage
+from core.storage.file_cache import FileCache
+from core.storage.storage_provider import InMemoryStorage, RedisStorage
+
+
+def test_fill_that_raced_with_an_invalidation_is_dropped():
+    cache = FileCache()
+    token = cache.token()
+    cache.invalidate("p", ["a.py"])
+    cache.put(token, "p", "a.py", "stale", 5)
+    assert cache.get("p", "a.py") is None
+
+    cache.put(cache.token(), "p", "a.py", "fresh", 5)
+    assert cache.get("p", "a.py") == "fresh"
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(file_cache.time, "monotonic", lambda: now[0])
+    cache = FileCache(ttl=10)
+    cache.put(cache.token(), "p", "a.py", "a", 1)
+    now[0] += 5
+    assert cache.get("p", "a.py") == "a"
+    now[0] += 10
+    assert cache.get("p", "a.py") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_is_bounded_by_bytes():
+    cache = FileCache(max_bytes=100)
+    for name in ["a", "b", "c"]:
+        cache.put(cache.token(), "p", name, name, 40)
+    cache.put(cache.token(), "p", "huge", "huge", 200)
+    assert cache.get("p", "a") is None and cache.get("p", "c") == "c"
+    stats = cache.stats()
+    assert (stats["size"], stats["bytes"], stats["evictions"]) == (2, 80, 1)
+
+
+def test_invalidation_drops_files_and_the_listing():
+    cache = FileCache()
+    for key in [("p", "a.py"), ("p", "b.py"), ("p", None), ("q", "a.py")]:
+        cache.put(cache.token(), *key, "x", 1)
+    cache.invalidate("p", ["a.py"])
+    assert cache.get("p", "a.py") is None and cache.get("p") is None
+    assert cache.get("p", "b.py") == "x"
+
+    cache.invalidate("p")
+    assert cache.get("p", "b.py") is None and cache.get("q", "a.py") == "x"
+
+
+def test_writes_invalidate_cached_reads(run):
+    async def scenario():
+        storage = CodeStorage(InMemoryStorage(), cache=FileCache())
+        await storage.save_file("p", "a.py", "one")
+        assert await storage.get_file("p", "a.py") == "one"
+        assert await storage.get_file("p", "a.py") == "one"
+        assert storage.cache.stats()["hits"] == 1
+
+        await storage.save_file("p", "a.py", "two")
+        assert await storage.get_file("p", "a.py") == "two"
+        assert (await storage.get_project_metadata("p"))["a.py"].size == 3
+        await storage.delete_file("p", "a.py")
+        assert await storage.get_file("p", "a.py") is None
+        assert await storage.get_project_metadata("p") == {}
+        await storage.close()
+    run(scenario())
+
+
+def test_writes_invalidate_other_workers(run, redis_params):
+    async def scenario():
+        writer = CodeStorage(RedisStorage(redis_params), cache=FileCache(ttl=60))
+        reader = CodeStorage(RedisStorage(redis_params), cache=FileCache(ttl=60))
+        await writer.start_invalidation_listener()
+        await reader.start_invalidation_listener()
+        await asyncio.sleep(0.1)
+
+        await writer.save_files_bulk("p", {"a.py": "one", "b.py": "two"})
+        assert await reader.get_file("p", "a.py") == "one"
+        assert sorted(await reader.get_project_metadata("p")) == ["a.py", "b.py"]
+
+        await writer.save_file("p", "a.py", "changed")
+        await asyncio.sleep(0.1)
+        assert await reader.get_file("p", "a.py") == "changed"
+        assert (await reader.get_project_metadata("p"))["a.py"].size == len("changed")
+
+        await writer.delete_project("p")
+        await asyncio.sleep(0.1)
+        assert await reader.get_file("p", "b.py") is None
+        assert await reader.get_project_metadata("p") == {}
+
+        await writer.close()
+        await reader.close()
+    run(scenario())
+
+
+def count_reads(backend, monkeypatch):
+    """Record the names of read methods called on the backend"""
+    calls = []
+    for name in ["get_file", "get_files", "get_project_files", "get_project_metadata", "list_file_paths", "get_file_with_metadata"]:
+        method = getattr(backend, name)
+
+        async def counted(*args, _method=method, _name=name, **kwargs):
+            calls.append(_name)
+            return await _method(*args, **kwargs)
+
+        monkeypatch.setattr(backend, name, counted)
+    return calls
+
+
+def test_project_reads_are_served_from_the_cache(run, monkeypatch):
+    async def scenario():
+        storage = CodeStorage(InMemoryStorage(), cache=FileCache())
+        await storage.save_files_bulk("p", {"a.py": "import os", "b.py": "print(1)"})
+        calls = count_reads(storage.backend, monkeypatch)
+
+        assert await storage.get_project_files("p") == {"a.py": "import os", "b.py": "print(1)"}
+        assert calls
+        calls.clear()
+        assert await storage.get_project_files("p") == {"a.py": "import os", "b.py": "print(1)"}
+        assert calls == []
+
+        await storage.save_file("p", "b.py", "print(2)")
+        assert await storage.get_project_files("p") == {"a.py": "import os", "b.py": "print(2)"}
+        assert "get_files" in calls and "get_project_files" not in calls
+        await storage.close()
+    run(scenario())
+
+
+def test_second_agent_search_does_not_read_storage(monkeypatch):
+    pytest.importorskip("strands")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    from core.company.tools.code_tools import search_file_by_content, search_files_by_name
+
+    storage = CodeStorage(InMemoryStorage(), cache=FileCache())
+    agent = SimpleNamespace(state={"code_storage": storage, "project_id": "p"})
+    asyncio.run(storage.save_files_bulk("p", {"src/app.js": "const app = express()", "README.md": "app"}))
+    calls = count_reads(storage.backend, monkeypatch)
+
+    first = search_file_by_content("express", agent=agent)
+    calls.clear()
+    assert search_file_by_content("express", agent=agent) == first
+    assert search_files_by_name("*.js", agent=agent)["files"] == ["src/app.js"]
+    assert calls == []
@@ -0,0 +1,92 @@
+"""
+Admission control and accounting of the generation process pool.
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from core.generation_pool import GenerationPool, GenerationPoolFull, GenerationPoolUnavailable, merge_stats
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def _fail():
+    raise ValueError("broken template")
+
+
+def _pid_stats():
+    return {"pid": os.getpid(), "cache": {"hits": 1, "misses": 1, "hit_ratio": 0.5}}
+
+
+@pytest.fixture
+def pool():
+    pool = GenerationPool(max_workers=1, max_queue=0, worker_stats=_pid_stats)
+    yield pool
+    pool.shutdown()
+
+
+def test_runs_jobs_and_records_outcomes(run, pool):
+    assert run(pool.run(_sleep, 0)) == 0
+    with pytest.raises(ValueError):
+        run(pool.run(_fail))
+    stats = pool.stats()
+    assert (stats["submitted"], stats["completed"], stats["failed"], stats["in_flight"]) == (2, 1, 1, 0)
+
+
+def test_rejects_jobs_beyond_the_queue(run, pool):
+    async def scenario():
+        first = asyncio.ensure_future(pool.run(_sleep, 0.5))
+        await asyncio.sleep(0)
+        with pytest.raises(GenerationPoolFull) as rejected:
+            await pool.run(_sleep, 0)
+        assert rejected.value.retry_after >= 1
+        await first
+    run(scenario())
+    assert pool.stats()["rejected"] == 1
+
+
+def test_cancelled_caller_keeps_the_slot_until_the_job_ends(run, pool):
+    async def scenario():
+        await pool.run(_sleep, 0)  # start the worker process
+        job = asyncio.ensure_future(pool.run(_sleep, 1.0))
+        await asyncio.sleep(0.2)
+        job.cancel()
+        await asyncio.sleep(0.1)
+        assert pool.stats()["in_flight"] == 1
+        with pytest.raises(GenerationPoolFull):
+            await pool.run(_sleep, 0)
+        for _ in range(50):
+            if pool.stats()["in_flight"] == 0:
+                break
+            await asyncio.sleep(0.1)
+        assert pool.stats()["in_flight"] == 0
+        assert await pool.run(_sleep, 0) == 0
+    run(scenario())
+
+
+def test_collects_worker_stats(run, pool):
+    run(pool.run(_sleep, 0))
+    (stats,) = pool.worker_stats()
+    assert stats["pid"] != os.getpid()
+
+
+def test_shut_down_pool_rejects_jobs(run, pool):
+    pool.shutdown()
+    with pytest.raises(GenerationPoolUnavailable):
+        run(pool.run(_sleep, 0))
+
+
+def test_merge_stats():
+    merged = merge_stats([
+        {"cache": {"hits": 3, "shared_hits": 1, "misses": 4, "hit_ratio": 0.5, "generators": ["a"], "backend": None}},
+        {"cache": {"hits": 0, "shared_hits": 0, "misses": 2, "hit_ratio": 0.0, "generators": ["a", "b"], "backend": None}},
+        None,
+    ])
+    assert merged == {"cache": {"hits": 3, "shared_hits": 1, "misses": 6, "hit_ratio": 0.4, "generators": ["a", "b"], "backend": None}}
+    assert merge_stats([None]) is None
@@ -0,0 +1,51 @@
+"""
+Warm generators kept by the GeneratorRegistry.
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from core.generators.generator_factory import GeneratorRegistry
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent.parent / "core" / "templates"
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    template_dir = tmp_path / "node_express_js"
+    shutil.copytree(TEMPLATES_DIR / "node_express_js", template_dir)
+    return str(template_dir / "scafoldr_template_config.json")
+
+
+def test_generator_is_reused_while_templates_are_unchanged(config_path):
+    registry = GeneratorRegistry(check_interval=0)
+    first = registry.get(config_path)
+    assert registry.get(config_path) is first
+    assert registry.stats()["hits"] == 1 and registry.stats()["misses"] == 1
+
+
+def test_generator_is_rebuilt_when_a_template_changes(config_path):
+    registry = GeneratorRegistry(check_interval=0)
+    first = registry.get(config_path)
+
+    template = next(Path(config_path).parent.rglob("*.j2"))
+    template.write_text(template.read_text() + "\n// changed\n")
+    stat = template.stat()
+    os.utime(template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert registry.get(config_path) is not first
+    stats = registry.stats()
+    assert (stats["misses"], stats["invalidations"], stats["size"]) == (2, 1, 1)
+
+
+def test_fingerprint_is_not_rechecked_within_the_interval(config_path):
+    registry = GeneratorRegistry(check_interval=3600)
+    first = registry.get(config_path)
+    shutil.rmtree(Path(config_path).parent)
+    assert registry.get(config_path) is first
+
+    registry.clear()
+    assert registry.stats()["size"] == 0
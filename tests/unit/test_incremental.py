@@ -0,0 +1,75 @@
+"""
+Incremental generation: schema diffs and change sets.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from core.generators.configurable_generator import ConfigurableGenerator
+from core.generators.incremental import ChangeSet, SchemaDiff
+from core.orchestrator import generate_backend_incremental
+from core.scafoldr_schema.dbml_scafoldr_schema_maker import DbmlScafoldrSchemaMaker
+from models.generate import GenerateRequest
+
+CORE_DIR = Path(__file__).resolve().parent.parent.parent / "core"
+BASE_DBML = (CORE_DIR.parent / "tests" / "input" / "example.dbml").read_text()
+
+EDITS = {
+    "add column": BASE_DBML.replace("  role varchar\n", "  role varchar\n  email varchar\n"),
+    "add table": BASE_DBML + "\nTable tags {\n  id integer [pk]\n  name varchar\n}\n",
+    "remove ref": BASE_DBML.replace("Ref: users.id < follows.followed_user_id", ""),
+    "unchanged": BASE_DBML,
+}
+
+
+def make_schema(dbml, project_name="blog"):
+    return DbmlScafoldrSchemaMaker().from_dbml(dbml, project_name=project_name)
+
+
+def test_change_set_compares_rendered_outputs():
+    changes = ChangeSet.compare({"a": "1", "b": "2", "c": "3"}, {"a": "1", "b": "two", "d": "4"})
+    assert changes.added == {"d": "4"}
+    assert changes.modified == {"b": "two"}
+    assert changes.deleted == ["c"]
+    assert changes.files == {"d": "4", "b": "two"}
+    assert ChangeSet.compare({"a": "1"}, {"a": "1"}).is_empty
+
+
+def test_schema_diff_reports_changed_tables():
+    previous = make_schema(BASE_DBML)
+    diff = SchemaDiff.between(previous, make_schema(EDITS["add column"]))
+    assert (diff.modified_entities, diff.added_entities, diff.removed_entities) == ({"users"}, set(), set())
+    assert not diff.refs_changed and not diff.globals_changed
+
+    diff = SchemaDiff.between(previous, make_schema(EDITS["remove ref"]))
+    assert diff.refs_changed and diff.ref_tables == {"users", "follows"}
+
+    assert SchemaDiff.between(previous, make_schema(BASE_DBML, project_name="shop")).globals_changed
+    assert not SchemaDiff.between(previous, make_schema(BASE_DBML)).has_changes
+
+
+@pytest.mark.parametrize("template_dir", ["node_express_js", "java_spring", "next-js"])
+@pytest.mark.parametrize("edit", sorted(EDITS))
+def test_incremental_output_matches_full_regeneration(template_dir, edit):
+    generator = ConfigurableGenerator(str(CORE_DIR / "templates" / template_dir / "scafoldr_template_config.json"))
+    previous, current = make_schema(BASE_DBML), make_schema(EDITS[edit])
+
+    changes = generator.generate_incremental(previous, current)
+    expected = ChangeSet.compare(generator.generate(previous).files, generator.generate(current).files)
+    assert changes.added == expected.added
+    assert changes.modified == expected.modified
+    assert sorted(changes.deleted) == sorted(expected.deleted)
+    if edit == "unchanged":
+        assert changes.is_empty
+
+
+def test_backend_option_must_not_change(monkeypatch):
+    monkeypatch.chdir(CORE_DIR)
+    previous = GenerateRequest(project_name="blog", backend_option="java-spring", user_input=BASE_DBML)
+    request = GenerateRequest(project_name="blog", backend_option="nodejs-express-js", user_input=BASE_DBML)
+    with pytest.raises(ValueError):
+        generate_backend_incremental(previous, request)
+
+    changes = generate_backend_incremental(request, request.model_copy(update={"user_input": EDITS["add table"]}))
+    assert changes.added and not changes.deleted
@@ -0,0 +1,27 @@
+"""
+Parallel rendering of entity-based files in the shared process pool.
+"""
+
+from pathlib import Path
+
+from benchmark import generate_dbml
+from core.generators import configurable_generator
+from core.generators.configurable_generator import PARALLEL_MIN_ENTITIES, ConfigurableGenerator, shutdown_process_pool
+from core.scafoldr_schema.dbml_scafoldr_schema_maker import DbmlScafoldrSchemaMaker
+
+CONFIG_PATH = str(Path(__file__).resolve().parent.parent.parent / "core" / "templates" / "java_spring" / "scafoldr_template_config.json")
+
+
+def test_parallel_output_matches_sequential_and_pools_shut_down():
+    schema = DbmlScafoldrSchemaMaker().from_dbml(generate_dbml(PARALLEL_MIN_ENTITIES + 4), project_name="shop")
+    sequential = ConfigurableGenerator(CONFIG_PATH).generate(schema)
+    try:
+        parallel = ConfigurableGenerator(CONFIG_PATH, parallel_workers=2).generate(schema)
+        assert list(parallel.files.items()) == list(sequential.files.items())
+        wider = ConfigurableGenerator(CONFIG_PATH, parallel_workers=3).generate(schema)
+        assert list(wider.files.items()) == list(sequential.files.items())
+        pools = configurable_generator._process_pools
+        assert {workers: pool._max_workers for workers, pool in pools.items()} == {2: 2, 3: 3}
+    finally:
+        shutdown_process_pool()
+    assert configurable_generator._process_pools == {}
@@ -0,0 +1,48 @@
+"""
+Associations rendered by the RelationshipHandler and the per-generation RelationshipGraph.
+"""
+
+from pathlib import Path
+
+from core.generators.configurable_generator import ConfigurableGenerator
+from core.generators.relationship_graph import RelationshipGraph
+from core.scafoldr_schema.dbml_scafoldr_schema_maker import DbmlScafoldrSchemaMaker
+
+CONFIG_PATH = str(Path(__file__).resolve().parent.parent.parent / "core" / "templates" / "java_spring" / "scafoldr_template_config.json")
+
+DBML = """
+Table user {
+  id integer [pk]
+}
+
+Table post {
+  id integer [pk]
+  user_id integer
+}
+
+Ref: post.user_id > user.id
+"""
+
+
+def test_entity_lists_changed_in_place_are_not_served_stale():
+    handler = ConfigurableGenerator(CONFIG_PATH).relationship_handler
+    schema = DbmlScafoldrSchemaMaker().from_dbml(DBML, project_name="blog")
+    ref = schema.database_schema.refs[0]
+    entities = list(schema.backend_schema.entities)
+
+    assert handler.generate_jpa_associations(ref, entities)
+    entities.pop()
+    assert handler.generate_jpa_associations(ref, entities) == []
+    assert not hasattr(handler, "_indexed_entities")
+
+
+def test_graph_indexes_its_entities_once():
+    handler = ConfigurableGenerator(CONFIG_PATH).relationship_handler
+    schema = DbmlScafoldrSchemaMaker().from_dbml(DBML, project_name="blog")
+    graph = RelationshipGraph(schema, schema.backend_schema.entities, handler)
+    ref = schema.database_schema.refs[0]
+
+    index = graph.entity_by_table
+    assert sorted(index) == ["post", "user"]
+    assert graph.generate_jpa_associations(ref, graph.entities) == handler.generate_jpa_associations(ref, graph.entities)
+    assert graph.entity_by_table is index
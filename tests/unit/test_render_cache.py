@@ -0,0 +1,64 @@
+"""
+Rendered file cache, in-process and shared between workers.
+"""
+
+from pathlib import Path
+
+from core.generators.configurable_generator import ConfigurableGenerator
+from core.generators.render_cache import BaseRenderCacheBackend, DiskRenderCache, RenderCache
+from core.scafoldr_schema.dbml_scafoldr_schema_maker import DbmlScafoldrSchemaMaker
+
+CORE_DIR = Path(__file__).resolve().parent.parent.parent / "core"
+CONFIG_PATH = str(CORE_DIR / "templates" / "node_express_js" / "scafoldr_template_config.json")
+
+
+class BrokenBackend(BaseRenderCacheBackend):
+    def get(self, key):
+        raise ConnectionError("unreachable")
+
+    def set(self, key, value):
+        raise ConnectionError("unreachable")
+
+
+def test_cached_generation_matches_uncached_output():
+    dbml = (CORE_DIR.parent / "tests" / "input" / "example.dbml").read_text()
+    schema = DbmlScafoldrSchemaMaker().from_dbml(dbml, project_name="shop")
+    expected = ConfigurableGenerator(CONFIG_PATH).generate(schema).files
+
+    cache = RenderCache()
+    generator = ConfigurableGenerator(CONFIG_PATH, render_cache=cache)
+    assert generator.generate(schema).files == expected
+    misses = cache.stats()["misses"]
+    assert generator.generate(schema).files == expected
+    assert cache.stats()["misses"] == misses and cache.stats()["hits"] > 0
+
+
+def test_local_cache_is_bounded_by_bytes():
+    cache = RenderCache(max_bytes=100)
+    cache.set("a", "a.py", "x" * 40)
+    cache.set("b", "b.py", "x" * 40)
+    assert cache.get("a") == ("a.py", "x" * 40)
+    cache.set("c", "c.py", "x" * 40)
+    cache.set("huge", "huge.py", "x" * 200)
+
+    assert cache.get("b") is None and cache.get("huge") is None
+    stats = cache.stats()
+    assert (stats["size"], stats["evictions"]) == (2, 1)
+    assert stats["bytes"] <= 100
+
+
+def test_entries_are_shared_through_the_disk_backend(tmp_path):
+    RenderCache(shared=DiskRenderCache(str(tmp_path))).set("key", "src/app.js", "app")
+
+    other = RenderCache(shared=DiskRenderCache(str(tmp_path)))
+    assert other.get("key") == ("src/app.js", "app")
+    assert other.get("key") == ("src/app.js", "app")
+    stats = other.stats()
+    assert (stats["shared_hits"], stats["hits"], stats["misses"]) == (1, 1, 0)
+
+
+def test_backend_errors_do_not_break_rendering():
+    cache = RenderCache(shared=BrokenBackend())
+    assert cache.get("key") is None
+    cache.set("key", "a.py", "a")
+    assert cache.get("key") == ("a.py", "a")
@@ -0,0 +1,93 @@
+"""
+Caches used while building schemas from DBML.
+"""
+
+import pydantic
+import pytest
+
+from core.generators.render_cache import DiskRenderCache
+from core.scafoldr_schema import dbml_scafoldr_schema_maker
+from core.scafoldr_schema.base_scafoldr_schema_maker import NamesCache, names_cache
+from core.scafoldr_schema.dbml_scafoldr_schema_maker import DbmlScafoldrSchemaMaker, SchemaCache
+
+DBML = """
+Table users {
+  id integer [pk]
+  name varchar
+}
+
+Table posts {
+  id integer [pk]
+  user_id integer
+}
+
+Ref: posts.user_id > users.id
+"""
+
+
+@pytest.fixture(autouse=True)
+def empty_names_cache():
+    names_cache.clear()
+    yield
+    names_cache.clear()
+
+
+def test_names_are_inflected_once_and_shared():
+    maker = DbmlScafoldrSchemaMaker()
+    hits = names_cache.stats()["hits"]
+    first = maker._create_names("order_items")
+    second = maker._create_names("order_items")
+    assert second is first
+    assert (first.pascal_case.singular, first.kebab_case.plural) == ("OrderItem", "order-items")
+    assert names_cache.stats()["hits"] == hits + 1
+
+
+def test_shared_names_are_immutable():
+    names = DbmlScafoldrSchemaMaker()._create_names("user")
+    with pytest.raises(pydantic.ValidationError):
+        names.snake_case.singular = "account"
+    with pytest.raises(pydantic.ValidationError):
+        names.camel_case = names.pascal_case
+
+
+def test_names_cache_evicts_least_recently_used():
+    maker = DbmlScafoldrSchemaMaker()
+    cache = NamesCache(maxsize=2)
+    for name in ["a", "b", "a", "c"]:
+        if cache.get(name) is None:
+            cache.set(name, maker._inflect_names(name))
+    assert cache.get("b") is None and cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_parsed_schema_is_reused_with_per_call_project_settings(monkeypatch):
+    monkeypatch.setattr(dbml_scafoldr_schema_maker, "schema_cache", None)
+    maker = DbmlScafoldrSchemaMaker()
+    expected = maker.from_dbml(DBML, project_name="blog", backend_port=3000)
+
+    cache = SchemaCache()
+    monkeypatch.setattr(dbml_scafoldr_schema_maker, "schema_cache", cache)
+    maker.from_dbml(DBML, project_name="shop")
+    schema = maker.from_dbml(DBML, project_name="blog", backend_port=3000)
+    assert schema == expected
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_schema_cache_evicts_least_recently_used():
+    maker = DbmlScafoldrSchemaMaker()
+    cache = SchemaCache(maxsize=2)
+    entries = {name: maker._parse_uncached(DBML.replace("users", name)) for name in ["a", "b", "c"]}
+    for name in ["a", "b", "a", "c"]:
+        cache.set(SchemaCache.key(name), *entries[name])
+    assert cache.get(SchemaCache.key("b")) is None
+    assert cache.get(SchemaCache.key("a")) == entries["a"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_schemas_are_shared_through_the_backend(tmp_path):
+    entry = DbmlScafoldrSchemaMaker()._parse_uncached(DBML)
+    SchemaCache(shared=DiskRenderCache(str(tmp_path))).set(SchemaCache.key(DBML), *entry)
+
+    other = SchemaCache(shared=DiskRenderCache(str(tmp_path)))
+    assert other.get(SchemaCache.key(DBML)) == entry
+    assert other.stats()["shared_hits"] == 1
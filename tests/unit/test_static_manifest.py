@@ -0,0 +1,60 @@
+"""
+Static file manifest of the ConfigurableGenerator.
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+from core.generators.configurable_generator import STATIC_FILE_LAZY_THRESHOLD, ConfigurableGenerator
+from core.generators.generator_factory import GeneratorRegistry
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent.parent / "core" / "templates"
+
+
+def _load(path):
+    # _load_static_file does not depend on the generator's configuration
+    return ConfigurableGenerator._load_static_file(None, path, path.name)
+
+
+def test_small_files_are_read_eagerly(tmp_path):
+    text = tmp_path / "README.md"
+    text.write_bytes(b"line\r\nline\n")
+    binary = tmp_path / "logo.png"
+    binary.write_bytes(b"\x89PNG\xff\x00")
+    assert _load(text).content == "line\nline\n"
+    entry = _load(binary)
+    assert (entry.content, entry.is_text) == (b"\x89PNG\xff\x00", False)
+
+
+def test_large_text_is_read_on_first_use_only(tmp_path):
+    path = tmp_path / "package-lock.json"
+    path.write_text("{}\n" * STATIC_FILE_LAZY_THRESHOLD)
+    entry = _load(path)
+    assert entry.content is None and entry.is_text is None
+    first = entry.read()
+    assert first == "{}\n" * STATIC_FILE_LAZY_THRESHOLD and entry.is_text
+    path.unlink()
+    assert entry.read() is first
+
+
+def test_large_binary_is_kept_as_bytes(tmp_path):
+    path = tmp_path / "font.woff"
+    path.write_bytes(b"\xff\xfe" * STATIC_FILE_LAZY_THRESHOLD)
+    entry = _load(path)
+    assert entry.read() == b"\xff\xfe" * STATIC_FILE_LAZY_THRESHOLD and entry.is_text is False
+
+
+def test_registry_picks_up_changed_static_files(tmp_path):
+    template_dir = tmp_path / "node_express_js"
+    shutil.copytree(TEMPLATES_DIR / "node_express_js", template_dir)
+    asset = template_dir / "data.json"
+    asset.write_text("a" * STATIC_FILE_LAZY_THRESHOLD)
+    registry = GeneratorRegistry(check_interval=0)
+    config_path = str(template_dir / "scafoldr_template_config.json")
+    assert registry.get(config_path)._generate_static_files()["data.json"][0] == "a"
+
+    asset.write_text("b" * STATIC_FILE_LAZY_THRESHOLD)
+    stat = asset.stat()
+    os.utime(asset, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert registry.get(config_path)._generate_static_files()["data.json"][0] == "b"
@@ -0,0 +1,76 @@
+"""
+Compiled expression templates and the Jinja bytecode cache.
+"""
+
+import os
+
+import pytest
+from jinja2 import BaseLoader, Environment
+
+from core.generators import template_cache
+from core.generators.template_cache import CompiledTemplateCache, create_bytecode_cache
+
+
+def test_expressions_are_compiled_once_per_environment():
+    cache = CompiledTemplateCache()
+    env = Environment(loader=BaseLoader())
+    first = cache.get(env, "{{ name | upper }}")
+    assert cache.get(env, "{{ name | upper }}") is first
+    assert first.render(name="user") == "USER"
+
+    other = cache.get(Environment(loader=BaseLoader()), "{{ name | upper }}")
+    assert other is not first
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 2)
+
+
+def test_least_recently_used_expression_is_evicted():
+    cache = CompiledTemplateCache(maxsize=2)
+    env = Environment(loader=BaseLoader())
+    a = cache.get(env, "a")
+    cache.get(env, "b")
+    cache.get(env, "a")
+    cache.get(env, "c")
+    assert cache.get(env, "a") is a
+    assert cache.stats()["evictions"] == 1 and cache.stats()["size"] == 2
+
+    cache.get(env, "b")
+    assert cache.stats()["misses"] == 4
+
+    cache.clear()
+    assert cache.stats()["size"] == 0
+
+
+def test_bytecode_is_reused_by_later_environments(tmp_path, monkeypatch):
+    monkeypatch.setattr(template_cache, "JINJA_BYTECODE_CACHE_DIR", str(tmp_path))
+    env = Environment(loader=BaseLoader(), bytecode_cache=create_bytecode_cache("expressions"))
+    assert CompiledTemplateCache().get(env, "{{ 1 + 2 }}").render() == "3"
+    assert [path.name.startswith("expressions-") for path in tmp_path.iterdir()] == [True]
+
+    later = Environment(loader=BaseLoader(), bytecode_cache=create_bytecode_cache("expressions"))
+    monkeypatch.setattr(later, "compile", lambda *args, **kwargs: pytest.fail("bytecode was recompiled"))
+    assert CompiledTemplateCache().get(later, "{{ 1 + 2 }}").render() == "3"
+
+
+def test_bytecode_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(template_cache, "JINJA_BYTECODE_CACHE_DIR", "")
+    assert create_bytecode_cache("templates") is None
+
+
+def test_bytecode_cache_refuses_directories_others_can_write(tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    monkeypatch.setattr(template_cache, "JINJA_BYTECODE_CACHE_DIR", str(shared))
+    assert create_bytecode_cache("templates") is None
+
+    private = tmp_path / "private"
+    monkeypatch.setattr(template_cache, "JINJA_BYTECODE_CACHE_DIR", str(private))
+    assert create_bytecode_cache("templates") is not None
+    assert private.stat().st_mode & 0o777 == 0o700
+
+
+def test_bytecode_cache_defaults_to_a_private_directory(monkeypatch):
+    monkeypatch.setattr(template_cache, "JINJA_BYTECODE_CACHE_DIR", None)
+    directory = create_bytecode_cache("templates").directory
+    assert os.stat(directory).st_mode & 0o077 == 0
@@ -0,0 +1,43 @@
+"""
+SQL type resolution of the TypeMapper.
+"""
+
+from core.generators.type_mapper import TypeMapper, normalize_sql_type
+from models.template_config import TypeMapping
+
+
+def _mapper():
+    return TypeMapper(TypeMapping(
+        sql_to_framework={"integer": "Integer", "double precision": "Double", "varchar(255)": "String255"},
+        import_mappings={"BigDecimal": "java.math.BigDecimal"},
+        default_type="Object",
+        custom_mappings=[
+            {"condition": "type.lower().contains('char')", "result": "String"},
+            {"condition": "type.lower().contains('decimal')", "result": "BigDecimal"},
+        ],
+    ))
+
+
+def test_normalize_sql_type():
+    assert normalize_sql_type("  VARCHAR (255) ") == "varchar(255)"
+    assert normalize_sql_type("Double\tPrecision") == "double precision"
+    assert normalize_sql_type("decimal( 10 , 2 )") == "decimal(10,2)"
+
+
+def test_resolves_exact_conditional_and_default_types():
+    mapper = _mapper()
+    assert mapper.resolve("INTEGER") == "Integer"
+    assert mapper.resolve("double  precision") == "Double"
+    assert mapper.resolve("varchar(64)") == "String"
+    assert mapper.resolve("DECIMAL(10, 2)") == "BigDecimal"
+    assert mapper.resolve("uuid") == "Object"
+    assert mapper.get_all_imports(["decimal(10,2)", "integer"]) == {"java.math.BigDecimal"}
+
+
+def test_equivalent_spellings_share_one_memo_entry():
+    mapper = _mapper()
+    for spelling in ["VARCHAR(255)", "varchar (255)", "Varchar( 255 )"]:
+        assert mapper.resolve(spelling) == "String255"
+        mapper.get_imports(spelling)
+    assert list(mapper._resolved) == ["varchar(255)"]
+    assert list(mapper._imports) == ["varchar(255)"]